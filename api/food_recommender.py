@@ -1,6 +1,8 @@
 import random
 from typing import List, Dict, Any
 import numpy as np
+from settings import BUDGET_RELAXATION_RATE
+from utils.relaxation import RelaxationStep, relax
 from .models import UserInfo, FoodItem, NutritionSummary, RecommendResponse
 from .utils import calculate_bmr, calculate_tdee, calculate_macro_targets
 
@@ -30,8 +32,9 @@ def recommend_meals(user_info: UserInfo, food_database: List[FoodItem]) -> Recom
     
     # Check if we have enough foods left after filtering
     if len(available_foods) < 10:  # Arbitrary threshold
-        # Not enough foods available with allergy restrictions
-        return generate_fallback_response(user_info, food_database, targets)
+        # Not enough foods for category-balanced meals: relax meal composition and the
+        # budget/calorie limits in priority order, never the allergy filter
+        return generate_fallback_response(user_info, available_foods, targets)
     
     # Group foods by category for balanced meal creation
     foods_by_category = {}
@@ -79,7 +82,7 @@ def recommend_meals(user_info: UserInfo, food_database: List[FoodItem]) -> Recom
         
         # Add to nutrition totals
         for food in meal_foods:
-            total_calories += food.kcal
+            total_calories += food.calories
             total_protein += food.protein
             total_fat += food.fat
             total_carbs += food.carbs
@@ -152,7 +155,7 @@ def generate_meal(
         # Choose random food from category
         available_foods = [
             f for f in foods_by_category[category] 
-            if current_cost + f.price <= budget and current_calories + f.kcal <= target_calories * 1.1
+            if current_cost + f.price <= budget and current_calories + f.calories <= target_calories * 1.1
         ]
         
         if not available_foods:
@@ -160,7 +163,7 @@ def generate_meal(
             
         food = random.choice(available_foods)
         meal.append(food)
-        current_calories += food.kcal
+        current_calories += food.calories
         current_cost += food.price
         
         # Stop if we've reached the target calories (with 10% flexibility)
@@ -174,13 +177,13 @@ def generate_meal(
             all_foods.extend(foods)
             
         # Sort by calories per dollar for efficiency
-        all_foods.sort(key=lambda f: f.kcal / max(f.price, 0.01), reverse=True)
+        all_foods.sort(key=lambda f: f.calories / max(f.price, 0.01), reverse=True)
         
         for food in all_foods:
-            if current_cost + food.price <= budget and current_calories + food.kcal <= target_calories * 1.1:
+            if current_cost + food.price <= budget and current_calories + food.calories <= target_calories * 1.1:
                 if food not in meal:  # Avoid duplicates
                     meal.append(food)
-                    current_calories += food.kcal
+                    current_calories += food.calories
                     current_cost += food.price
                     
                     if current_calories >= target_calories * 0.9:
@@ -196,6 +199,9 @@ def generate_fallback_response(
     """
     Generate a fallback response when allergies restrict too many foods
     
+    Meals are filled from the relaxation engine (utils/relaxation.py): budget +10%,
+    then no per-meal calorie cap, then no budget, and only the tiers actually used are reported.
+    
     Args:
         user_info: UserInfo object containing user profile
         food_database: List of FoodItem objects
@@ -204,19 +210,44 @@ def generate_fallback_response(
     Returns:
         RecommendResponse: Object containing meal recommendations and nutrition summary
     """
-    # Simply select random foods for the meals
     meal_count = min(user_info.mealCount, 5)
-    meals = []
+    foods_per_meal = 3
+    daily_budget = user_info.budget / 7
+    
+    # Per-food limits for a day of meal_count meals (allergy-safe foods are the base, never relaxed)
+    price = np.array([food.price for food in food_database], dtype=np.float64)
+    calories = np.array([food.calories for food in food_database], dtype=np.float64)
+    score = np.array([food.score for food in food_database], dtype=np.float64)
+    food_budget = daily_budget / (meal_count * foods_per_meal)
+    result = relax(
+        np.ones(len(food_database), dtype=bool),
+        {
+            'budget': price <= food_budget,
+            'calories': calories <= targets['calories'] / meal_count * 1.1
+        },
+        [
+            RelaxationStep('budget', f"예산 {BUDGET_RELAXATION_RATE:.0%} 초과 허용", 'budget',
+                           price <= food_budget * (1 + BUDGET_RELAXATION_RATE)),
+            RelaxationStep('calories', "끼니 칼로리 상한 해제", 'calories'),
+            RelaxationStep('any_budget', "예산 조건 해제", 'budget'),
+        ],
+        minimum=meal_count * foods_per_meal
+    )
+    
+    # Strict candidates first, then by score within each relaxation tier
+    order = np.lexsort((-score[result.positions], result.tiers))[:meal_count * foods_per_meal]
+    meals = [[] for _ in range(meal_count)]
+    for rank, index in enumerate(order):
+        meals[rank % meal_count].append(food_database[result.positions[index]])
     
-    # Create random meal groups
-    for _ in range(meal_count):
-        # Randomly select 3-5 foods per meal
-        meal_size = random.randint(3, 5)
-        meal = random.sample(food_database, min(meal_size, len(food_database)))
-        meals.append(meal)
+    # Report only the relaxations the selected foods actually needed (in the order they were applied)
+    needed = {description for index in order for description in result.relaxations_for(index)}
+    relaxations = ["카테고리 균형 구성 조건 해제"] + [
+        step.description for step in result.applied if step.description in needed
+    ]
     
     # Calculate nutrition totals
-    total_calories = sum(food.kcal for meal in meals for food in meal)
+    total_calories = sum(food.calories for meal in meals for food in meal)
     total_protein = sum(food.protein for meal in meals for food in meal)
     total_fat = sum(food.fat for meal in meals for food in meal)
     total_carbs = sum(food.carbs for meal in meals for food in meal)
@@ -250,5 +281,6 @@ def generate_fallback_response(
     return RecommendResponse(
         meals=meals,
         summary=summary,
-        fallback=True  # Indicate this is a fallback response
+        fallback=True,  # Indicate this is a fallback response
+        relaxations=relaxations
     )
\ No newline at end of file
@@ -1,40 +1,180 @@
 """
 정제된 한국 음식 데이터 전용 로더
 기존 DB 및 샘플 데이터는 완전히 비활성화하고 정제된 JSON만 사용
+
+검증 모드
+- strict: 레코드마다 FoodItem(**food) 생성 (기존 방식, 비교용)
+- batch: TypeAdapter(List[FoodItem])로 전체 목록을 한 번에 검증하고 오류를 리포트로 수집
+- trusted: 이미 검증된 해시의 스냅샷은 재검증 없이 FoodItem 내부 상태를 직접 채워 생성
+- auto: 검증된 스냅샷이면 trusted, 아니면 batch
+
+검증 결과는 카탈로그 행 번호별로 캐시되어, 델타 저널이 적용되면 변경된 행만 다시 검증
 """
 
-import json
-import os
-from typing import List
+import time
+from typing import Any, Dict, List, Literal, Optional, Sequence, Tuple
+import numpy as np
+from pydantic import BaseModel, TypeAdapter, ValidationError
 from .models import FoodItem
+from utils.catalog_delta import append_deltas, collapse_deltas
+from utils.food_catalog import DATA_PATH, FoodCatalog, get_catalog, refresh_catalog, register_derived_patcher
 
-def load_korean_foods() -> List[FoodItem]:
-    """오직 /data/정제 데이터.json 파일만 사용하는 고정된 로더"""
-    
-    # 고정된 단일 경로만 사용
-    data_path = os.path.join(os.path.dirname(__file__), "..", "data", "정제 데이터.json")
-    
-    try:
-        with open(data_path, 'r', encoding='utf-8') as f:
-            foods_data = json.load(f)
-            
-        print(f"🍲 정제된 한국 음식 데이터 로드 성공:")
-        print(f"   📁 고정 경로: {data_path}")
-        print(f"   📊 총 {len(foods_data)}개 한국 음식")
-        
-        # 데이터 검증
-        validated_foods = []
-        for food in foods_data:
+ValidationMode = Literal['auto', 'strict', 'batch', 'trusted']
+
+_food_list_adapter = TypeAdapter(List[FoodItem])
+
+# 선택 필드 기본값 (신뢰 모드에서 누락 필드 채우기용)
+_food_defaults = {
+    name: field.default for name, field in FoodItem.model_fields.items() if not field.is_required()
+}
+
+class FoodValidationReport(BaseModel):
+    """음식 데이터 검증 결과 리포트"""
+    mode: str
+    total: int
+    valid: int
+    seconds: float
+    errors: List[Dict[str, Any]] = []
+
+def _invalid_rows(error: ValidationError) -> Dict[int, List[Dict[str, Any]]]:
+    """TypeAdapter 오류를 행 번호별로 묶기"""
+    by_row: Dict[int, List[Dict[str, Any]]] = {}
+    for detail in error.errors(include_url=False, include_input=False):
+        row = detail['loc'][0] if detail['loc'] else -1
+        by_row.setdefault(row, []).append({'field': '.'.join(str(p) for p in detail['loc'][1:]), 'message': detail['msg']})
+    return by_row
+
+def _construct_trusted(food: Dict[str, Any]) -> FoodItem:
+    """검증 없이 FoodItem 생성
+
+    model_construct()는 순수 파이썬 경로라 pydantic v2에서는 일괄 검증보다 느리므로,
+    model_construct와 같은 내부 상태만 직접 채워 생성 비용을 줄임
+    """
+    item = FoodItem.__new__(FoodItem)
+    values = dict(_food_defaults)
+    values.update(food)
+    object.__setattr__(item, '__dict__', values)
+    object.__setattr__(item, '__pydantic_fields_set__', set(food))
+    object.__setattr__(item, '__pydantic_extra__', None)
+    object.__setattr__(item, '__pydantic_private__', None)
+    return item
+
+def _validate_rows(records: Sequence[Dict[str, Any]], mode: ValidationMode) -> Tuple[List[Optional[FoodItem]], List[Dict[str, Any]]]:
+    """레코드 위치별 FoodItem (검증 실패 시 None)과 오류 목록"""
+    errors: List[Dict[str, Any]] = []
+
+    if mode == 'trusted':
+        return [_construct_trusted(food) for food in records], errors
+
+    if mode == 'strict':
+        foods: List[Optional[FoodItem]] = []
+        for row, food in enumerate(records):
             try:
-                validated_foods.append(FoodItem(**food))
-            except Exception as e:
-                print(f"   ⚠️  음식 데이터 검증 실패: {food.get('name', 'Unknown')} - {e}")
-                continue
-        
-        print(f"   ✅ 검증된 음식: {len(validated_foods)}개")
-        return validated_foods
-        
+                foods.append(FoodItem(**food))
+            except ValidationError as e:
+                foods.append(None)
+                errors.append({'row': row, 'name': food.get('name', 'Unknown'), 'errors': str(e)})
+        return foods, errors
+
+    try:
+        return list(_food_list_adapter.validate_python(records)), errors
+    except ValidationError as e:
+        invalid = _invalid_rows(e)
+        for row, details in sorted(invalid.items()):
+            name = records[row].get('name', 'Unknown') if 0 <= row < len(records) else 'Unknown'
+            errors.append({'row': row, 'name': name, 'errors': details})
+        # 오류 행을 제외하고 한 번 더 일괄 검증
+        valid_rows = [row for row in range(len(records)) if row not in invalid]
+        validated = _food_list_adapter.validate_python([records[row] for row in valid_rows])
+        foods = [None] * len(records)
+        for row, food in zip(valid_rows, validated):
+            foods[row] = food
+        return foods, errors
+
+def validate_food_records(records: Sequence[Dict[str, Any]], mode: ValidationMode = 'batch') -> Tuple[List[FoodItem], FoodValidationReport]:
+    """음식 레코드 목록을 FoodItem으로 변환하고 검증 리포트 반환"""
+    start = time.perf_counter()
+    rows, errors = _validate_rows(records, mode)
+    foods = [food for food in rows if food is not None]
+
+    report = FoodValidationReport(
+        mode=mode,
+        total=len(records),
+        valid=len(foods),
+        seconds=time.perf_counter() - start,
+        errors=errors
+    )
+    return foods, report
+
+def _resolve_mode(catalog: FoodCatalog, mode: ValidationMode) -> ValidationMode:
+    if mode == 'auto':
+        return 'trusted' if catalog.validated else 'batch'
+    return mode
+
+def _validate_catalog(catalog: FoodCatalog, mode: ValidationMode = 'auto') -> List[Optional[FoodItem]]:
+    """카탈로그 레코드를 행 번호별 FoodItem으로 검증 (카탈로그 버전당 1회, 삭제/실패 행은 None)"""
+    print(f"🍲 정제된 한국 음식 데이터 로드 성공:")
+    print(f"   📁 고정 경로: {catalog.source_path}")
+    print(f"   📊 총 {catalog.live_count}개 한국 음식")
+
+    live_rows = catalog.live_rows()
+    records = catalog.row_records
+
+    # 데이터 검증
+    start = time.perf_counter()
+    validated, errors = _validate_rows([records[row] for row in live_rows], _resolve_mode(catalog, mode))
+    for error in errors:
+        print(f"   ⚠️  음식 데이터 검증 실패: {error['name']} - {error['errors']}")
+
+    foods: List[Optional[FoodItem]] = [None] * len(catalog)
+    for row, food in zip(live_rows, validated):
+        foods[row] = food
+
+    valid = sum(food is not None for food in validated)
+    print(f"   ✅ 검증된 음식: {valid}개 (모드: {_resolve_mode(catalog, mode)}, ⏱️ {(time.perf_counter() - start) * 1000:.1f} ms)")
+    return foods
+
+def _patch_food_items(key: str, foods: List[Optional[FoodItem]], catalog: FoodCatalog, rows: np.ndarray) -> List[Optional[FoodItem]]:
+    """델타 적용 시 변경된 행만 다시 검증"""
+    mode = _resolve_mode(catalog, key.split(':', 1)[1])
+    patched = foods + [None] * (len(catalog) - len(foods))
+    live = [int(row) for row in rows if catalog.alive is None or catalog.alive[row]]
+    for row in rows:
+        patched[row] = None
+    validated, errors = _validate_rows([catalog.record(row) for row in live], mode)
+    for error in errors:
+        print(f"   ⚠️  음식 데이터 검증 실패: {error['name']} - {error['errors']}")
+    for row, food in zip(live, validated):
+        patched[row] = food
+    return patched
+
+register_derived_patcher('food_item_rows', _patch_food_items)
+
+def load_korean_foods(mode: ValidationMode = 'auto') -> List[FoodItem]:
+    """오직 /data/정제 데이터.json 파일만 사용하는 고정된 로더 (공유 카탈로그 기반)"""
+
+    try:
+        catalog = get_catalog()
+        rows = catalog.derived(f'food_item_rows:{mode}', lambda c: _validate_catalog(c, mode))
+        return catalog.derived(f'food_items:{mode}', lambda c: [food for food in rows if food is not None])
+
     except Exception as e:
-        print(f"🚨 치명적 오류: /data/정제 데이터.json 파일 로드 실패: {e}")
+        print(f"🚨 치명적 오류: {DATA_PATH} 파일 로드 실패: {e}")
         print("   다른 데이터는 절대 사용하지 않습니다.")
-        return []
\ No newline at end of file
+        return []
+
+def submit_food_deltas(deltas: Sequence[Dict[str, Any]]) -> Tuple[Optional[FoodCatalog], FoodValidationReport]:
+    """델타를 일괄 검증해 저널에 추가하고 공유 카탈로그에 즉시 반영
+
+    upsert는 저널 적용과 같은 병합 결과(collapse_deltas)를 FoodItem으로 검증하며,
+    하나라도 실패하면 저널에 아무것도 쓰지 않고 (None, 리포트)를 반환
+    (같은 묶음에서 delete 뒤의 upsert는 기존 레코드와 병합하지 않으므로 전체 필드가 없으면 실패)
+    """
+    merged = collapse_deltas(get_catalog(), deltas)
+
+    _, report = validate_food_records([record for record in merged.values() if record is not None], 'batch')
+    if report.errors:
+        return None, report
+
+    append_deltas(deltas)
+    return refresh_catalog(), report
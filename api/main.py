@@ -9,8 +9,10 @@ import numpy as np
 from datetime import datetime
 
 # Import local modules
-from .models import UserInfo, FoodItem, NutritionSummary, RecommendResponse
-from .korean_food_loader import load_korean_foods
+from .models import UserInfo, BatchRecommendRequest, FoodItem, FoodDeltaBatch, NutritionSummary, RecommendResponse
+from .korean_food_loader import load_korean_foods, submit_food_deltas
+from utils.candidate_cache import get_candidate_cache
+from utils.food_catalog import get_catalog
 
 # Create FastAPI app
 app = FastAPI(
@@ -28,10 +30,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Load authentic Korean food database on startup
+# Warm up the shared Korean food catalog on startup (reused by every request).
+# Loads the compiled binary snapshot when present; FoodItem validation is deferred to /api/foods.
 print("🍲 Loading authentic Korean food database...")
-food_database = load_korean_foods()
-print(f"✅ Successfully loaded {len(food_database)} Korean food items")
+print(f"✅ Successfully loaded {get_catalog().live_count} Korean food items")
 
 # API routes
 @app.get("/")
@@ -46,7 +48,104 @@ async def root():
 @app.get("/api/foods")
 async def get_all_foods():
     """Get all available foods in the database"""
-    return {"foods": food_database}
+    return {"foods": load_korean_foods()}
+
+@app.post("/api/foods/deltas")
+async def submit_deltas(batch: FoodDeltaBatch):
+    """Apply a bulk batch of upsert/delete deltas without rewriting the catalog file"""
+    catalog, report = submit_food_deltas([delta.model_dump() for delta in batch.deltas])
+    if catalog is None:
+        raise HTTPException(status_code=422, detail={"message": "델타 검증 실패", "errors": report.errors})
+    return {
+        "applied": len(batch.deltas),
+        "version": catalog.version,
+        "count": catalog.live_count
+    }
+
+@app.get("/api/cache/stats")
+async def cache_stats():
+    """Hit/miss counters of the shared filtered-candidate cache"""
+    return get_candidate_cache().stats()
+
+def _user_profile(user_info: UserInfo) -> dict:
+    """API 사용자 정보 → utils.recommender 프로필"""
+    return {
+        "gender": "남성" if user_info.gender == "male" else "여성",
+        "age": user_info.age,
+        "height": user_info.height,
+        "weight": user_info.weight,
+        "goal": "체중감량" if user_info.goal == "weight-loss" else "근육증가" if user_info.goal == "muscle-gain" else "체중유지",
+        "activity_level": {"low": "낮음", "medium": "보통", "high": "높음"}[user_info.activityLevel],
+        "budget": user_info.budget / 7,  # 주간 예산을 일간으로 변환
+        "daily_budget": user_info.budget / 7,  # 하루 식단 최적화의 하루 비용 상한
+        "allergies": user_info.allergies,
+        "preferences": ["단백질 위주", "간편식"],  # 기본 선호도
+        "diseases": []  # 추후 확장 가능
+    }
+
+def _build_response(user_info: UserInfo, meal_recommendations: dict) -> RecommendResponse:
+    """끼니별 추천 결과 → RecommendResponse (FoodItem 변환 + 영양 요약)"""
+    meals = []
+    all_recommended_foods = []
+    relaxations = []
+    
+    for meal_time in ['breakfast', 'lunch', 'dinner']:
+        meal_foods = []
+        if meal_time in meal_recommendations:
+            for rec in meal_recommendations[meal_time]:
+                relaxations.extend(r for r in rec.get('relaxations', []) if r not in relaxations)
+                try:
+                    food_item = FoodItem(
+                        id=f"rec-{meal_time}-{len(meal_foods)}",
+                        name=rec['name'],
+                        type=rec.get('type', ''),
+                        category=rec.get('category', ''),
+                        cuisine='한식',
+                        calories=float(rec['calories']),
+                        protein=float(rec['protein']),
+                        fat=float(rec.get('fat', 0)),
+                        carbs=float(rec.get('carbs', 0)),
+                        sodium=0,  # 기본값
+                        sugar=0,  # 기본값
+                        fiber=0,  # 기본값
+                        ingredients=[],
+                        tags=rec.get('tags', []),
+                        allergies=[],
+                        price=float(rec['price']),
+                        score=float(rec['score'])
+                    )
+                    meal_foods.append(food_item)
+                    all_recommended_foods.append(food_item)
+                except (ValueError, KeyError) as e:
+                    print(f"Error converting food item {rec.get('name', 'unknown')}: {e}")
+                    continue
+        
+        meals.append(meal_foods)
+    
+    # 영양 요약 계산
+    total_calories = sum(food.calories for food in all_recommended_foods)
+    total_protein = sum(food.protein for food in all_recommended_foods)
+    total_cost = sum(food.price for food in all_recommended_foods)
+    
+    target_calories = 2000 if user_info.goal == "weight-loss" else 2200
+    target_protein = 120 if user_info.goal == "muscle-gain" else 80
+    daily_budget = user_info.budget / 7
+    
+    summary = NutritionSummary(
+        calories={"current": total_calories, "target": target_calories, "percentage": (total_calories/target_calories)*100},
+        protein={"current": total_protein, "target": target_protein, "percentage": (total_protein/target_protein)*100},
+        fat={"current": 0, "target": 60, "percentage": 0},
+        carbs={"current": 0, "target": 200, "percentage": 0},
+        budget={"current": total_cost, "target": daily_budget, "percentage": (total_cost/daily_budget)*100},
+        allergy=len(user_info.allergies) > 0
+    )
+    
+    return RecommendResponse(
+        meals=meals,
+        summary=summary,
+        fallback=False,
+        relaxations=relaxations
+    )
 
 @app.post("/api/recommend")
 async def recommend(user_info: UserInfo):
@@ -58,87 +157,33 @@ async def recommend(user_info: UserInfo):
         sys.path.append(os.path.dirname(os.path.dirname(__file__)))
         from utils.recommender import recommend as get_recommendations
         
-        # 사용자 프로필 변환
-        user_profile = {
-            "gender": "남성" if user_info.gender == "male" else "여성",
-            "age": user_info.age,
-            "height": user_info.height,
-            "weight": user_info.weight,
-            "goal": "체중감량" if user_info.goal == "weight-loss" else "근육증가" if user_info.goal == "muscle-gain" else "체중유지",
-            "budget": user_info.budget / 7,  # 주간 예산을 일간으로 변환
-            "allergies": user_info.allergies,
-            "preferences": ["단백질 위주", "간편식"],  # 기본 선호도
-            "diseases": []  # 추후 확장 가능
-        }
-        
         # 추천 실행 (끼니별 구조로 반환됨)
-        meal_recommendations = get_recommendations(user_profile)
+        meal_recommendations = get_recommendations(_user_profile(user_info))
         
         if not meal_recommendations:
             raise HTTPException(status_code=404, detail="추천 가능한 음식이 없습니다")
         
-        # 끼니별 추천 결과를 FoodItem 형태로 변환
-        meals = []
-        all_recommended_foods = []
-        
-        for meal_time in ['breakfast', 'lunch', 'dinner']:
-            meal_foods = []
-            if meal_time in meal_recommendations:
-                for rec in meal_recommendations[meal_time]:
-                    try:
-                        food_item = FoodItem(
-                            id=f"rec-{meal_time}-{len(meal_foods)}",
-                            name=rec['name'],
-                            type=rec.get('type', ''),
-                            category=rec.get('category', ''),
-                            cuisine='한식',
-                            calories=float(rec['calories']),
-                            protein=float(rec['protein']),
-                            fat=float(rec.get('fat', 0)),
-                            carbs=float(rec.get('carbs', 0)),
-                            sodium=0,  # 기본값
-                            sugar=0,  # 기본값
-                            fiber=0,  # 기본값
-                            ingredients=[],
-                            tags=rec.get('tags', []),
-                            allergies=[],
-                            price=float(rec['price']),
-                            score=float(rec['score'])
-                        )
-                        meal_foods.append(food_item)
-                        all_recommended_foods.append(food_item)
-                    except (ValueError, KeyError) as e:
-                        print(f"Error converting food item {rec.get('name', 'unknown')}: {e}")
-                        continue
-            
-            meals.append(meal_foods)
-        
-        # 영양 요약 계산
-        total_calories = sum(food.calories for food in all_recommended_foods)
-        total_protein = sum(food.protein for food in all_recommended_foods)
-        total_cost = sum(food.price for food in all_recommended_foods)
+        return _build_response(user_info, meal_recommendations)
         
-        target_calories = 2000 if user_info.goal == "weight-loss" else 2200
-        target_protein = 120 if user_info.goal == "muscle-gain" else 80
-        daily_budget = user_info.budget / 7
-        
-        summary = NutritionSummary(
-            calories={"current": total_calories, "target": target_calories, "percentage": (total_calories/target_calories)*100},
-            protein={"current": total_protein, "target": target_protein, "percentage": (total_protein/target_protein)*100},
-            fat={"current": 0, "target": 60, "percentage": 0},
-            carbs={"current": 0, "target": 200, "percentage": 0},
-            budget={"current": total_cost, "target": daily_budget, "percentage": (total_cost/daily_budget)*100},
-            allergy=len(user_info.allergies) > 0
-        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"추천 생성 오류: {str(e)}")
+
+@app.post("/api/recommend/batch")
+async def recommend_batch(batch: BatchRecommendRequest):
+    """Generate meal recommendations for many user profiles at once (profile x food matrices)"""
+    try:
+        from utils.batch_recommender import recommend_batch as get_batch_recommendations
         
-        return RecommendResponse(
-            meals=meals,
-            summary=summary,
-            fallback=False
-        )
+        results = get_batch_recommendations([_user_profile(user_info) for user_info in batch.users])
+        return {
+            "results": [
+                _build_response(user_info, meal_recommendations)
+                for user_info, meal_recommendations in zip(batch.users, results)
+            ]
+        }
         
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"추천 생성 오류: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"일괄 추천 생성 오류: {str(e)}")
 
 # For local development
 if __name__ == "__main__":
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional, Literal
+from typing import Any, Dict, List, Optional, Literal
 from settings import MIN_BUDGET_WEEKLY, MAX_BUDGET_WEEKLY
 
 class UserInfo(BaseModel):
@@ -15,6 +15,10 @@ class UserInfo(BaseModel):
     allergies: List[str] = []
     budget: float = Field(..., ge=MIN_BUDGET_WEEKLY, le=MAX_BUDGET_WEEKLY)  # Weekly budget
 
+class BatchRecommendRequest(BaseModel):
+    """일괄 추천 요청 (사용자 정보 목록, 결과는 같은 순서)"""
+    users: List[UserInfo]
+
 class FoodItem(BaseModel):
     """정제된 한국 음식 데이터 모델"""
     id: str
@@ -47,6 +51,16 @@ class FoodItem(BaseModel):
     class Config:
         populate_by_name = True
 
+class FoodDelta(BaseModel):
+    """카탈로그 델타 1건 (upsert: 기존 음식은 바뀐 필드만, 새 음식은 전체 필드)"""
+    op: Literal['upsert', 'delete']
+    id: str
+    record: Dict[str, Any] = {}
+
+class FoodDeltaBatch(BaseModel):
+    """일괄 제출용 델타 목록"""
+    deltas: List[FoodDelta]
+
 class NutritionSummary(BaseModel):
     """Nutrition summary data model"""
     calories: dict
@@ -60,4 +74,5 @@ class RecommendResponse(BaseModel):
     """API response model for meal recommendations"""
     meals: List[List[FoodItem]]
     summary: NutritionSummary
-    fallback: bool
\ No newline at end of file
+    fallback: bool
+    relaxations: List[str] = []  # 후보가 부족해 완화한 조건 (적용 순서)
\ No newline at end of file
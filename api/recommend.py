@@ -2,58 +2,96 @@
 새로운 정제 데이터셋 기반 한국 음식 추천 시스템
 """
 
-import json
 import pandas as pd
 import numpy as np
-import os
-from typing import Dict, List, Any
-from settings import (
-    MEDICAL_CONDITIONS, DIETARY_RESTRICTIONS, 
-    DISEASE_RESTRICTIONS, DIET_RESTRICTIONS_RULES
+from typing import Dict, List, Any, Optional, Tuple
+from settings import MEDICAL_CONDITIONS, DIETARY_RESTRICTIONS
+from utils.candidate_cache import candidate_rows
+from utils.day_planner import daily_calorie_target
+from utils.food_catalog import FoodCatalog, build_catalog, get_catalog
+from utils.filter_plan import (
+    FilterPlan, Stage, allergy_stage, budget_stage, compile_recommender_plan,
+    dietary_stage, health_goal_stage, medical_stage
 )
+from utils.macro_index import macro_index, meal_macro_target
+from utils.scorers import Scorer, default_scorer
+from utils.top_k import top_k
+
+def meal_calories(user_profile: Dict) -> float:
+    """BMR·활동 수준·목표 기반 1끼 목표 칼로리 (하루 목표를 3끼로 나눔)"""
+    return daily_calorie_target(user_profile, user_profile.get('health_goal', '체중유지')) / 3
+
+
+class MealFitScorer(Scorer):
+    """KoreanFoodRecommender 기본 점수기: 1끼 목표 칼로리 적합도와 카탈로그 점수 결합"""
+    
+    name = 'meal_fit'
+    
+    @staticmethod
+    def calorie_score(catalog: FoodCatalog, rows: np.ndarray, user_profile: Dict) -> np.ndarray:
+        """칼로리 점수 (목표 칼로리와의 차이, 0~1)"""
+        target = meal_calories(user_profile)
+        calories = catalog.column('calories')[rows]
+        return np.clip(1 - np.abs(calories - target) / target, 0, 1)
+    
+    def score(self, catalog: FoodCatalog, rows: np.ndarray, user_profile: Dict) -> np.ndarray:
+        calorie_score = self.calorie_score(catalog, rows, user_profile)
+        
+        # 기존 점수와 결합 (점수 결측 시 칼로리 점수만 사용)
+        score = catalog.column('score')[rows]
+        return np.where(np.isnan(score), calorie_score, (score * 0.7) + (calorie_score * 0.3))
+
 
 class KoreanFoodRecommender:
     """새로운 정제 데이터 기반 AI 추천 시스템"""
     
-    def __init__(self):
-        """추천 시스템 초기화"""
-        self.food_data = None
+    def __init__(self, scorer: Optional[Scorer] = None):
+        """추천 시스템 초기화 (scorer가 없으면 FOOD_SCORER_MODEL 모델 또는 MealFitScorer)"""
+        self.scorer: Scorer = scorer or default_scorer() or MealFitScorer()
+        self.catalog: FoodCatalog = None
+        self.using_fallback = False
         self.load_food_data()
     
+    @property
+    def food_data(self) -> pd.DataFrame:
+        """현재 카탈로그의 DataFrame 뷰 (인덱스 = 카탈로그 행 번호)"""
+        return self.catalog.frame if self.catalog is not None else None
+    
+    def _rows(self, data: pd.DataFrame) -> np.ndarray:
+        """DataFrame 인덱스(카탈로그 행 번호)를 정수 배열로 반환"""
+        return data.index.to_numpy()
+    
+    def refresh_catalog(self) -> FoodCatalog:
+        """공유 카탈로그의 최신 버전으로 교체 (요청 단위로 고정해 사용)"""
+        if not self.using_fallback:
+            self.catalog = get_catalog()
+        return self.catalog
+    
     def load_food_data(self):
-        """오직 /data/정제 데이터.json 파일만 사용하는 고정된 로더"""
+        """오직 /data/정제 데이터.json 파일만 사용하는 공유 카탈로그 연결"""
         try:
-            # 고정된 단일 경로만 사용
-            file_path = 'data/정제 데이터.json'
-            
-            with open(file_path, 'r', encoding='utf-8') as f:
-                food_list = json.load(f)
-            
-            self.food_data = pd.DataFrame(food_list)
-            print(f"🍲 Streamlit 추천 엔진: /data/정제 데이터.json 로드 성공 ({len(food_list)}개 음식)")
+            catalog = get_catalog()
+            food_data = catalog.frame
+            print(f"🍲 Streamlit 추천 엔진: /data/정제 데이터.json 로드 성공 ({catalog.live_count}개 음식)")
             
             # 필수 컬럼 확인
             required_columns = ['id', 'name', 'calories', 'price', 'tags', 'allergies']
-            missing_columns = [col for col in required_columns if col not in self.food_data.columns]
+            missing_columns = [col for col in required_columns if col not in food_data.columns]
             if missing_columns:
                 raise KeyError(f"필수 컬럼이 누락되었습니다: {missing_columns}")
             
-            # 데이터 타입 변환
-            numeric_columns = ['calories', 'price', 'protein', 'fat', 'carbs', 'score', 'rating']
-            for col in numeric_columns:
-                if col in self.food_data.columns:
-                    self.food_data[col] = pd.to_numeric(self.food_data[col], errors='coerce')
-                    self.food_data[col].fillna(0, inplace=True)
-            
-            print(f"✅ 정제 데이터 로드 완료: {len(self.food_data)}개 항목")
+            self.catalog = catalog
+            self.using_fallback = False
+            print(f"✅ 정제 데이터 로드 완료: {len(food_data)}개 항목")
             
         except Exception as e:
             print(f"❌ 데이터 로드 실패: {e}")
-            self.food_data = self._create_fallback_data()
+            self.catalog = self._create_fallback_data()
+            self.using_fallback = True
     
-    def _create_fallback_data(self):
+    def _create_fallback_data(self) -> FoodCatalog:
         """데이터 로드 실패 시 최소한의 대체 데이터"""
-        return pd.DataFrame([
+        return build_catalog([
             {
                 'id': 'fallback-1',
                 'name': '기본 한식 정식',
@@ -69,150 +107,49 @@ class KoreanFoodRecommender:
                 'score': 0.8,
                 'rating': 4.0
             }
-        ])
+        ], version='fallback')
+    
+    def _apply_stage(self, data: pd.DataFrame, stage: Stage) -> pd.DataFrame:
+        """필터 단계 하나를 DataFrame 행에 적용 (개별 필터 메서드 하위 호환용)"""
+        if data is None or data.empty:
+            return data
+        return data.loc[FilterPlan((stage,)).rows(self.catalog, self._rows(data))]
     
     def filter_by_allergies(self, user_allergies: List[str]) -> pd.DataFrame:
         """알레르기 필터링"""
         if not user_allergies or self.food_data is None:
-            return self.food_data.copy()
-        
-        try:
-            def has_allergy_conflict(food_allergies):
-                if not isinstance(food_allergies, list):
-                    return False
-                return any(allergy in user_allergies for allergy in food_allergies)
-            
-            filtered_data = self.food_data[
-                ~self.food_data['allergies'].apply(has_allergy_conflict)
-            ]
-            
-            return filtered_data if not filtered_data.empty else self.food_data.copy()
-            
-        except Exception as e:
-            print(f"❌ 알레르기 필터링 오류: {e}")
-            return self.food_data.copy()
+            return self.food_data
+        return self._apply_stage(self.food_data, allergy_stage(user_allergies, match='exact', fallback=True))
     
     def filter_by_budget(self, data: pd.DataFrame, max_budget: int) -> pd.DataFrame:
         """예산 필터링"""
-        try:
-            if data is None or data.empty:
-                return data
-            
-            budget_filtered = data[data['price'] <= max_budget]
-            return budget_filtered if not budget_filtered.empty else data.copy()
-            
-        except Exception as e:
-            print(f"❌ 예산 필터링 오류: {e}")
-            return data.copy()
+        return self._apply_stage(data, budget_stage(max_budget, fallback=True))
     
     def filter_by_health_goal(self, data: pd.DataFrame, goal: str) -> pd.DataFrame:
         """건강 목표에 따른 필터링"""
-        try:
-            if data is None or data.empty:
-                return data
-            
-            def matches_goal(tags):
-                if not isinstance(tags, list):
-                    return True
-                
-                if goal == '체중감량':
-                    return any(tag in tags for tag in ['체중감량', '다이어트', '저염식', '키토'])
-                elif goal == '근육증가':
-                    return any(tag in tags for tag in ['고단백', '근육증가'])
-                else:  # 체중유지
-                    return any(tag in tags for tag in ['일반식', '체중감량', '고단백'])
-            
-            goal_filtered = data[data['tags'].apply(matches_goal)]
-            return goal_filtered if not goal_filtered.empty else data.copy()
-            
-        except Exception as e:
-            print(f"❌ 건강 목표 필터링 오류: {e}")
-            return data.copy()
+        return self._apply_stage(data, health_goal_stage(goal))
 
     def filter_by_medical_conditions(self, data: pd.DataFrame, conditions: List[str]) -> pd.DataFrame:
         """의학적 조건에 따른 필터링"""
-        try:
-            if data is None or data.empty or not conditions or "없음" in conditions:
-                return data
-            
-            filtered_data = data.copy()
-            
-            for condition in conditions:
-                if condition in DISEASE_RESTRICTIONS:
-                    restrictions = DISEASE_RESTRICTIONS[condition]
-                    
-                    # 금지 태그가 있는 음식 제외
-                    if 'forbidden_tags' in restrictions and 'tags' in filtered_data.columns:
-                        forbidden_tags = restrictions['forbidden_tags']
-                        
-                        def has_forbidden_tag(tags):
-                            if not isinstance(tags, list):
-                                return False
-                            return any(forbidden_tag in tags for forbidden_tag in forbidden_tags)
-                        
-                        filtered_data = filtered_data[~filtered_data['tags'].apply(has_forbidden_tag)]
-                    
-                    # 권장 태그가 있는 음식 우선순위 부여
-                    if 'recommended_tags' in restrictions and 'tags' in filtered_data.columns:
-                        recommended_tags = restrictions['recommended_tags']
-                        
-                        def has_recommended_tag(tags):
-                            if not isinstance(tags, list):
-                                return False
-                            return any(rec_tag in tags for rec_tag in recommended_tags)
-                        
-                        # 권장 음식을 앞쪽으로 정렬
-                        recommended_foods = filtered_data[filtered_data['tags'].apply(has_recommended_tag)]
-                        other_foods = filtered_data[~filtered_data['tags'].apply(has_recommended_tag)]
-                        filtered_data = pd.concat([recommended_foods, other_foods], ignore_index=True)
-            
-            return filtered_data if not filtered_data.empty else data.copy()
-            
-        except Exception as e:
-            print(f"❌ 의학적 조건 필터링 오류: {e}")
-            return data.copy()
+        if not conditions or "없음" in conditions:
+            return data
+        return self._apply_stage(data, medical_stage(conditions))
 
     def filter_by_dietary_restrictions(self, data: pd.DataFrame, restrictions: List[str]) -> pd.DataFrame:
         """식단 제한에 따른 필터링"""
-        try:
-            if data is None or data.empty or not restrictions or "없음" in restrictions:
-                return data
-            
-            filtered_data = data.copy()
-            
-            for restriction in restrictions:
-                if restriction in DIET_RESTRICTIONS_RULES:
-                    rules = DIET_RESTRICTIONS_RULES[restriction]
-                    
-                    # 금지 태그가 있는 음식 제외
-                    if 'forbidden_tags' in rules and 'tags' in filtered_data.columns:
-                        forbidden_tags = rules['forbidden_tags']
-                        
-                        def has_forbidden_tag(tags):
-                            if not isinstance(tags, list):
-                                return False
-                            return any(forbidden_tag in tags for forbidden_tag in forbidden_tags)
-                        
-                        filtered_data = filtered_data[~filtered_data['tags'].apply(has_forbidden_tag)]
-                    
-                    # 허용 태그만 포함하는 음식으로 제한 (더 엄격한 필터링)
-                    if 'allowed_tags' in rules and 'tags' in filtered_data.columns:
-                        allowed_tags = rules['allowed_tags']
-                        
-                        def has_allowed_tag(tags):
-                            if not isinstance(tags, list):
-                                return False
-                            return any(allowed_tag in tags for allowed_tag in allowed_tags)
-                        
-                        allowed_foods = filtered_data[filtered_data['tags'].apply(has_allowed_tag)]
-                        if not allowed_foods.empty:
-                            filtered_data = allowed_foods
-            
-            return filtered_data if not filtered_data.empty else data.copy()
-            
-        except Exception as e:
-            print(f"❌ 식단 제한 필터링 오류: {e}")
-            return data.copy()
+        if not restrictions or "없음" in restrictions:
+            return data
+        return self._apply_stage(data, dietary_stage(restrictions))
+    
+    def _meal_calories(self, user_profile: Dict) -> float:
+        """BMR·활동 수준·목표 기반 1끼 목표 칼로리"""
+        return meal_calories(user_profile)
+    
+    def _nutrition_scores(self, rows: np.ndarray, user_profile: Dict) -> Tuple[np.ndarray, np.ndarray]:
+        """행 번호 배열에 대한 (칼로리 점수, 최종 점수) 배열 (최종 점수는 설정된 점수기로 계산)"""
+        calorie_score = MealFitScorer.calorie_score(self.catalog, rows, user_profile)
+        final_score = self.scorer.score(self.catalog, rows, user_profile)
+        return calorie_score, final_score
     
     def calculate_nutrition_score(self, data: pd.DataFrame, user_profile: Dict) -> pd.DataFrame:
         """영양 점수 계산"""
@@ -220,45 +157,8 @@ class KoreanFoodRecommender:
             if data is None or data.empty:
                 return data
             
-            data_copy = data.copy()
-            
-            # 기본 BMR 계산
-            weight = user_profile.get('weight', 70)
-            height = user_profile.get('height', 170)
-            age = user_profile.get('age', 25)
-            gender = user_profile.get('gender', '남성')
-            
-            if gender == '남성':
-                bmr = 88.362 + (13.397 * weight) + (4.799 * height) - (5.677 * age)
-            else:
-                bmr = 447.593 + (9.247 * weight) + (3.098 * height) - (4.330 * age)
-            
-            # 활동 수준에 따른 칼로리 조정
-            activity_level = user_profile.get('activity_level', '보통')
-            activity_multiplier = {'낮음': 1.2, '보통': 1.55, '높음': 1.9}
-            target_calories = bmr * activity_multiplier.get(activity_level, 1.55)
-            
-            # 목표에 따른 칼로리 조정
-            goal = user_profile.get('health_goal', '체중유지')
-            if goal == '체중감량':
-                target_calories *= 0.8
-            elif goal == '근육증가':
-                target_calories *= 1.1
-            
-            # 식사 횟수로 나누기 (기본 3끼)
-            meal_calories = target_calories / 3
-            
-            # 칼로리 점수 계산 (목표 칼로리와의 차이)
-            data_copy['calorie_score'] = 1 - abs(data_copy['calories'] - meal_calories) / meal_calories
-            data_copy['calorie_score'] = data_copy['calorie_score'].clip(0, 1)
-            
-            # 기존 점수와 결합
-            if 'score' in data_copy.columns:
-                data_copy['final_score'] = (data_copy['score'] * 0.7) + (data_copy['calorie_score'] * 0.3)
-            else:
-                data_copy['final_score'] = data_copy['calorie_score']
-            
-            return data_copy
+            calorie_score, final_score = self._nutrition_scores(self._rows(data), user_profile)
+            return data.assign(calorie_score=calorie_score, final_score=final_score)
             
         except Exception as e:
             print(f"❌ 영양 점수 계산 오류: {e}")
@@ -267,50 +167,34 @@ class KoreanFoodRecommender:
     def recommend_meals(self, user_profile: Dict[str, Any], num_recommendations: int = 5) -> List[Dict]:
         """맞춤 식단 추천"""
         try:
-            if self.food_data is None or self.food_data.empty:
+            self.refresh_catalog()
+            if self.catalog is None or self.catalog.live_count == 0:
                 return []
             
-            # 1. 알레르기 필터링
-            filtered_data = self.filter_by_allergies(user_profile.get('allergies', []))
-            
-            # 2. 예산 필터링
-            budget = user_profile.get('budget_per_meal', 10000)
-            filtered_data = self.filter_by_budget(filtered_data, budget)
-            
-            # 3. 의학적 조건 필터링
-            medical_conditions = user_profile.get('medical_conditions', [])
-            filtered_data = self.filter_by_medical_conditions(filtered_data, medical_conditions)
-            
-            # 4. 식단 제한 필터링
-            dietary_restrictions = user_profile.get('dietary_restrictions', [])
-            filtered_data = self.filter_by_dietary_restrictions(filtered_data, dietary_restrictions)
-            
-            # 5. 건강 목표 필터링
-            goal = user_profile.get('health_goal', '체중유지')
-            filtered_data = self.filter_by_health_goal(filtered_data, goal)
+            # 1~5. 알레르기·예산·의학적 조건·식단 제한·건강 목표 필터를 하나의 마스크로 실행
+            # (같은 제약 조건의 결과는 후보 캐시에서 재사용)
+            rows = candidate_rows(self.catalog, user_profile, compile_recommender_plan)
             
             # 6. 영양 점수 계산
-            scored_data = self.calculate_nutrition_score(filtered_data, user_profile)
+            _, final_score = self._nutrition_scores(rows, user_profile)
             
-            # 5. 점수 순으로 정렬 및 상위 추천
-            if 'final_score' in scored_data.columns:
-                top_foods = scored_data.nlargest(num_recommendations, 'final_score')
-            else:
-                top_foods = scored_data.head(num_recommendations)
+            # 7. 점수 상위 추천만 선택 (전체 정렬 없이, 동점이면 필터 결과 순서 유지)
+            top = top_k(final_score, num_recommendations)
             
-            # 6. 결과를 딕셔너리 리스트로 변환
+            # 8. 결과를 딕셔너리 리스트로 변환
             recommendations = []
-            for _, food in top_foods.iterrows():
+            for row_id, score in zip(rows[top], final_score[top]):
+                food = self.catalog.record(row_id)
                 rec = {
                     'id': food.get('id', ''),
                     'name': food.get('name', ''),
-                    'calories': food.get('calories', 0),
-                    'price': food.get('price', 0),
-                    'protein': food.get('protein', 0),
-                    'category': food.get('category', ''),
+                    'calories': food.get('calories') or 0,
+                    'price': food.get('price') or 0,
+                    'protein': food.get('protein') or 0,
+                    'category': food.get('category') or '',
                     'tags': food.get('tags', []),
-                    'nutrition_score': food.get('final_score', 0),
-                    'rating': food.get('rating', 0)
+                    'nutrition_score': float(score),
+                    'rating': food.get('rating') or 0
                 }
                 recommendations.append(rec)
             
@@ -320,6 +204,42 @@ class KoreanFoodRecommender:
             print(f"❌ 추천 생성 오류: {e}")
             return []
     
+    def recommend_closest(self, user_profile: Dict[str, Any], num_recommendations: int = 5) -> List[Dict]:
+        """1끼 목표 영양소(BMR·활동 수준·목표 기반)에 가장 가까운 음식 추천 (KD-tree 최근접 검색)"""
+        try:
+            self.refresh_catalog()
+            if self.catalog is None or self.catalog.live_count == 0:
+                return []
+            
+            # 필터는 recommend_meals와 같은 계획·후보 캐시 사용
+            rows = candidate_rows(self.catalog, user_profile, compile_recommender_plan)
+            target = meal_macro_target(meal_calories(user_profile), user_profile.get('health_goal', '체중유지'))
+            neighbors = macro_index(self.catalog).query(target, num_recommendations, rows)
+            
+            recommendations = []
+            for row_id, distance in zip(neighbors.rows, neighbors.distances):
+                food = self.catalog.record(row_id)
+                recommendations.append({
+                    'id': food.get('id', ''),
+                    'name': food.get('name', ''),
+                    'calories': food.get('calories') or 0,
+                    'price': food.get('price') or 0,
+                    'protein': food.get('protein') or 0,
+                    'fat': food.get('fat') or 0,
+                    'carbs': food.get('carbs') or 0,
+                    'sodium': food.get('sodium') or 0,
+                    'category': food.get('category') or '',
+                    'tags': food.get('tags', []),
+                    'macro_distance': float(distance),
+                    'rating': food.get('rating') or 0
+                })
+            
+            return recommendations
+            
+        except Exception as e:
+            print(f"❌ 최근접 추천 생성 오류: {e}")
+            return []
+    
     def get_nutrition_summary(self, recommendations: List[Dict], user_profile: Dict) -> Dict:
         """영양 요약 정보 계산"""
         try:
@@ -4,6 +4,7 @@ import numpy as np
 import json
 from typing import Dict, List, Any
 import os
+import uuid
 import plotly.express as px
 import plotly.graph_objects as go
 
@@ -12,7 +13,7 @@ from utils.validators import validate_form_data, validate_medical_conditions, va
 from utils.session_manager import SessionManager
 from settings import (
     MIN_AGE, MAX_AGE, MIN_HEIGHT, MAX_HEIGHT, MIN_WEIGHT, MAX_WEIGHT,
-    MIN_BUDGET, MAX_BUDGET, DEFAULT_BUDGET, MEDICAL_CONDITIONS, DIETARY_RESTRICTIONS
+    MIN_BUDGET, MAX_BUDGET, DEFAULT_BUDGET, MEDICAL_CONDITIONS, DIETARY_RESTRICTIONS, ACTIVITY_LEVEL_MAP
 )
 
 # 페이지 설정
@@ -65,6 +66,18 @@ def get_session_value(key: str, default=None):
     """세션 값을 안전하게 가져오기"""
     return st.session_state.get(key, default)
 
+def get_user_id() -> str:
+    """별점 개인화용 사용자 id (세션이 바뀌어도 유지)
+    
+    저장된 프로필의 user_id를 쓰고, 없으면 URL의 uid 쿼리 파라미터 (처음이면 생성해 URL에 기록하므로 새로고침/북마크해도 같은 id)
+    """
+    user_id = get_session_value('user_profile', {}).get('user_id')
+    if user_id:
+        return user_id
+    if not st.query_params.get('uid'):
+        st.query_params['uid'] = uuid.uuid4().hex
+    return st.query_params['uid']
+
 def set_session_value(key: str, value):
     """세션 값을 안전하게 설정"""
     try:
@@ -182,6 +195,13 @@ def render_input_page():
         st.subheader("개인 정보")
         st.write("정확한 영양소 추천을 위해 신체 정보를 입력해주세요.")
         
+        # 사용자 ID (별점 기록이 다음 방문과 다른 기기에서도 이어지도록)
+        user_id = st.text_input(
+            "사용자 ID",
+            value=get_user_id(),
+            help="별점 기록을 이어서 쓰려면 다음에도 같은 ID를 입력하세요."
+        )
+        
         # 성별 (라디오 버튼)
         gender = st.radio(
             "성별",
@@ -398,6 +418,7 @@ def render_input_page():
                 try:
                     # 사용자 프로필 구성
                     user_profile = {
+                        'user_id': user_id.strip() or get_user_id(),
                         'gender': gender,
                         'age': age,
                         'height': height,
@@ -457,6 +478,36 @@ def user_input_page():
     """호환성을 위한 래퍼 함수"""
     render_input_page()
 
+def build_recommend_profile(user_profile: Dict[str, Any]) -> Dict[str, Any]:
+    """입력 페이지 프로필 → utils/recommender.py의 recommend 함수 프로필 형식"""
+    return {
+        'gender': '남성' if user_profile.get('gender') == '남성' else '여성',
+        'age': user_profile.get('age', 25),
+        'height': user_profile.get('height', 170),
+        'weight': user_profile.get('weight', 70),
+        'goal': '체중감량' if user_profile.get('main_goal') == '체중 감량' else '근육증가' if user_profile.get('main_goal') == '근육 증가' else '체중유지',
+        'activity_level': ACTIVITY_LEVEL_MAP.get(user_profile.get('activity_level'), user_profile.get('activity_level', '보통')),
+        'budget': user_profile.get('daily_budget', 10000) / 3,  # 1끼 예산
+        'daily_budget': user_profile.get('daily_budget', 10000),  # 하루 식단 최적화의 하루 비용 상한
+        'allergies': user_profile.get('allergies', []),
+        'preferences': ['단백질 위주', '간편식'],
+        'diseases': [],
+        'user_id': user_profile.get('user_id') or get_user_id()  # 별점 개인화 (세션이 바뀌어도 같은 id)
+    }
+
+def record_rating(rating_key: str, food: Dict[str, Any]):
+    """별점 변경 시 피드백 저장소에 기록 (다음 추천부터 개인화 점수에 반영, 프로필 특성은 모델 학습용)"""
+    try:
+        from utils.feedback_store import get_feedback_store
+        food_id = food.get('id')
+        if food_id:
+            get_feedback_store().record(
+                get_user_id(), food_id, int(st.session_state[rating_key]),
+                build_recommend_profile(get_session_value('user_profile', {}))
+            )
+    except Exception as e:
+        st.session_state['error_logs'].append(f"별점 저장 실패: {e}")
+
 def render_recommendation_page():
     """🍱 개인 맞춤 AI 식단 추천 페이지"""
     st.title("🍱 개인 맞춤 AI 식단 추천")
@@ -482,17 +533,7 @@ def render_recommendation_page():
             from utils.recommender import recommend
             
             # 사용자 프로필을 추천 함수 형식에 맞게 변환
-            profile_for_recommend = {
-                'gender': '남성' if user_profile.get('gender') == '남성' else '여성',
-                'age': user_profile.get('age', 25),
-                'height': user_profile.get('height', 170),
-                'weight': user_profile.get('weight', 70),
-                'goal': '체중감량' if user_profile.get('main_goal') == '체중 감량' else '근육증가' if user_profile.get('main_goal') == '근육 증가' else '체중유지',
-                'budget': user_profile.get('daily_budget', 10000) / 3,  # 1끼 예산
-                'allergies': user_profile.get('allergies', []),
-                'preferences': ['단백질 위주', '간편식'],
-                'diseases': []
-            }
+            profile_for_recommend = build_recommend_profile(user_profile)
             
             # AI 추천 실행 (끼니별 2-3개씩)
             meal_recommendations = recommend(profile_for_recommend)
@@ -575,7 +616,9 @@ def render_recommendation_page():
                                 index=2,  # 기본값 3점
                                 key=rating_key,
                                 horizontal=True,
-                                label_visibility="collapsed"
+                                label_visibility="collapsed",
+                                on_change=record_rating,  # 사용자가 바꾼 별점만 피드백 저장소에 기록
+                                args=(rating_key, food)
                             )
                             
                             # 평점 세션에 저장
@@ -598,7 +641,7 @@ def render_recommendation_page():
             from utils.nutrition_visualizer import calculate_nutrition_summary, create_nutrition_bar_chart, create_nutrition_radar_chart
             
             # 영양소 요약 계산
-            nutrition_summary = calculate_nutrition_summary(recommendations, profile_for_recommend)
+            nutrition_summary = calculate_nutrition_summary(recommendations, build_recommend_profile(user_profile))
             
             # 시각화 표시
             vis_col1, vis_col2 = st.columns(2)
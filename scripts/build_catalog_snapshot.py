@@ -0,0 +1,45 @@
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.food_catalog import DATA_PATH, load_json_catalog
+from utils.catalog_snapshot import SNAPSHOT_DIR, load_snapshot, save_snapshot
+from api.korean_food_loader import validate_food_records
+
+def main():
+    start = time.perf_counter()
+    catalog = load_json_catalog(DATA_PATH)
+    json_seconds = time.perf_counter() - start
+
+    # 스키마 검증 (strict: 기존 행 단위 방식, batch: 일괄 검증)
+    _, strict_report = validate_food_records(catalog.records, 'strict')
+    _, batch_report = validate_food_records(catalog.records, 'batch')
+    for error in batch_report.errors:
+        print(f"Invalid food at row {error['row']} ({error['name']}): {error['errors']}")
+    validated = not batch_report.errors
+
+    path = save_snapshot(catalog, SNAPSHOT_DIR, validated=validated)
+
+    start = time.perf_counter()
+    snapshot = load_snapshot(DATA_PATH, SNAPSHOT_DIR)
+    snapshot_seconds = time.perf_counter() - start
+
+    if snapshot is None or snapshot.version != catalog.version or len(snapshot) != len(catalog):
+        raise SystemExit("Snapshot verification failed")
+
+    records = snapshot.records
+    _, trusted_report = validate_food_records(records, 'trusted')
+
+    print(f"Saved {len(catalog)} foods to {path}")
+    print(f"Content hash: {catalog.version} (validated: {validated})")
+    print(f"Load time: JSON {json_seconds * 1000:.1f} ms -> snapshot {snapshot_seconds * 1000:.1f} ms")
+    print(
+        f"Validation time: strict {strict_report.seconds * 1000:.1f} ms, "
+        f"batch {batch_report.seconds * 1000:.1f} ms, "
+        f"trusted {trusted_report.seconds * 1000:.1f} ms"
+    )
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.batch_recommender import recommend_batch
+from utils.recommender import recommend
+from utils.scorers import SklearnScorer
+
+ALLERGIES = ['우유', '계란', '땅콩', '새우', '밀', '대두']
+DISEASES = ['고혈압', '당뇨']
+
+
+def random_profiles(count, seed):
+    """일괄/단건 비교용 무작위 프로필 (목표, 활동 수준, 예산, 알레르기, 질환 조합)"""
+    rng = random.Random(seed)
+    profiles = []
+    for i in range(count):
+        profile = {
+            'user_id': f"u{i % 40}",
+            'age': rng.randint(20, 65),
+            'gender': rng.choice(['남성', '여성']),
+            'height': rng.randint(150, 190),
+            'weight': rng.randint(45, 100),
+            'activity_level': rng.choice(['낮음', '보통', '높음']),
+            'goal': rng.choice(['체중감량', '근육증가', '체중유지']),
+            'budget': rng.choice([5000, 8000, 12000, 20000, None]),
+            'allergies': rng.sample(ALLERGIES, rng.randint(0, 2)),
+            'diseases': rng.sample(DISEASES, rng.randint(0, 1)),
+            'preferences': rng.sample(['단백질 위주', '간편식'], rng.randint(0, 2)),
+            # 시간 제한은 부하에 따라 결과가 달라지므로 끄고 노드 수 제한만 적용 (결정적 비교)
+            'plan_time_limit': None,
+        }
+        if rng.random() < 0.5:
+            profile['daily_budget'] = rng.choice([20000, 30000, 45000])
+        profiles.append(profile)
+    return profiles
+
+
+def main():
+    parser = argparse.ArgumentParser(description="recommend_batch()와 프로필별 recommend() 결과가 같은지 확인")
+    parser.add_argument('--profiles', type=int, default=150, help="비교할 프로필 수")
+    parser.add_argument('--seed', type=int, default=1, help="프로필 생성 시드")
+    parser.add_argument('--model', default=None, help="사용할 점수 모델 경로 (joblib, 없으면 기본 점수기)")
+    args = parser.parse_args()
+
+    profiles = random_profiles(args.profiles, args.seed)
+    scorer = SklearnScorer(args.model) if args.model else None
+    with contextlib.redirect_stdout(io.StringIO()):
+        # 첫 호출의 카탈로그/캐시 준비 시간은 측정에서 제외
+        recommend(dict(profiles[0]), scorer=scorer)
+        start = time.perf_counter()
+        single = [recommend(dict(profile), scorer=scorer) for profile in profiles]
+        single_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        batch = recommend_batch([dict(profile) for profile in profiles], scorer=scorer)
+        batch_seconds = time.perf_counter() - start
+
+    def dump(result):
+        return json.dumps(result, sort_keys=True, ensure_ascii=False, default=float)
+
+    mismatched = [i for i, (a, b) in enumerate(zip(single, batch)) if dump(a) != dump(b)]
+    print(f"Compared {len(profiles)} profiles: {len(mismatched)} mismatched")
+    print(f"recommend() x {len(profiles)}: {single_seconds:.2f}s, recommend_batch(): {batch_seconds:.2f}s")
+    for i in mismatched[:10]:
+        print(f"  profile {i}: {json.dumps(profiles[i], ensure_ascii=False)}")
+    sys.exit(1 if mismatched else 0)
+
+
+if __name__ == '__main__':
+    main()
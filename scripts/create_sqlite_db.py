@@ -1,10 +1,28 @@
-import json
 import sqlite3
 import os
+import sys
+from itertools import islice
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.catalog_stream import iter_file_records
 
 DATA_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', '정제 데이터.json')
 DB_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'foods.db')
 
+# 정규화된 리스트 필드 테이블: (테이블명, 값 컬럼명, JSON 필드명), position으로 원래 순서 보존
+LIST_TABLES = [
+    ('food_tags', 'tag', 'tags'),
+    ('food_allergies', 'allergy', 'allergies'),
+    ('food_ingredients', 'ingredient', 'ingredients'),
+]
+
+# 한 번에 삽입하는 레코드 수 (대용량 파일도 메모리 사용량 일정)
+BATCH_SIZE = 10000
+
+# 범위 필터에 사용하는 컬럼 인덱스
+INDEXED_COLUMNS = ['price', 'calories', 'protein', 'sodium', 'sugar', 'type']
+
 def create_table(cur):
     cur.execute('''
     CREATE TABLE IF NOT EXISTS foods (
@@ -36,52 +54,99 @@ def create_table(cur):
         brand TEXT
     )
     ''')
+    for table, column, _ in LIST_TABLES:
+        cur.execute(f'''
+        CREATE TABLE IF NOT EXISTS {table} (
+            food_id TEXT NOT NULL REFERENCES foods(id) ON DELETE CASCADE,
+            position INTEGER NOT NULL,
+            {column} TEXT NOT NULL,
+            PRIMARY KEY (food_id, position)
+        ) WITHOUT ROWID
+        ''')
+        cur.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_{column} ON {table} ({column}, food_id)')
+    for column in INDEXED_COLUMNS:
+        cur.execute(f'CREATE INDEX IF NOT EXISTS idx_foods_{column} ON foods ({column})')
 
-def load_data():
-    with open(DATA_FILE, 'r', encoding='utf-8') as f:
-        return json.load(f)
+def load_data(path=DATA_FILE):
+    """JSON 배열/JSON Lines 레코드를 하나씩 읽기"""
+    return iter_file_records(path)
 
-def main():
-    conn = sqlite3.connect(DB_FILE)
-    cur = conn.cursor()
-    create_table(cur)
+def iter_batches(records, size=BATCH_SIZE):
+    records = iter(records)
+    while True:
+        batch = list(islice(records, size))
+        if not batch:
+            return
+        yield batch
+
+def food_row(item):
+    return (
+        item.get('id'),
+        item.get('name'),
+        item.get('type'),
+        item.get('category'),
+        item.get('cuisine'),
+        item.get('calories'),
+        item.get('protein'),
+        item.get('fat'),
+        item.get('carbs'),
+        item.get('sodium'),
+        item.get('sugar'),
+        item.get('fiber'),
+        item.get('saturatedFat'),
+        item.get('cholesterol'),
+        item.get('transFat'),
+        item.get('calcium'),
+        item.get('iron'),
+        item.get('vitaminC'),
+        ','.join(item.get('ingredients', [])),
+        ','.join(item.get('tags', [])),
+        ','.join(item.get('allergies', [])),
+        item.get('price'),
+        item.get('score'),
+        item.get('popularity'),
+        item.get('rating'),
+        item.get('brand')
+    )
 
-    foods = load_data()
-    for item in foods:
-        cur.execute(
-            '''INSERT OR REPLACE INTO foods VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)''',
+def insert_foods(cur, foods):
+    """음식 목록과 정규화된 태그/알레르기/재료 행을 일괄 삽입"""
+    foods = list(foods)
+    cur.executemany(
+        '''INSERT OR REPLACE INTO foods VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)''',
+        (food_row(item) for item in foods)
+    )
+    for table, column, field in LIST_TABLES:
+        cur.executemany(
+            f'DELETE FROM {table} WHERE food_id = ?',
+            ((item.get('id'),) for item in foods)
+        )
+        cur.executemany(
+            f'INSERT INTO {table} (food_id, position, {column}) VALUES (?, ?, ?)',
             (
-                item.get('id'),
-                item.get('name'),
-                item.get('type'),
-                item.get('category'),
-                item.get('cuisine'),
-                item.get('calories'),
-                item.get('protein'),
-                item.get('fat'),
-                item.get('carbs'),
-                item.get('sodium'),
-                item.get('sugar'),
-                item.get('fiber'),
-                item.get('saturatedFat'),
-                item.get('cholesterol'),
-                item.get('transFat'),
-                item.get('calcium'),
-                item.get('iron'),
-                item.get('vitaminC'),
-                ','.join(item.get('ingredients', [])),
-                ','.join(item.get('tags', [])),
-                ','.join(item.get('allergies', [])),
-                item.get('price'),
-                item.get('score'),
-                item.get('popularity'),
-                item.get('rating'),
-                item.get('brand')
+                (item.get('id'), position, value)
+                for item in foods for position, value in enumerate(item.get(field, []))
             )
         )
+    return len(foods)
+
+def write_database(records, db_file=DB_FILE):
+    """레코드 이터러블을 배치 단위로 SQLite에 저장하고 저장 건수 반환"""
+    conn = sqlite3.connect(db_file)
+    cur = conn.cursor()
+    create_table(cur)
+
+    count = 0
+    for batch in iter_batches(records):
+        count += insert_foods(cur, batch)
+    cur.execute('ANALYZE')
     conn.commit()
     conn.close()
-    print(f"Saved {len(foods)} foods to {DB_FILE}")
+    return count
+
+def main():
+    count = write_database(load_data())
+    print(f"Saved {count} foods to {DB_FILE}")
 
 if __name__ == '__main__':
     main()
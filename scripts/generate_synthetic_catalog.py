@@ -0,0 +1,193 @@
+"""
+규모 테스트용 합성 음식 카탈로그 생성기
+data/정제 데이터.json 의 스키마와 값 분포(필드 범위, 소수 자릿수, 타입/태그/알레르기/재료 조합,
+타입별 브랜드 비율)를 그대로 따라 원하는 개수(1만~1000만)의 음식을 생성
+
+사용 예
+    python scripts/generate_synthetic_catalog.py --count 100000 --output data/synthetic_100k
+    python scripts/generate_synthetic_catalog.py --count 10000000 --format jsonl sqlite --output /tmp/foods_10m
+
+생성 결과는 <output>.json / <output>.jsonl / <output>.db 로 저장되며,
+FOOD_CATALOG_PATH=<output>.json 으로 지정하면 recommend()와 /api/recommend 가 합성 카탈로그를 사용
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from collections import Counter, defaultdict
+from functools import reduce
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.catalog_stream import iter_file_records
+from create_sqlite_db import DATA_FILE, write_database
+
+# 한 번에 난수를 뽑는 레코드 수
+BATCH_SIZE = 50000
+
+# 원본 값에 곱하는 로그정규 잡음의 표준편차 (원본 범위로 잘라냄)
+NOISE_SIGMA = 0.12
+
+NUMERIC_FIELDS = [
+    'calories', 'protein', 'fat', 'carbs', 'sodium', 'sugar', 'fiber',
+    'saturatedFat', 'cholesterol', 'transFat', 'calcium', 'iron', 'vitaminC',
+    'price', 'score', 'popularity', 'rating'
+]
+
+
+def _decimals(value):
+    text = repr(float(value))
+    return 0 if text.endswith('.0') else len(text.split('.')[1])
+
+
+class CatalogProfile:
+    """원본 카탈로그에서 추출한 값 분포"""
+
+    def __init__(self, records):
+        self.templates = records
+
+        # 필드별 범위, 정수 여부, 소수 자릿수, 정수 단위(가격 100원 단위 등)
+        self.fields = {}
+        for field in NUMERIC_FIELDS:
+            values = [r[field] for r in records if isinstance(r.get(field), (int, float))]
+            if not values:
+                continue
+            integer = all(isinstance(v, int) for v in values)
+            self.fields[field] = {
+                'min': min(values),
+                'max': max(values),
+                'integer': integer,
+                'decimals': 0 if integer else max(_decimals(v) for v in values),
+                'step': (reduce(math.gcd, values) or 1) if integer else 1,
+                'values': np.asarray([r.get(field, np.nan) if isinstance(r.get(field), (int, float)) else np.nan
+                                      for r in records], dtype=np.float64)
+            }
+
+        # 타입별 브랜드 누적 비율, 브랜드 접두사를 뗀 기본 이름
+        brands_by_type = defaultdict(Counter)
+        for r in records:
+            brands_by_type[r.get('type')][r.get('brand')] += 1
+        self.brands = {
+            food_type: (list(counter), np.cumsum(list(counter.values())) / sum(counter.values()))
+            for food_type, counter in brands_by_type.items()
+        }
+        self.base_names = []
+        for r in records:
+            name, brand = r.get('name', ''), r.get('brand') or ''
+            self.base_names.append(name[len(brand):].strip() if brand and name.startswith(brand) else name)
+
+    @classmethod
+    def from_file(cls, path):
+        return cls(list(iter_file_records(path)))
+
+    def sample_field(self, rng, field, templates):
+        spec = self.fields[field]
+        # 템플릿 값에 곱하는 잡음이므로 원본이 0인 값(트랜스지방 등)은 그대로 0
+        values = spec['values'][templates] * rng.lognormal(0.0, NOISE_SIGMA, len(templates))
+        values = np.clip(values, spec['min'], spec['max'])
+        if spec['integer']:
+            values = np.round(values / spec['step']) * spec['step']
+        else:
+            values = np.round(values, spec['decimals'])
+        return values
+
+    def generate(self, count, seed=42):
+        """합성 레코드를 하나씩 생성 (메모리에 전체를 올리지 않음)"""
+        rng = np.random.default_rng(seed)
+        width = max(8, len(str(count)))
+        for start in range(0, count, BATCH_SIZE):
+            size = min(BATCH_SIZE, count - start)
+            # 원본 레코드를 템플릿으로 균등 추출 → 타입/태그/알레르기/재료 조합 분포 유지
+            templates = rng.integers(0, len(self.templates), size)
+            columns = {field: self.sample_field(rng, field, templates) for field in self.fields}
+            picks = rng.random(size)
+
+            for i in range(size):
+                template = self.templates[templates[i]]
+                brands, cumulative = self.brands[template.get('type')]
+                brand = brands[min(int(np.searchsorted(cumulative, picks[i], side='right')), len(brands) - 1)]
+                record = {
+                    'id': f"syn-{start + i:0{width}d}",
+                    'name': f"{brand} {self.base_names[templates[i]]}" if brand else self.base_names[templates[i]],
+                    'type': template.get('type'),
+                    'category': template.get('category'),
+                    'cuisine': template.get('cuisine'),
+                }
+                for field in NUMERIC_FIELDS:
+                    if field in columns:
+                        value = columns[field][i]
+                        if np.isnan(value):
+                            continue
+                        record[field] = int(value) if self.fields[field]['integer'] else float(value)
+                record['ingredients'] = list(template.get('ingredients', []))
+                record['tags'] = list(template.get('tags', []))
+                record['allergies'] = list(template.get('allergies', []))
+                record['brand'] = brand
+                # 원본과 같은 필드 순서로 정렬
+                yield {key: record[key] for key in template if key in record}
+
+
+def write_json(records, path):
+    count = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('[\n')
+        for record in records:
+            if count:
+                f.write(',\n')
+            f.write(json.dumps(record, ensure_ascii=False))
+            count += 1
+        f.write('\n]\n')
+    return count
+
+
+def write_jsonl(records, path):
+    count = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            count += 1
+    return count
+
+
+def write_sqlite(records, path):
+    if os.path.exists(path):
+        os.remove(path)
+    return write_database(records, path)
+
+
+WRITERS = {
+    'json': ('.json', write_json),
+    'jsonl': ('.jsonl', write_jsonl),
+    'sqlite': ('.db', write_sqlite),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="정제 데이터 분포를 따르는 합성 음식 카탈로그 생성")
+    parser.add_argument('--count', type=int, default=10000, help="생성할 음식 수")
+    parser.add_argument('--format', nargs='+', choices=list(WRITERS), default=['json'], help="출력 형식 (여러 개 가능)")
+    parser.add_argument('--output', default=os.path.join(os.path.dirname(DATA_FILE), 'synthetic_catalog'),
+                        help="출력 경로 (확장자 제외)")
+    parser.add_argument('--source', default=DATA_FILE, help="분포를 추출할 원본 카탈로그")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    profile = CatalogProfile.from_file(args.source)
+    print(f"📊 원본 {len(profile.templates)}개 음식에서 분포 추출")
+
+    for name in args.format:
+        extension, writer = WRITERS[name]
+        path = args.output + extension
+        start = time.perf_counter()
+        # 같은 시드로 다시 생성하므로 모든 형식의 내용이 동일
+        count = writer(profile.generate(args.count, args.seed), path)
+        print(f"✅ {name}: {count}개 음식 → {path} ({time.perf_counter() - start:.1f}s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.model_selection import GroupKFold, cross_val_score
+
+from utils.feedback_store import FEEDBACK_PATH, read_feedback
+from utils.food_catalog import get_catalog
+from utils.scorers import (
+    DEFAULT_MODEL_PATH, FEATURE_COLUMNS, PROFILE_FEATURES, feature_matrix, load_model, model_inputs
+)
+
+# 학습에 필요한 최소 별점 수
+MIN_RATINGS = 50
+
+
+def load_training_set(catalog, path):
+    """별점 기록 → (모델 입력, 목표 0~1, 사용자 id) (사용자·음식별 마지막 별점, 프로필 스냅샷이 있는 항목만)"""
+    latest = {}
+    for entry in read_feedback(path):
+        profile = entry.get('profile')
+        if profile and all(name in profile for name in PROFILE_FEATURES):
+            latest[(entry['user'], entry['food'])] = entry
+
+    rows, profiles, ratings, users = [], [], [], []
+    for (user_id, food_id), entry in latest.items():
+        row = catalog.row_of(food_id)
+        if row is None:
+            continue
+        rows.append(row)
+        profiles.append([entry['profile'][name] for name in PROFILE_FEATURES])
+        ratings.append(entry['rating'])
+        users.append(user_id)
+
+    features = model_inputs(feature_matrix(catalog)[np.asarray(rows, dtype=np.int64)],
+                            np.asarray(profiles, dtype=np.float32).reshape(-1, len(PROFILE_FEATURES)))
+    # 별점 1~5 → 적합도 0~1
+    target = (np.asarray(ratings, dtype=np.float32) - 1) / 4
+    return features, target, np.asarray(users)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="사용자 별점으로 음식 적합도(프로필별) 예측 모델 학습")
+    parser.add_argument('--feedback', default=FEEDBACK_PATH, help="별점 기록 파일 (JSONL)")
+    parser.add_argument('--output', default=DEFAULT_MODEL_PATH, help="모델 저장 경로 (joblib)")
+    parser.add_argument('--trees', type=int, default=200, help="랜덤 포레스트 트리 수")
+    args = parser.parse_args()
+
+    catalog = get_catalog()
+    features, target, users = load_training_set(catalog, args.feedback)
+    if len(target) < MIN_RATINGS:
+        print(f"Not enough ratings with profile snapshots in {args.feedback}: {len(target)} < {MIN_RATINGS}")
+        sys.exit(1)
+
+    model = RandomForestRegressor(n_estimators=args.trees, min_samples_leaf=3, random_state=0, n_jobs=-1)
+    # 같은 사용자의 별점이 학습/검증에 나뉘지 않도록 사용자 단위로 교차 검증
+    folds = min(5, len(np.unique(users)))
+    if folds >= 2:
+        scores = cross_val_score(model, features, target, groups=users, cv=GroupKFold(n_splits=folds), scoring='r2')
+        print(f"User-grouped {folds}-fold R^2: {scores.mean():.3f} (+/- {scores.std():.3f})")
+
+    start = time.perf_counter()
+    model.fit(features, target)
+    seconds = time.perf_counter() - start
+
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    joblib.dump(model, args.output)
+    loaded = load_model(args.output)
+
+    print(f"Trained on {len(target)} ratings from {len(np.unique(users))} users, fit {seconds * 1000:.1f} ms")
+    print(f"Features: {FEATURE_COLUMNS + PROFILE_FEATURES}")
+    print(f"Saved model version {loaded.version} to {args.output}")
+    print(f"Use it with: FOOD_SCORER_MODEL={args.output}")
+
+
+if __name__ == '__main__':
+    main()
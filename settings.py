@@ -20,6 +20,9 @@ MAX_HEIGHT = 250
 MIN_WEIGHT = 30
 MAX_WEIGHT = 250
 
+# 입력 페이지 활동 수준 → 추천 프로필 활동 수준 (utils/day_planner.py ACTIVITY_MULTIPLIERS 키, 이미 낮음/보통/높음이면 그대로)
+ACTIVITY_LEVEL_MAP = {"운동 없음": "낮음", "주 1~2회": "보통", "주 3~5회": "보통", "매일": "높음"}
+
 # 선택 제한 상수
 MAX_ALLERGIES = 7
 MAX_PREFERENCES = 5
@@ -66,30 +69,43 @@ DISEASE_RESTRICTIONS = {
     "당뇨병": {
         "forbidden_nutrients": ["고당류", "단순당"],
         "forbidden_tags": ["당분높음", "달콤한", "설탕많음"],
-        "recommended_tags": ["저당", "무설탕", "당뇨적합"]
+        "recommended_tags": ["저당", "무설탕", "당뇨적합"],
+        "daily_limits": {"sugar": 25}  # 하루 당류 25g 이하
     },
     "고혈압": {
         "forbidden_nutrients": ["나트륨", "염분"],
         "forbidden_tags": ["짠맛", "염분높음", "간장많음"],
-        "recommended_tags": ["저염", "무염", "저나트륨"]
+        "recommended_tags": ["저염", "무염", "저나트륨"],
+        "daily_limits": {"sodium": 2000}  # 하루 나트륨 2000mg 이하
     },
     "고지혈증": {
         "forbidden_nutrients": ["포화지방", "트랜스지방"],
         "forbidden_tags": ["기름많음", "튀김", "고지방"],
-        "recommended_tags": ["저지방", "올리브오일", "견과류"]
+        "recommended_tags": ["저지방", "올리브오일", "견과류"],
+        "daily_limits": {"saturatedFat": 15, "cholesterol": 200}  # 하루 포화지방 15g, 콜레스테롤 200mg 이하
     },
     "신장질환": {
         "forbidden_nutrients": ["인", "칼륨", "단백질"],
         "forbidden_tags": ["단백질높음", "유제품", "견과류"],
-        "recommended_tags": ["저단백", "저인", "저칼륨"]
+        "recommended_tags": ["저단백", "저인", "저칼륨"],
+        "daily_limits": {"sodium": 2000}
     },
     "간질환": {
         "forbidden_nutrients": ["지방", "나트륨"],
         "forbidden_tags": ["기름진", "술", "자극적"],
-        "recommended_tags": ["담백한", "저지방", "간건강"]
+        "recommended_tags": ["담백한", "저지방", "간건강"],
+        "daily_limits": {"sodium": 2000}
+    },
+    "심장질환": {
+        "daily_limits": {"sodium": 2000, "saturatedFat": 15, "cholesterol": 200}
     }
 }
 
+# 질환 이름 별칭 (utils.recommender 프로필의 diseases 값 → DISEASE_RESTRICTIONS 키)
+DISEASE_ALIASES = {
+    "당뇨": "당뇨병"
+}
+
 # 식단 제한별 필터링 규칙
 DIET_RESTRICTIONS_RULES = {
     "채식주의": {
@@ -110,6 +126,64 @@ DIET_RESTRICTIONS_RULES = {
     }
 }
 
+# 알레르기/재료 동의어 분류 (대표어: 동의어 목록)
+# 카탈로그 어휘와 사용자 입력은 NFC·소문자로 정규화한 뒤, SYNONYM_FIELDS 필드에서만 이 분류로 같은 그룹끼리 매칭
+# (태그는 정규화만 하고 동의어로 넓히지 않음: 질환/식단/목표 태그 규칙은 적힌 태그 그대로 적용)
+TERM_SYNONYMS = {
+    "유제품": ["우유", "치즈", "버터", "크림치즈", "요거트", "milk", "dairy"],
+    "계란": ["달걀", "달걀 흰자", "달걀 노른자", "난류", "egg"],
+    "대두": ["대두(콩)", "콩", "두부", "soy", "soybean"],
+    "밀": ["밀가루", "글루텐", "wheat", "gluten"],
+    "갑각류": ["새우", "꽃게", "게살", "랍스터", "shrimp", "crab"],
+    "견과류": ["땅콩", "호두", "아몬드", "잣", "peanut", "nuts"],
+    "어류": ["생선", "연어", "고등어", "멸치", "참치", "fish"],
+    "돼지고기": ["돈육", "pork"],
+    "닭고기": ["계육", "chicken"],
+    "소고기": ["쇠고기", "우육", "beef"]
+}
+SYNONYM_FIELDS = ('allergies', 'ingredients')
+
+# 건강 목표별 우선 태그 (해당 태그가 있는 음식으로 후보 제한)
+HEALTH_GOAL_TAGS = {
+    "체중감량": ["체중감량", "다이어트", "저염식", "키토"],
+    "근육증가": ["고단백", "근육증가"],
+    "체중유지": ["일반식", "체중감량", "고단백"]
+}
+
+# 선호도별 가산점 (utils/recommender.py): 태그(부분 일치) 또는 음식 타입 중 하나라도 해당하면 weight 가산
+PREFERENCE_FEATURES = {
+    "단백질 위주": {"tags": ["고단백"], "weight": 0.2},
+    "간편식": {"types": ["도시락", "즉석밥", "간편식"], "weight": 0.15},
+    "저염식": {"tags": ["저염식"], "weight": 0.2}
+}
+
+# 필터 후보 캐시 (utils/candidate_cache.py): 최대 항목 수, 항목 유효 시간(초)
+CANDIDATE_CACHE_SIZE = 512
+CANDIDATE_CACHE_TTL = 300
+
+# 일괄 추천 (utils/batch_recommender.py): 프로필 × 음식 행렬 한 번에 처리할 최대 원소 수
+BATCH_MAX_CELLS = 16_000_000
+
+# 후보가 부족할 때 예산 완화 비율 (utils/relaxation.py, 예산 +10%)
+BUDGET_RELAXATION_RATE = 0.1
+
+# 별점 개인화 (utils/feedback_store.py): 내 별점/전체 보정 평균 가중치, 보정에 더하는 중립(3점) 평가 수
+FEEDBACK_USER_WEIGHT = 0.2
+FEEDBACK_GLOBAL_WEIGHT = 0.1
+FEEDBACK_PRIOR_COUNT = 5
+
+# 하루 식단 최적화 (utils/day_planner.py)
+DAY_PLANNER = "optimize"  # "optimize": 하루 전체 분기 한정 최적화, "sample": 끼니별 상위 8개 중 무작위 선택
+DAY_PLAN_NODE_LIMIT = 6000  # 탐색 노드(부분 식단) 수 제한, 도달하면 그때까지의 최적해 사용 (시간과 무관하게 결정적)
+DAY_PLAN_TIME_LIMIT = 0.1  # 탐색 시간 제한(초), 노드 수 제한보다 먼저 도달하면 그때까지의 최적해 사용 (None이면 노드 수 제한만)
+DAY_PLAN_SHORTLIST = 8  # 끼니별 조합에 쓰는 상위 후보 수
+DAY_PLAN_FEASIBLE_EXTRA = 3  # 제약(하루 예산, 영양소 상한)별로 끼니 후보에 더하는 값이 가장 낮은 후보 수
+DAY_PLAN_MACRO_NEIGHBORS = 3  # 끼니 후보에 더하는 음식 1개 몫 목표 영양소의 최근접 음식 수 (utils/macro_index.py)
+DAY_PLAN_MEAL_SIZES = (3, 2)  # 끼니별 음식 수
+DAY_PLAN_CALORIE_WEIGHT = 5.0  # 하루 칼로리 목표 이탈 비율 벌점 (음식 하나의 점수보다 크게)
+DAY_PLAN_PROTEIN_WEIGHT = 2.0  # 하루 단백질 부족 비율 벌점
+MEAL_SAMPLE_SEED = 0  # 끼니별 순차 추천의 무작위 선택 시드 (프로필의 'seed'로 변경, None이면 매번 다름)
+
 # 에러 메시지 템플릿
 BUDGET_ERROR_MSG = f"1회 식사 예산은 {MIN_BUDGET:,}원에서 {MAX_BUDGET:,}원 사이여야 합니다."
 AGE_ERROR_MSG = f"나이는 {MIN_AGE}세에서 {MAX_AGE}세 사이여야 합니다."
@@ -0,0 +1,125 @@
+"""
+여러 사용자 프로필 일괄 추천
+N개 프로필의 기본 필터 마스크와 최종 점수를 (프로필 수 N × 카탈로그 행 수 M) 행렬로 한 번에 계산한 뒤,
+프로필별 후보 행으로 끼니를 구성 (결과는 recommend()를 프로필마다 호출한 것과 동일)
+
+- 예산/영양소 상한: 컬럼 (1, M)과 프로필별 상한 (N, 1)의 브로드캐스팅 비교
+- 알레르기: 같은 알레르기 조합끼리 카탈로그 마스크 한 번만 계산
+- 점수: 목표별 사전 계산 점수와 선호도 가중치 조합별 점수 벡터를 프로필 순서로 모음
+- 영양 점수는 행렬에서 프로필별 후보 행만 잘라 사용 (점수기를 다시 호출하지 않음)
+- 끼니 구성(plan_meals)은 프로필마다 실행하며, 끼니 분류 마스크와 추천 필드 캐시는 카탈로그 버전 단위로 공유
+- 행렬 크기가 BATCH_MAX_CELLS를 넘으면 프로필을 나누어 처리
+- 처리량은 프로필별 recommend() 호출과 비슷함 (시간 대부분이 프로필별 끼니 구성/하루 최적화),
+  한 번의 요청으로 여러 프로필을 처리하는 편의 기능
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from settings import BATCH_MAX_CELLS
+from utils.candidate_cache import quantize_budget
+from utils.feedback_store import get_feedback_store
+from utils.food_catalog import FoodCatalog, get_catalog
+from utils.nutrient_budget import daily_nutrient_limits
+from utils.recommender import (
+    CandidateScores, active_scorer, budget_relaxed_profile, goal_scores, plan_meals, preference_indicators,
+    preference_weights
+)
+from utils.scorers import Scorer
+from utils.term_matcher import canonical_term
+
+
+def batch_candidate_masks(catalog: FoodCatalog, profiles: List[Dict[str, Any]]) -> np.ndarray:
+    """프로필별 기본 필터(알레르기, 예산 완화 포함 예산, 하루 영양소 상한) 통과 여부 (N, M) bool 행렬"""
+
+    size = len(catalog)
+    masks = np.ones((len(profiles), size), dtype=bool)
+    if catalog.alive is not None:
+        masks &= catalog.alive
+
+    # 알레르기: 정규화한 조합별로 한 번만 계산
+    allergy_masks: Dict[Tuple[str, ...], np.ndarray] = {}
+    for i, profile in enumerate(profiles):
+        allergies = profile.get('allergies') or []
+        if not allergies:
+            continue
+        key = tuple(sorted({canonical_term(value) for value in allergies}))
+        if key not in allergy_masks:
+            allergy_masks[key] = ~catalog.any_of('allergies', catalog.codes_containing('allergies', allergies))
+        masks[i] &= allergy_masks[key]
+
+    # 예산: 가격 (1, M) <= 프로필별 예산 (N, 1), 예산이 없는 프로필은 조건 없음
+    budgets = np.full(len(profiles), np.inf)
+    for i, profile in enumerate(profiles):
+        relaxed = budget_relaxed_profile(profile)
+        if relaxed.get('budget') is not None:
+            budgets[i] = quantize_budget(catalog, relaxed['budget'])
+    has_budget = np.isfinite(budgets)
+    masks &= (catalog.column('price')[None, :] <= budgets[:, None]) | ~has_budget[:, None]
+
+    # 하루 영양소 상한: 음식 하나가 상한을 넘으면 제외 (상한이 없는 프로필은 결측값도 통과)
+    limits = [daily_nutrient_limits(profile.get('diseases')) for profile in profiles]
+    for nutrient in sorted({nutrient for profile_limits in limits for nutrient in profile_limits}):
+        bound = np.array([profile_limits.get(nutrient, np.inf) for profile_limits in limits])
+        has_limit = np.isfinite(bound)
+        masks &= (catalog.column(nutrient)[None, :] <= bound[:, None]) | ~has_limit[:, None]
+
+    return masks
+
+
+def batch_scores(catalog: FoodCatalog, profiles: List[Dict[str, Any]],
+                 scorer: Optional[Scorer] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """프로필별 (영양 점수, 선호도 점수, 최종 점수) (N, M) float32 행렬 (최종 = 영양 점수 + 선호도 점수, 0~1)"""
+
+    scorer = active_scorer(scorer)
+    nutrition = np.stack([scorer.score_all(catalog, profile) for profile in profiles]).astype(np.float32, copy=False)
+
+    # 선호도 점수는 가중치 벡터 조합별로 (M × 특성) @ (특성,) 한 번씩 계산해 프로필 순서로 모음
+    weights = np.stack([preference_weights(profile.get('preferences', [])) for profile in profiles])
+    unique_weights, inverse = np.unique(weights, axis=0, return_inverse=True)
+    indicators = preference_indicators(catalog)
+    preference = np.stack([
+        np.dot(indicators, w) if w.any() else np.zeros(len(catalog), dtype=np.float32) for w in unique_weights
+    ])[inverse.reshape(-1)]
+
+    # 별점 개인화 (평가가 쌓인 경우만, 프로필별 전체 행 벡터)
+    store = get_feedback_store()
+    if len(store):
+        for i, profile in enumerate(profiles):
+            preference[i] += store.personalization(catalog, profile.get('user_id'))
+
+    final = nutrition + preference
+    np.clip(final, 0, 1, out=final)
+    return nutrition, preference, final
+
+
+def recommend_batch(profiles: List[Dict[str, Any]], catalog: Optional[FoodCatalog] = None,
+                    scorer: Optional[Scorer] = None) -> List[Dict[str, List[Dict[str, Any]]]]:
+    """여러 프로필의 끼니별 추천 (입력 순서대로, 각 결과는 recommend()와 같은 구조)"""
+
+    catalog = catalog or get_catalog()
+    scorer = active_scorer(scorer)
+    results: List[Dict[str, List[Dict[str, Any]]]] = []
+    chunk_size = max(1, BATCH_MAX_CELLS // max(1, len(catalog)))
+
+    for start in range(0, len(profiles), chunk_size):
+        chunk = profiles[start:start + chunk_size]
+        masks = batch_candidate_masks(catalog, chunk)
+        nutrition, preference, final = batch_scores(catalog, chunk, scorer)
+
+        for i, profile in enumerate(chunk):
+            rows = np.flatnonzero(masks[i])
+            if len(rows) == 0:
+                results.append({"breakfast": [], "lunch": [], "dinner": []})
+                continue
+            matrix = goal_scores(catalog, profile.get('goal', '체중감량'))
+            scores = CandidateScores(rows)
+            np.take(matrix[0], rows, out=scores.calorie_score)
+            np.take(matrix[1], rows, out=scores.protein_score)
+            np.take(nutrition[i], rows, out=scores.nutrition_score)
+            np.take(preference[i], rows, out=scores.preference_score)
+            np.take(final[i], rows, out=scores.final_score)
+            results.append(plan_meals(catalog, scores, profile))
+
+        print(f"📦 일괄 추천: {min(start + chunk_size, len(profiles))}/{len(profiles)}개 프로필 완료")
+
+    return results
@@ -0,0 +1,128 @@
+"""
+필터 후보 캐시
+요청 대부분이 같은 알레르기 조합과 예산 구간을 쓰므로, 필터 계획을 통과한 행 번호 배열을
+(카탈로그 버전, 정규화된 제약 조건으로 컴파일한 FilterPlan) 키로 캐시
+
+- 정규화: 알레르기는 동의어 대표어로 바꿔 정렬, 질환/식단 제한은 중복 제거 후 정렬,
+  예산은 카탈로그에 실제로 있는 가격 중 예산 이하 최댓값으로 내림 (price <= 예산 결과가 같은 예산끼리 같은 키)
+- 크기 제한 LRU + TTL, 적중/실패 횟수 집계
+- 카탈로그 버전이 키에 포함되므로 리로드·델타 적용 후에는 이전 항목이 자연히 밀려남
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+import numpy as np
+from settings import CANDIDATE_CACHE_SIZE, CANDIDATE_CACHE_TTL
+from utils.filter_plan import FilterPlan
+from utils.food_catalog import FoodCatalog
+from utils.term_matcher import canonical_term
+
+# 정렬된 목록으로 정규화하는 프로필 키 (KoreanFoodRecommender 키는 "없음"이 있으면 조건 없음)
+_SET_KEYS = ('diseases', 'medical_conditions', 'dietary_restrictions')
+_NONE_KEYS = ('medical_conditions', 'dietary_restrictions')
+_BUDGET_KEYS = ('budget', 'budget_per_meal')
+
+
+def quantize_budget(catalog: FoodCatalog, budget: float) -> float:
+    """예산을 카탈로그 가격 중 예산 이하 최댓값으로 내림 (가격 필터 결과는 그대로)"""
+    prices = catalog.derived('price_grid', lambda c: np.unique(c.column('price')[~np.isnan(c.column('price'))]))
+    index = int(np.searchsorted(prices, np.float32(budget), side='right'))
+    return float(prices[index - 1]) if index else float(budget)
+
+
+def canonical_profile(catalog: FoodCatalog, user_profile: Dict[str, Any]) -> Dict[str, Any]:
+    """필터 결과가 같은 프로필이 같은 값이 되도록 제약 조건 정규화"""
+    canonical = dict(user_profile)
+    if user_profile.get('allergies'):
+        canonical['allergies'] = sorted({canonical_term(value) for value in user_profile['allergies']})
+    for key in _BUDGET_KEYS:
+        if user_profile.get(key) is not None:
+            canonical[key] = quantize_budget(catalog, user_profile[key])
+    for key in _SET_KEYS:
+        values = user_profile.get(key) or []
+        canonical[key] = [] if key in _NONE_KEYS and "없음" in values else sorted(set(values))
+    return canonical
+
+
+class CandidateCache:
+    """크기 제한 LRU + TTL 캐시 (값은 읽기 전용 행 번호 배열)"""
+
+    def __init__(self, max_size: int = CANDIDATE_CACHE_SIZE, ttl: float = CANDIDATE_CACHE_TTL,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, np.ndarray]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Optional[np.ndarray]:
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] > self.ttl:
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, rows: np.ndarray) -> np.ndarray:
+        rows = np.asarray(rows)
+        rows.setflags(write=False)
+        with self._lock:
+            self._entries[key] = (self._clock(), rows)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return rows
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], np.ndarray]) -> np.ndarray:
+        rows = self.get(key)
+        if rows is None:
+            # 계산은 잠금 밖에서 (동시에 같은 키를 계산하면 마지막 결과가 남음)
+            rows = self.put(key, compute())
+        return rows
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
+
+
+_cache = CandidateCache()
+
+
+def get_candidate_cache() -> CandidateCache:
+    """프로세스 공유 후보 캐시"""
+    return _cache
+
+
+def candidate_rows(catalog: FoodCatalog, user_profile: Dict[str, Any],
+                   compile_plan: Callable[[Dict[str, Any]], FilterPlan]) -> np.ndarray:
+    """정규화한 프로필로 계획을 컴파일하고, 계획을 통과한 행 번호 배열을 캐시에서 조회 (없으면 계산)"""
+    plan = compile_plan(canonical_profile(catalog, user_profile))
+    return _cache.get_or_compute((catalog.version, plan), lambda: plan.rows(catalog))
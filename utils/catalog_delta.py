@@ -0,0 +1,219 @@
+"""
+카탈로그 델타 저널
+전체 JSON을 다시 쓰지 않고 가격 변경/상품 추가/삭제를 반영하기 위한 추가 전용(append-only) 저널
+
+저널 형식 (JSON Lines, data/catalog_delta.jsonl)
+    {"op": "upsert", "id": "<FoodItem.id>", "record": {...변경할 필드...}, "ts": 1700000000.0}
+    {"op": "delete", "id": "<FoodItem.id>", "ts": 1700000000.0}
+
+upsert의 record는 기존 음식이면 바뀐 필드만(예: price), 새 음식이면 전체 필드를 담음.
+공유 카탈로그(get_catalog)는 저널에서 새로 추가된 줄만 읽어 변경된 행만 갱신한 새 카탈로그로 교체
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import numpy as np
+from typing import Any, Dict, Iterable, List, Literal, Optional, Sequence, Tuple
+from utils.food_catalog import (
+    CATEGORICAL_COLUMNS, DATA_PATH, LIST_COLUMNS, NUMERIC_COLUMNS,
+    FoodCatalog, OverlayColumn, StringTable, _readonly, _to_float
+)
+
+# 원본 JSON 옆의 델타 저널 경로
+JOURNAL_PATH = os.path.join(os.path.dirname(DATA_PATH), "catalog_delta.jsonl")
+
+DeltaOp = Literal['upsert', 'delete']
+
+_journal_lock = threading.Lock()
+
+
+def journal_size(path: str = JOURNAL_PATH) -> int:
+    """저널 파일 크기 (없으면 0)"""
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def append_deltas(deltas: Iterable[Dict[str, Any]], path: str = JOURNAL_PATH) -> int:
+    """델타 목록을 저널 끝에 한 번에 추가하고 추가된 건수 반환
+
+    upsert 레코드는 호출 측에서 FoodItem 스키마 검증을 마친 상태여야 함
+    """
+    now = time.time()
+    lines = []
+    for delta in deltas:
+        entry: Dict[str, Any] = {'op': delta['op'], 'id': str(delta['id'])}
+        if delta['op'] == 'upsert':
+            entry['record'] = delta.get('record') or {}
+        elif delta['op'] != 'delete':
+            raise ValueError(f"알 수 없는 델타 연산: {delta['op']}")
+        entry['ts'] = now
+        lines.append(json.dumps(entry, ensure_ascii=False) + '\n')
+    if not lines:
+        return 0
+
+    with _journal_lock, open(path, 'a', encoding='utf-8') as f:
+        # 한 번의 write로 추가해 다른 프로세스가 중간 상태를 읽지 않도록 함
+        f.write(''.join(lines))
+        f.flush()
+        os.fsync(f.fileno())
+    return len(lines)
+
+
+def read_journal(path: str = JOURNAL_PATH, offset: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+    """offset 바이트 이후의 완결된 델타 줄과 다음 offset 반환 (쓰는 중인 마지막 줄은 다음에 읽음)"""
+    try:
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            data = f.read()
+    except OSError:
+        return [], offset
+
+    end = data.rfind(b'\n') + 1
+    deltas = [json.loads(line) for line in data[:end].decode('utf-8').splitlines() if line.strip()]
+    return deltas, offset + end
+
+
+def delta_version(version: str, deltas: Iterable[Dict[str, Any]]) -> str:
+    """델타를 한 줄씩 이어 해시한 카탈로그 버전
+
+    버전은 원본 버전과 적용한 저널 줄의 내용만으로 정해지므로, 저널을 한 번에 적용하든
+    여러 번(get_catalog의 증분 적용)에 나눠 적용하든 같은 줄까지 적용했으면 같은 버전
+    """
+    for delta in deltas:
+        digest = hashlib.sha256(version.encode('utf-8'))
+        digest.update(b'\n')
+        digest.update(json.dumps(delta, ensure_ascii=False, sort_keys=True).encode('utf-8'))
+        version = digest.hexdigest()
+    return version
+
+
+def collapse_deltas(catalog: FoodCatalog, deltas: Sequence[Dict[str, Any]]) -> Dict[str, Optional[Dict[str, Any]]]:
+    """id별 최종 상태로 합치기 (None = 삭제, upsert는 기존 레코드에 필드 병합)
+
+    같은 묶음에서 delete 뒤에 오는 upsert는 삭제 전 레코드와 병합하지 않음 (새 음식처럼 전체 필드 필요).
+    저널 적용(apply_deltas)과 제출 전 검증(submit_food_deltas)이 같은 결과를 보도록 두 곳 모두 이 함수 사용
+    """
+    final: Dict[str, Optional[Dict[str, Any]]] = {}
+    for delta in deltas:
+        food_id = str(delta['id'])
+        if delta['op'] == 'delete':
+            final[food_id] = None
+            continue
+        if food_id in final:
+            current = final[food_id]
+        else:
+            row = catalog.row_of(food_id)
+            current = catalog.record(row) if row is not None else None
+        final[food_id] = {**(current or {}), **(delta.get('record') or {}), 'id': food_id}
+    return final
+
+
+def _splice_lists(offsets: np.ndarray, values: np.ndarray, size: int,
+                  replaced: Dict[int, List[int]]) -> Tuple[np.ndarray, np.ndarray]:
+    """CSR 리스트에서 replaced 행만 교체/추가 (변경되지 않은 구간은 통째로 복사)"""
+    old_size = len(offsets) - 1
+    lengths = np.zeros(size, dtype=np.int64)
+    lengths[:old_size] = np.diff(offsets)
+    for row, items in replaced.items():
+        lengths[row] = len(items)
+    new_offsets = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(lengths, out=new_offsets[1:])
+    new_values = np.empty(new_offsets[-1], dtype=np.int32)
+
+    start = 0
+    for row in sorted(replaced):
+        # 추가 행(row >= old_size) 앞까지의 기존 구간도 복사
+        stop = min(row, old_size)
+        if start < stop:
+            new_values[new_offsets[start]:new_offsets[stop]] = values[offsets[start]:offsets[stop]]
+        new_values[new_offsets[row]:new_offsets[row + 1]] = replaced[row]
+        start = max(start, row + 1)
+    if start < old_size:
+        new_values[new_offsets[start]:new_offsets[old_size]] = values[offsets[start]:offsets[old_size]]
+    return _readonly(new_offsets), _readonly(new_values)
+
+
+def apply_deltas(catalog: FoodCatalog, deltas: Sequence[Dict[str, Any]]) -> FoodCatalog:
+    """델타를 적용한 새 카탈로그 반환 (기존 카탈로그는 그대로 유지)
+
+    - 기존 id upsert: 같은 행을 덮어씀
+    - 새 id upsert: 행을 뒤에 추가
+    - delete: alive 마스크로 삭제 표시 (행 번호 유지)
+    숫자/코드 배열은 memcpy로 복사하고, 레코드 해석·비트마스크·파생 캐시 계산은 변경된 행만 수행
+    """
+    final = collapse_deltas(catalog, deltas)
+    size = len(catalog)
+
+    updated: Dict[int, Dict[str, Any]] = {}
+    appended: List[Dict[str, Any]] = []
+    deleted: List[int] = []
+    for food_id, record in final.items():
+        row = catalog.row_of(food_id)
+        if record is None:
+            if row is not None:
+                deleted.append(row)
+        elif row is not None:
+            updated[row] = record
+        else:
+            appended.append(record)
+    for offset, record in enumerate(appended):
+        updated[size + offset] = record
+    new_size = size + len(appended)
+    rows = np.asarray(sorted(updated), dtype=np.int64)
+
+    strings = StringTable(catalog.strings.strings)
+
+    numeric = {}
+    for name in NUMERIC_COLUMNS:
+        column = np.empty(new_size, dtype=np.float32)
+        column[:size] = catalog.numeric[name]
+        for row, record in updated.items():
+            column[row] = _to_float(record.get(name))
+        numeric[name] = _readonly(column)
+
+    codes = {}
+    for name in CATEGORICAL_COLUMNS:
+        column = np.empty(new_size, dtype=np.int32)
+        column[:size] = catalog.codes[name]
+        for row, record in updated.items():
+            value = record.get(name)
+            column[row] = strings.intern(value) if isinstance(value, str) else -1
+        codes[name] = _readonly(column)
+
+    lists = {}
+    bitsets = {}
+    for name in LIST_COLUMNS:
+        replaced = {
+            row: [strings.intern(str(item)) for item in (record.get(name) or [])]
+            for row, record in updated.items()
+        }
+        lists[name] = _splice_lists(*catalog.lists[name], new_size, replaced)
+        bitsets[name] = catalog.bitsets[name].with_rows(*lists[name], rows)
+
+    alive = None
+    if catalog.alive is not None or deleted:
+        alive = np.ones(new_size, dtype=bool)
+        if catalog.alive is not None:
+            alive[:size] = catalog.alive
+        alive[deleted] = False
+        alive = _readonly(alive)
+
+    ids = OverlayColumn(catalog.ids, {}, [record['id'] for record in appended])
+    names = OverlayColumn(
+        catalog.names,
+        {row: str(record.get('name', '')) for row, record in updated.items() if row < size},
+        [str(record.get('name', '')) for record in appended]
+    )
+
+    patched = FoodCatalog(
+        ids, names, numeric, codes, lists, strings,
+        delta_version(catalog.version, deltas), catalog.source_path, catalog.mtime_ns,
+        bitsets=bitsets, validated=catalog.validated, alive=alive
+    )
+    patched.inherit_derived(catalog, np.union1d(rows, np.asarray(deleted, dtype=np.int64)))
+    return patched
@@ -0,0 +1,163 @@
+"""
+컴파일된 바이너리 카탈로그 스냅샷
+/data/정제 데이터.json 을 .npy 컬럼 + 문자열 테이블 + 원본 해시로 저장해 JSON 파싱 없이 바로 로드
+
+디렉터리 구조
+    catalog_snapshot/
+        manifest.json              현재 스냅샷을 가리키는 포인터 (원자적으로 교체)
+        <원본 해시 앞 16자리>/
+            meta.json              원본 해시, 크기, mtime, 음식 수, 스키마 검증 여부
+            strings.json           공유 문자열 테이블
+            ids.blob.npy / ids.offsets.npy, names.blob.npy / names.offsets.npy  UTF-8 문자열 컬럼
+            numeric.<필드>.npy     float32 컬럼
+            codes.<필드>.npy       int32 범주형 코드
+            lists.<필드>.offsets.npy / lists.<필드>.values.npy
+            bitset.<필드>.vocabulary.npy / bitset.<필드>.words.npy
+
+모든 .npy 배열은 읽기 전용 메모리 맵(mmap_mode='r')으로 열기 때문에 같은 호스트의
+여러 uvicorn 워커가 페이지 캐시를 통해 물리 메모리 한 벌을 공유
+"""
+
+import json
+import os
+import shutil
+import numpy as np
+from typing import Any, Dict, Optional
+from utils.food_catalog import (
+    CATEGORICAL_COLUMNS, DATA_PATH, LIST_COLUMNS, NUMERIC_COLUMNS,
+    FieldBitset, FoodCatalog, StringColumn, StringTable, file_sha256
+)
+
+# 스냅샷 기본 위치 (원본 JSON 옆)
+SNAPSHOT_DIR = os.path.join(os.path.dirname(DATA_PATH), "catalog_snapshot")
+
+# 스냅샷 포맷 버전 (구조 변경 시 증가 → 기존 스냅샷은 자동으로 무시)
+SNAPSHOT_FORMAT = 2
+
+
+def _write_json(path: str, data: Any) -> None:
+    """JSON 파일을 임시 파일에 쓴 뒤 원자적으로 교체"""
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path: str) -> Any:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_snapshot(catalog: FoodCatalog, directory: str = SNAPSHOT_DIR, validated: bool = False) -> str:
+    """카탈로그를 바이너리 스냅샷으로 저장하고 저장 경로 반환
+
+    validated=True는 빌드 단계에서 모든 레코드가 스키마 검증을 통과했음을 기록하며,
+    로더는 이 스냅샷을 재검증 없이 신뢰 모드로 사용할 수 있음
+    """
+    os.makedirs(directory, exist_ok=True)
+    name = catalog.version[:16]
+    target = os.path.join(directory, name)
+    staging = f"{target}.tmp-{os.getpid()}"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    for field in NUMERIC_COLUMNS:
+        np.save(os.path.join(staging, f"numeric.{field}.npy"), catalog.numeric[field])
+    for field in CATEGORICAL_COLUMNS:
+        np.save(os.path.join(staging, f"codes.{field}.npy"), catalog.codes[field])
+    for field in LIST_COLUMNS:
+        offsets, values = catalog.lists[field]
+        np.save(os.path.join(staging, f"lists.{field}.offsets.npy"), offsets)
+        np.save(os.path.join(staging, f"lists.{field}.values.npy"), values)
+        bitset = catalog.bitsets[field]
+        np.save(os.path.join(staging, f"bitset.{field}.vocabulary.npy"), bitset.vocabulary)
+        np.save(os.path.join(staging, f"bitset.{field}.words.npy"), bitset.words)
+
+    for field in ('ids', 'names'):
+        column = getattr(catalog, field)
+        if not isinstance(column, StringColumn):
+            column = StringColumn.from_strings(column)
+        np.save(os.path.join(staging, f"{field}.blob.npy"), column.blob)
+        np.save(os.path.join(staging, f"{field}.offsets.npy"), column.offsets)
+
+    _write_json(os.path.join(staging, "strings.json"), {'strings': catalog.strings.strings})
+
+    source_stat = os.stat(catalog.source_path) if catalog.source_path and os.path.exists(catalog.source_path) else None
+    _write_json(os.path.join(staging, "meta.json"), {
+        'format': SNAPSHOT_FORMAT,
+        'source_hash': catalog.version,
+        'source_size': source_stat.st_size if source_stat else None,
+        'source_mtime_ns': source_stat.st_mtime_ns if source_stat else None,
+        'count': len(catalog),
+        'validated': validated
+    })
+
+    # 같은 버전 디렉터리가 이미 있으면 교체
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(staging, target)
+    _write_json(os.path.join(directory, "manifest.json"), {'current': name})
+
+    # 이전 버전 정리 (이미 열려 있는 파일은 POSIX에서 계속 유효)
+    for entry in os.listdir(directory):
+        path = os.path.join(directory, entry)
+        if entry != name and os.path.isdir(path) and '.tmp-' not in entry:
+            shutil.rmtree(path, ignore_errors=True)
+
+    return target
+
+
+def _read_meta(directory: str) -> Optional[Dict[str, Any]]:
+    """현재 스냅샷 메타데이터 (없거나 포맷이 다르면 None)"""
+    try:
+        current = _read_json(os.path.join(directory, "manifest.json"))['current']
+        meta = _read_json(os.path.join(directory, current, "meta.json"))
+    except (OSError, KeyError, ValueError):
+        return None
+    if meta.get('format') != SNAPSHOT_FORMAT:
+        return None
+    meta['path'] = os.path.join(directory, current)
+    return meta
+
+
+def is_snapshot_fresh(meta: Dict[str, Any], source_path: str) -> bool:
+    """스냅샷이 원본 JSON과 같은 내용인지 확인 (크기+mtime 일치 시 해시 계산 생략)"""
+    if not os.path.exists(source_path):
+        # 원본 없이 스냅샷만 배포된 경우
+        return True
+    stat = os.stat(source_path)
+    if stat.st_size == meta.get('source_size') and stat.st_mtime_ns == meta.get('source_mtime_ns'):
+        return True
+    return file_sha256(source_path) == meta.get('source_hash')
+
+
+def load_snapshot(source_path: str = DATA_PATH, directory: str = SNAPSHOT_DIR) -> Optional[FoodCatalog]:
+    """최신 스냅샷이 있으면 카탈로그로 로드 (없거나 오래되었으면 None)"""
+    meta = _read_meta(directory)
+    if meta is None or not is_snapshot_fresh(meta, source_path):
+        return None
+
+    path = meta['path']
+
+    def array(name: str) -> np.ndarray:
+        # 읽기 전용 메모리 맵: 워커 간 페이지 캐시 공유, 접근한 페이지만 적재
+        return np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r')
+
+    tables = _read_json(os.path.join(path, "strings.json"))
+    ids = StringColumn(array("ids.blob"), array("ids.offsets"))
+    names = StringColumn(array("names.blob"), array("names.offsets"))
+    numeric = {field: array(f"numeric.{field}") for field in NUMERIC_COLUMNS}
+    codes = {field: array(f"codes.{field}") for field in CATEGORICAL_COLUMNS}
+    lists = {
+        field: (array(f"lists.{field}.offsets"), array(f"lists.{field}.values"))
+        for field in LIST_COLUMNS
+    }
+    bitsets = {
+        field: FieldBitset(array(f"bitset.{field}.vocabulary"), array(f"bitset.{field}.words"))
+        for field in LIST_COLUMNS
+    }
+    mtime_ns = os.stat(source_path).st_mtime_ns if os.path.exists(source_path) else 0
+    return FoodCatalog(
+        ids, names, numeric, codes, lists,
+        StringTable(tables['strings']), meta['source_hash'], source_path, mtime_ns,
+        bitsets=bitsets, validated=bool(meta.get('validated'))
+    )
@@ -0,0 +1,142 @@
+"""
+대용량 카탈로그 파일 스트리밍 파서
+json.load처럼 파일 전체를 문자열/객체로 올리지 않고 레코드를 하나씩 꺼내 CatalogBuilder에 바로 채움
+
+지원 형식 (첫 번째 공백이 아닌 문자로 자동 판별)
+- JSON 배열: [ {...}, {...}, ... ]  (정제 데이터.json 형식)
+- JSON Lines: 한 줄에 레코드 하나
+
+메모리 사용량은 읽기 버퍼(CHUNK_SIZE) + 레코드 1개 수준으로 제한됨
+(잘못된 JSON은 더 읽어도 고칠 수 없는 오류면 바로, 아니면 레코드가 MAX_RECORD_CHARS를 넘는 시점에 ValueError)
+"""
+
+import codecs
+import json
+from typing import Any, Dict, IO, Iterator, Optional
+
+# 한 번에 읽는 바이트 수
+CHUNK_SIZE = 1 << 20
+# 레코드 하나의 최대 문자 수 (닫히지 않은 레코드를 파일 끝까지 버퍼에 이어 붙이지 않도록)
+MAX_RECORD_CHARS = 16 * CHUNK_SIZE
+# 디코드 오류 위치가 버퍼 끝에서 이 문자 수 안이면 레코드가 잘린 것으로 보고 다음 청크를 읽음
+# (잘린 숫자/리터럴/\uXXXX 서로게이트 쌍은 오류 위치가 끝보다 최대 12자 앞)
+_TRUNCATION_MARGIN = 32
+
+_WHITESPACE = ' \t\r\n'
+
+
+def _read_text_chunks(f: IO[bytes], digest: Optional[Any] = None) -> Iterator[str]:
+    """바이너리 파일을 UTF-8 문자열 청크로 읽기 (멀티바이트 경계 처리, 읽은 바이트는 해시에 누적)"""
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    while True:
+        raw = f.read(CHUNK_SIZE)
+        if digest is not None:
+            digest.update(raw)
+        if not raw:
+            tail = decoder.decode(b'', final=True)
+            if tail:
+                yield tail
+            return
+        text = decoder.decode(raw)
+        if text:
+            yield text
+
+
+def iter_json_array(chunks: Iterator[str]) -> Iterator[Dict[str, Any]]:
+    """문자열 청크로 들어오는 JSON 배열에서 원소를 하나씩 반환"""
+    decoder = json.JSONDecoder()
+    buffer, pos = '', 0
+    state = 'start'  # start → first(값 또는 ]) → separator(, 또는 ]) → value
+
+    while True:
+        while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+            pos += 1
+        if pos >= len(buffer):
+            chunk = next(chunks, None)
+            if chunk is None:
+                raise ValueError("JSON 배열이 닫히지 않았습니다")
+            buffer, pos = chunk, 0
+            continue
+
+        char = buffer[pos]
+        if state == 'start':
+            if char != '[':
+                raise ValueError("JSON 배열 형식이 아닙니다")
+            pos += 1
+            state = 'first'
+            continue
+        if state in ('first', 'separator') and char == ']':
+            return
+        if state == 'separator':
+            if char != ',':
+                raise ValueError(f"JSON 배열 구분자가 올바르지 않습니다: {char!r}")
+            pos += 1
+            state = 'value'
+            continue
+
+        try:
+            value, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError as e:
+            # 레코드가 청크 경계에 걸친 경우만 다음 청크를 이어 붙여 다시 시도
+            # (닫히지 않은 문자열 외에 버퍼 중간에서 난 오류는 더 읽어도 고칠 수 없음)
+            truncated = e.msg.startswith('Unterminated string') or e.pos >= len(buffer) - _TRUNCATION_MARGIN
+            if not truncated:
+                raise
+            if len(buffer) - pos > MAX_RECORD_CHARS:
+                raise ValueError(f"JSON 레코드가 {MAX_RECORD_CHARS:,}자를 넘거나 닫히지 않았습니다") from e
+            chunk = next(chunks, None)
+            if chunk is None:
+                raise
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+
+        yield value
+        pos = end
+        state = 'separator'
+        if pos > CHUNK_SIZE:
+            # 처리한 앞부분을 버려 버퍼 크기 제한
+            buffer, pos = buffer[pos:], 0
+
+
+def iter_json_lines(chunks: Iterator[str]) -> Iterator[Dict[str, Any]]:
+    """문자열 청크로 들어오는 JSON Lines에서 레코드를 하나씩 반환 (빈 줄 무시)"""
+    pending = ''
+    for chunk in chunks:
+        lines = (pending + chunk).split('\n')
+        pending = lines.pop()
+        if len(pending) > MAX_RECORD_CHARS:
+            raise ValueError(f"JSON Lines 한 줄이 {MAX_RECORD_CHARS:,}자를 넘습니다")
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+    if pending.strip():
+        yield json.loads(pending)
+
+
+def iter_file_records(path: str, digest: Optional[Any] = None) -> Iterator[Dict[str, Any]]:
+    """JSON 배열/JSON Lines 파일의 레코드를 순서대로 반환
+
+    digest(hashlib 객체)를 주면 파일 전체 바이트를 누적하므로 카탈로그 버전 계산에 그대로 사용 가능
+    """
+    with open(path, 'rb') as f:
+        chunks = _read_text_chunks(f, digest)
+        first = ''
+        for chunk in chunks:
+            first = chunk.lstrip(_WHITESPACE)
+            if first:
+                break
+        if not first:
+            return
+
+        def rest() -> Iterator[str]:
+            yield first
+            yield from chunks
+
+        if first.startswith('['):
+            yield from iter_json_array(rest())
+        else:
+            yield from iter_json_lines(rest())
+
+        # 배열 뒤에 남은 바이트까지 해시에 포함
+        for _ in chunks:
+            pass
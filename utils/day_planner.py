@@ -0,0 +1,219 @@
+"""
+하루 식단 최적화
+아침/점심/저녁을 끼니마다 따로 고르지 않고, 끼니별 후보 묶음(2~3개 조합) 중 하루 전체를 한 번에 선택
+
+- 목적 함수: 음식 점수 합 - 칼로리 목표 이탈 벌점 - 단백질 부족 벌점 (벌점 = 가중치 × 목표 대비 비율)
+- 제약: 하루 예산(있을 때), 질환별 하루 영양소 상한, 끼니 사이 음식 중복 없음
+- 분기 한정(branch-and-bound): 끼니 순서대로 조합을 (점수 - 끼니 몫 목표 대비 예상 벌점) 높은 순으로 시도하고,
+  남은 끼니의 최고 점수 합에서 피할 수 없는 벌점을 빼도 현재 최적해를 넘지 못하거나
+  남은 끼니의 최소 비용/영양소로도 제약을 넘으면 가지치기 (한 끼니의 조합 전체를 배열 연산으로 한 번에 판정)
+- 시작 해(incumbent, 예: 끼니별 순차 추천 결과)가 제약을 만족하면 그 값에서 탐색을 시작하므로 결과가 그보다 나빠지지 않음
+- 노드 수 제한(DAY_PLAN_NODE_LIMIT)에 도달하면 그때까지의 최적해 반환 (optimal=False), 같은 입력이면 항상 같은 결과
+- 시간 제한(DAY_PLAN_TIME_LIMIT초, 조합 생성 포함)에 먼저 도달해도 그때까지의 최적해 반환 (지연 상한 보장,
+  이 경우에는 부하에 따라 결과가 달라질 수 있음)
+"""
+
+import time
+from itertools import combinations
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+import numpy as np
+from settings import (
+    DAY_PLAN_CALORIE_WEIGHT, DAY_PLAN_MEAL_SIZES, DAY_PLAN_NODE_LIMIT, DAY_PLAN_PROTEIN_WEIGHT, DAY_PLAN_TIME_LIMIT
+)
+
+# 목표별 칼로리 조정 비율, 체중 1kg당 하루 단백질(g)
+GOAL_CALORIE_FACTORS = {"체중감량": 0.8, "근육증가": 1.1}
+GOAL_PROTEIN_PER_KG = {"체중감량": 1.6, "근육증가": 2.0, "체중유지": 1.2}
+ACTIVITY_MULTIPLIERS = {'낮음': 1.2, '보통': 1.55, '높음': 1.9}
+
+
+def daily_calorie_target(user_profile: Dict[str, Any], goal: str) -> float:
+    """BMR(Harris-Benedict) × 활동 수준 × 목표 조정 = 하루 목표 칼로리"""
+    weight = user_profile.get('weight', 70)
+    height = user_profile.get('height', 170)
+    age = user_profile.get('age', 25)
+
+    if user_profile.get('gender', '남성') == '남성':
+        bmr = 88.362 + (13.397 * weight) + (4.799 * height) - (5.677 * age)
+    else:
+        bmr = 447.593 + (9.247 * weight) + (3.098 * height) - (4.330 * age)
+
+    activity_level = user_profile.get('activity_level', '보통')
+    return bmr * ACTIVITY_MULTIPLIERS.get(activity_level, 1.55) * GOAL_CALORIE_FACTORS.get(goal, 1.0)
+
+
+def daily_protein_target(user_profile: Dict[str, Any], goal: str) -> float:
+    """체중 × 목표별 단백질 계수 = 하루 목표 단백질(g)"""
+    return user_profile.get('weight', 70) * GOAL_PROTEIN_PER_KG.get(goal, GOAL_PROTEIN_PER_KG["체중유지"])
+
+
+class DayTargets(NamedTuple):
+    """하루 목표와 제약 (예산이 None이면 비용 제약 없음)"""
+    calories: float
+    protein: float
+    budget: Optional[float] = None
+
+
+class DayPlan(NamedTuple):
+    """최적화 결과: 끼니별 선택 위치, 목적 함수 값, 하루 합계, 최적성 보장 여부, 탐색 노드 수, 시작 해 유지 여부"""
+    picks: Tuple[Tuple[int, ...], ...]
+    objective: float
+    totals: Dict[str, float]
+    optimal: bool
+    nodes: int
+    incumbent: bool = False
+
+
+def _penalty(calories_low: Any, calories_high: Any, protein_high: Any, targets: DayTargets) -> Any:
+    """하루 칼로리가 [calories_low, calories_high], 단백질이 최대 protein_high일 때 피할 수 없는 최소 벌점 (배열 가능)"""
+    calorie_gap = np.maximum(0.0, np.maximum(calories_low - targets.calories, targets.calories - calories_high))
+    protein_gap = np.maximum(0.0, targets.protein - protein_high)
+    return (DAY_PLAN_CALORIE_WEIGHT * calorie_gap / targets.calories
+            + DAY_PLAN_PROTEIN_WEIGHT * protein_gap / targets.protein)
+
+
+class _MealOptions:
+    """끼니 하나의 조합 후보 배열 (탐색 순서 = 점수 - 끼니 몫 목표 대비 예상 벌점 내림차순)"""
+
+    def __init__(self, pool: Sequence[int], score: np.ndarray, values: np.ndarray, sizes: Sequence[int],
+                 slot: Dict[int, int], share: DayTargets, meal_count: int):
+        members = [combo for size in sizes for combo in combinations(pool, size)]
+        # values: (지표 수, 후보 수) → 조합별 합계 (조합 수, 지표 수)
+        self.score = np.array([score[list(combo)].sum() for combo in members], dtype=np.float64)
+        self.values = np.array([values[:, list(combo)].sum(axis=1) for combo in members],
+                               dtype=np.float64).reshape(len(members), values.shape[0])
+        # 조합이 쓰는 음식 (모든 끼니 후보를 합친 번호 기준, 끼니 사이 중복 판정용)
+        self.slots = [[slot[position] for position in combo] for combo in members]
+        self.membership = np.zeros((len(members), len(slot)), dtype=np.float64)
+        for i, slots in enumerate(self.slots):
+            self.membership[i, slots] = 1.0
+
+        # 끼니 몫 목표(하루 목표 / 끼니 수)에 가까운 조합부터 시도하면 좋은 해를 일찍 찾아 가지치기가 강해짐
+        # (끼니 몫 대비 비율 벌점을 끼니 수로 나눠 하루 벌점과 같은 척도로 맞춤)
+        calories, protein = self.values[:, 0], self.values[:, 1]
+        estimate = self.score - _penalty(calories, calories, protein, share) / meal_count
+        order = np.argsort(-estimate, kind='stable')
+        self.members = [members[i] for i in order]
+        self.score = self.score[order]
+        self.values = self.values[order]
+        self.slots = [self.slots[i] for i in order]
+        self.membership = self.membership[order]
+        # 탐색 중 자주 쓰는 열은 연속 배열로 따로 보관 (노드마다 복사/슬라이싱 비용 절약)
+        self.calories = np.ascontiguousarray(self.values[:, 0])
+        self.protein = np.ascontiguousarray(self.values[:, 1])
+
+
+def optimize_day(pools: Sequence[Sequence[int]], score: np.ndarray, calories: np.ndarray, protein: np.ndarray,
+                 price: np.ndarray, nutrients: np.ndarray, limits: np.ndarray, targets: DayTargets,
+                 sizes: Sequence[int] = DAY_PLAN_MEAL_SIZES, node_limit: int = DAY_PLAN_NODE_LIMIT,
+                 incumbent: Optional[Sequence[Sequence[int]]] = None,
+                 time_limit: Optional[float] = DAY_PLAN_TIME_LIMIT) -> Optional[DayPlan]:
+    """끼니별 후보 위치 목록(pools)에서 하루 식단을 함께 선택 (가능한 해가 없으면 None)
+
+    score/calories/protein/price: 후보 위치별 값, nutrients: (상한 영양소 수, 후보 수), limits: 영양소별 하루 상한
+    incumbent: 끼니별 위치 목록으로 된 시작 해 (제약을 만족하면 결과는 이보다 나쁘지 않음)
+    time_limit: 탐색 시간 상한(초, None이면 노드 수 제한만 적용)
+    """
+    deadline = None if time_limit is None else time.perf_counter() + time_limit
+    # 지표 순서: 칼로리, 단백질, 가격, 상한 영양소들
+    values = np.vstack([calories, protein, price, nutrients]).astype(np.float64)
+    caps = np.concatenate([[np.inf, np.inf, np.inf if targets.budget is None else targets.budget], limits])
+    best: Dict[str, Any] = {'objective': -np.inf, 'picks': None, 'totals': None, 'incumbent': False}
+
+    if incumbent is not None:
+        positions = [position for meal in incumbent for position in meal]
+        totals = values[:, positions].sum(axis=1)
+        if (len(set(positions)) == len(positions) and all(len(meal) in sizes for meal in incumbent)
+                and np.all(totals <= caps)):
+            best.update(
+                objective=float(score[positions].sum() - _penalty(totals[0], totals[0], totals[1], targets)),
+                picks=tuple(tuple(int(p) for p in meal) for meal in incumbent), totals=totals, incumbent=True
+            )
+
+    slot: Dict[int, int] = {}
+    for pool in pools:
+        for position in pool:
+            slot.setdefault(int(position), len(slot))
+    share = DayTargets(targets.calories / len(pools), targets.protein / len(pools))
+    meals = [_MealOptions([int(p) for p in pool], score, values, sizes, slot, share, len(pools)) for pool in pools]
+    if any(len(meal.members) == 0 for meal in meals):
+        return _plan(best, True, 0)
+
+    # 남은 끼니(m 이후)의 최고 점수 합, 지표별 최소/최대 합 (가지치기 한계)
+    best_rest = np.concatenate([np.cumsum([meal.score.max() for meal in meals][::-1])[::-1], [0.0]])
+    min_rest = np.vstack([
+        np.cumsum([meal.values.min(axis=0) for meal in meals][::-1], axis=0)[::-1],
+        np.zeros((1, len(caps)))
+    ])
+    max_rest = np.vstack([
+        np.cumsum([meal.values.max(axis=0) for meal in meals][::-1], axis=0)[::-1],
+        np.zeros((1, len(caps)))
+    ])
+
+    # 상한이 있는 지표(예산, 질환별 영양소)만 제약 판정
+    capped = np.flatnonzero(np.isfinite(caps))
+    capped_values = [np.ascontiguousarray(meal.values[:, capped]) for meal in meals]
+    calorie_scale = DAY_PLAN_CALORIE_WEIGHT / targets.calories
+    protein_scale = DAY_PLAN_PROTEIN_WEIGHT / targets.protein
+
+    state = {'nodes': 0, 'exhausted': False}
+    chosen: List[Tuple[int, ...]] = []
+    used = np.zeros(len(slot), dtype=np.float64)
+    last = len(meals) - 1
+
+    def search(m: int, score_sum: float, totals: np.ndarray) -> None:
+        meal = meals[m]
+        # 이 끼니의 모든 조합을 한 번에 판정: 제약, 음식 중복, 한계(점수 상한 - 최소 벌점)
+        calories = meal.calories + totals[0]
+        calorie_gap = np.maximum(calories + (min_rest[m + 1][0] - targets.calories),
+                                 (targets.calories - max_rest[m + 1][0]) - calories)
+        np.maximum(calorie_gap, 0.0, out=calorie_gap)
+        protein_gap = (targets.protein - max_rest[m + 1][1] - totals[1]) - meal.protein
+        np.maximum(protein_gap, 0.0, out=protein_gap)
+        bound = meal.score + (score_sum + best_rest[m + 1])
+        bound -= calorie_scale * calorie_gap
+        bound -= protein_scale * protein_gap
+
+        ok = bound > best['objective']
+        if len(capped):
+            slack = caps[capped] - min_rest[m + 1][capped] - totals[capped]
+            ok &= (capped_values[m] <= slack).all(axis=1)
+        if chosen:
+            ok &= meal.membership @ used == 0.0
+        if m == last:
+            # 마지막 끼니는 한계가 곧 정확한 목적 함수 값
+            masked = np.where(ok, bound, -np.inf)
+            i = int(np.argmax(masked))
+            if masked[i] > best['objective']:
+                best.update(objective=float(bound[i]), picks=tuple(chosen) + (meal.members[i],),
+                            totals=totals + meal.values[i], incumbent=False)
+            return
+        for i in np.flatnonzero(ok):
+            if state['nodes'] >= node_limit or (deadline is not None and time.perf_counter() >= deadline):
+                state['exhausted'] = True
+                return
+            if bound[i] <= best['objective']:
+                continue
+            state['nodes'] += 1
+            chosen.append(meal.members[i])
+            used[meal.slots[i]] = 1.0
+            search(m + 1, score_sum + meal.score[i], totals + meal.values[i])
+            used[meal.slots[i]] = 0.0
+            chosen.pop()
+
+    search(0, 0.0, np.zeros(len(caps)))
+    return _plan(best, not state['exhausted'], state['nodes'])
+
+
+def _plan(best: Dict[str, Any], optimal: bool, nodes: int) -> Optional[DayPlan]:
+    if best['picks'] is None:
+        return None
+    totals = best['totals']
+    return DayPlan(
+        picks=best['picks'],
+        objective=float(best['objective']),
+        totals={'calories': float(totals[0]), 'protein': float(totals[1]), 'price': float(totals[2])},
+        optimal=optimal,
+        nodes=nodes,
+        incumbent=best['incumbent']
+    )
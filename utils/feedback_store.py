@@ -0,0 +1,210 @@
+"""
+별점 피드백 저장소
+사용자가 매긴 1~5점 별점을 추가 전용 JSONL 파일에 기록하고, 음식별 전체 통계와 사용자별 별점을
+평점이 들어올 때마다 상수 시간에 갱신 (기록 전체를 다시 읽거나 모델을 재학습하지 않음)
+
+- 같은 사용자가 같은 음식을 다시 평가하면 이전 별점을 대체 (전체 합계는 차이만큼 갱신)
+- 개인화 점수 = 사용자 가중치 × (내 별점 - 3) / 2 + 전체 가중치 × (보정 평균 - 3) / 2
+  보정 평균은 중립 3점을 FEEDBACK_PRIOR_COUNT개 더한 평균 (평가 수가 적은 음식의 과대 반영 방지)
+- 카탈로그 버전별 전체 개인화 벡터를 유지하고, 새 별점은 해당 음식 한 칸만 고침
+- 별점과 함께 프로필 특성 스냅샷(utils.scorers.profile_snapshot)을 기록해 적합도 모델 학습 데이터로 사용
+- 통계는 기록 파일에서 읽은 위치(offset) 이후의 새 줄만 반영하므로, 다른 프로세스(uvicorn 워커, Streamlit 서버)가
+  추가한 별점도 RELOAD_CHECK_INTERVAL 안에 보임 (파일이 줄거나 교체되면 처음부터 다시 읽음)
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import numpy as np
+from settings import FEEDBACK_GLOBAL_WEIGHT, FEEDBACK_PRIOR_COUNT, FEEDBACK_USER_WEIGHT
+from utils.food_catalog import RELOAD_CHECK_INTERVAL, FoodCatalog
+from utils.scorers import profile_snapshot
+
+# 별점 기록 파일 (FOOD_FEEDBACK_PATH 환경 변수로 변경 가능)
+FEEDBACK_PATH = os.path.normpath(
+    os.environ.get("FOOD_FEEDBACK_PATH")
+    or os.path.join(os.path.dirname(__file__), "..", "data", "feedback_ratings.jsonl")
+)
+
+NEUTRAL_RATING = 3
+
+
+def read_feedback(path: str = FEEDBACK_PATH) -> Iterator[Dict[str, Any]]:
+    """기록 파일의 별점 항목 (기록 순서, 파일이 없으면 없음)"""
+    if not path or not os.path.exists(path):
+        return
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def read_feedback_from(path: str, offset: int) -> Tuple[List[Dict[str, Any]], int]:
+    """기록 파일의 offset 이후 완결된 줄의 별점 항목과 다음 offset
+
+    다른 프로세스가 쓰는 중인 마지막 줄(줄바꿈 전)은 다음 호출에서 읽음
+    """
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        data = f.read()
+    end = data.rfind(b"\n") + 1
+    entries = [json.loads(line) for line in data[:end].decode('utf-8').splitlines() if line.strip()]
+    return entries, offset + end
+
+
+class FeedbackStore:
+    """별점 기록 + 증분 통계"""
+
+    def __init__(self, path: Optional[str] = FEEDBACK_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._food_totals: Dict[str, List[int]] = {}  # 음식 id → [평가 수, 별점 합]
+        self._user_ratings: Dict[str, Dict[str, int]] = {}  # 사용자 id → {음식 id: 별점}
+        # (카탈로그 버전, 행별 전체 평균 항, 음식 id → 행 번호)
+        self._global_vector: Optional[Tuple[str, np.ndarray, Callable[[str], Optional[int]]]] = None
+        self._file: Optional[Tuple[int, int]] = None  # 읽은 기록 파일의 (장치, inode)
+        self._offset = 0
+        self._last_check = 0.0
+        # 시작 시 기록 파일 전체를 읽어 통계 복원, 이후에는 새 줄만
+        with self._lock:
+            self._sync()
+
+    def _sync(self) -> None:
+        """기록 파일에 추가된 줄을 통계에 반영 (호출 측에서 _lock 보유)"""
+        self._last_check = time.monotonic()
+        if not self.path:
+            return
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            stat = None
+        file = None if stat is None else (stat.st_dev, stat.st_ino)
+        if file != self._file or (stat is not None and stat.st_size < self._offset):
+            # 파일이 삭제/교체되거나 비워지면 처음부터 다시 읽음
+            self._food_totals = {}
+            self._user_ratings = {}
+            self._global_vector = None
+            self._file = file
+            self._offset = 0
+        if stat is None or stat.st_size == self._offset:
+            return
+        entries, self._offset = read_feedback_from(self.path, self._offset)
+        for entry in entries:
+            self._apply(entry['user'], entry['food'], int(entry['rating']))
+
+    def _refresh(self) -> None:
+        """확인 주기가 지났으면 기록 파일의 새 줄 반영 (호출 측에서 _lock 보유)"""
+        if time.monotonic() - self._last_check >= RELOAD_CHECK_INTERVAL:
+            self._sync()
+
+    def _apply(self, user_id: str, food_id: str, rating: int) -> None:
+        ratings = self._user_ratings.setdefault(user_id, {})
+        previous = ratings.get(food_id)
+        totals = self._food_totals.setdefault(food_id, [0, 0])
+        if previous is None:
+            totals[0] += 1
+            totals[1] += rating
+        else:
+            totals[1] += rating - previous
+        ratings[food_id] = rating
+        if self._global_vector is not None:
+            _, vector, row_of = self._global_vector
+            row = row_of(food_id)
+            if row is not None:
+                vector[row] = self._global_term(food_id)
+
+    def record(self, user_id: str, food_id: str, rating: int,
+               user_profile: Optional[Dict[str, Any]] = None) -> None:
+        """별점 하나 기록 (파일에 한 줄 추가 + 그때까지 추가된 줄을 읽어 통계/개인화 벡터 갱신)
+
+        user_profile이 있으면 프로필 특성 스냅샷을 함께 기록 (적합도 모델 학습용)
+        """
+        if not isinstance(rating, int) or not 1 <= rating <= 5:
+            raise ValueError(f"별점은 1~5 사이 정수여야 합니다: {rating!r}")
+        entry: Dict[str, Any] = {'user': user_id, 'food': food_id, 'rating': rating, 'ts': time.time()}
+        if user_profile is not None:
+            entry['profile'] = profile_snapshot(user_profile)
+        with self._lock:
+            if not self.path:
+                self._apply(user_id, food_id, rating)
+                return
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            # 방금 쓴 줄은 다른 프로세스가 그 사이에 추가한 줄과 함께 파일에서 읽어 반영 (기록 순서 유지)
+            self._sync()
+
+    def food_stats(self, food_id: str) -> Tuple[int, float]:
+        """음식의 (평가 수, 평균 별점) (평가가 없으면 (0, 3.0))"""
+        with self._lock:
+            self._refresh()
+            count, total = self._food_totals.get(food_id, (0, 0))
+        return count, (total / count if count else float(NEUTRAL_RATING))
+
+    def user_rating(self, user_id: str, food_id: str) -> Optional[int]:
+        with self._lock:
+            self._refresh()
+            return self._user_ratings.get(user_id, {}).get(food_id)
+
+    def _global_term(self, food_id: str) -> float:
+        count, total = self._food_totals.get(food_id, (0, 0))
+        smoothed = (total + FEEDBACK_PRIOR_COUNT * NEUTRAL_RATING) / (count + FEEDBACK_PRIOR_COUNT)
+        return FEEDBACK_GLOBAL_WEIGHT * (smoothed - NEUTRAL_RATING) / 2
+
+    def _global_terms(self, catalog: FoodCatalog) -> np.ndarray:
+        """카탈로그 전체 행의 전체 평균 항 (버전이 바뀔 때만 평가된 음식 수만큼 다시 계산)"""
+        cached = self._global_vector
+        if cached is None or cached[0] != catalog.version:
+            vector = np.zeros(len(catalog), dtype=np.float32)
+            for food_id in self._food_totals:
+                row = catalog.row_of(food_id)
+                if row is not None:
+                    vector[row] = self._global_term(food_id)
+            cached = (catalog.version, vector, catalog.row_of)
+            self._global_vector = cached
+        return cached[1]
+
+    def personalization(self, catalog: FoodCatalog, user_id: Optional[str],
+                        rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """개인화 점수 (rows가 없으면 전체 카탈로그 행, float32)"""
+        with self._lock:
+            self._refresh()
+            terms = self._global_terms(catalog)
+            terms = terms.copy() if rows is None else terms[rows]
+            ratings = self._user_ratings.get(user_id) if user_id else None
+            if ratings:
+                # 내가 평가한 음식만 (평가 수에 비례, 기록 전체를 훑지 않음)
+                rated = [(catalog.row_of(food_id), rating) for food_id, rating in ratings.items()]
+                rated = sorted((row, rating) for row, rating in rated if row is not None)
+                if rated:
+                    rated_rows = np.array([row for row, _ in rated])
+                    bonus = np.array([FEEDBACK_USER_WEIGHT * (rating - NEUTRAL_RATING) / 2 for _, rating in rated],
+                                     dtype=np.float32)
+                    if rows is None:
+                        terms[rated_rows] += bonus
+                    else:
+                        index = np.minimum(np.searchsorted(rated_rows, rows), len(rated_rows) - 1)
+                        hit = rated_rows[index] == rows
+                        terms[hit] += bonus[index[hit]]
+            return terms
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return sum(count for count, _ in self._food_totals.values())
+
+
+_store: Optional[FeedbackStore] = None
+_store_lock = threading.Lock()
+
+
+def get_feedback_store() -> FeedbackStore:
+    """프로세스 공유 피드백 저장소 (최초 호출 시 기록 파일에서 복원, 이후 다른 프로세스의 기록도 증분 반영)"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = FeedbackStore()
+    return _store
@@ -0,0 +1,229 @@
+"""
+프로필 필터 컴파일러
+사용자 프로필과 settings의 규칙(DISEASE_RESTRICTIONS, DIET_RESTRICTIONS_RULES, HEALTH_GOAL_TAGS)을
+하나의 술어 계획(FilterPlan)으로 변환하고, 컬럼형 카탈로그 위에서 bool 마스크 한 개로 실행 (중간 DataFrame을 만들지 않음)
+
+계획 = 단계(Stage) 목록, 단계 = 술어(Predicate) 목록
+- exclude_any: 리스트 필드에 값 중 하나라도 있으면 제외
+- require_any: 리스트 필드에 값 중 하나라도 있어야 함
+- prefer_any: 해당하는 음식이 남아 있으면 그 음식으로만 제한 (없으면 무시)
+- rank_any: 제외 없이 해당 음식을 앞쪽으로 정렬
+- max: 숫자 컬럼 <= limit (SORTED_INDEX_COLUMNS는 값 순서 인덱스의 이진 탐색으로 처리)
+fallback 단계는 결과가 비면 단계 전체를 건너뜀 (KoreanFoodRecommender의 기존 동작)
+"""
+
+import numpy as np
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from settings import DIET_RESTRICTIONS_RULES, DISEASE_RESTRICTIONS, HEALTH_GOAL_TAGS
+from utils.food_catalog import SORTED_INDEX_COLUMNS, FoodCatalog
+from utils.nutrient_budget import daily_nutrient_limits
+
+# 범위 조건의 인덱스 구간이 카탈로그의 이 비율 이하일 때만 값 순서 인덱스 사용
+RANGE_INDEX_MAX_FRACTION = 0.05
+
+
+class Predicate(NamedTuple):
+    """카탈로그 컬럼 하나에 대한 조건"""
+    op: str
+    field: str
+    values: Tuple[str, ...] = ()
+    limit: float = 0.0
+    match: str = 'exact'  # 'exact' (정규화 값 일치) | 'contains' (정규화 부분 문자열), 알레르기/재료는 동의어 포함
+
+    def mask(self, catalog: FoodCatalog, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """전체 카탈로그 bool 마스크 (rows가 있으면 그 행들만)"""
+        if self.op == 'max':
+            values = catalog.column(self.field)
+            return (values if rows is None else values[rows]) <= self.limit
+        if self.match == 'contains':
+            codes = catalog.codes_containing(self.field, self.values)
+        else:
+            codes = catalog.codes_matching(self.field, self.values)
+        return catalog.any_of(self.field, codes, rows)
+
+
+class Stage(NamedTuple):
+    """함께 적용되는 술어 묶음"""
+    name: str
+    predicates: Tuple[Predicate, ...]
+    fallback: bool = False
+
+    def range_bounds(self) -> Dict[str, Tuple[Optional[float], Optional[float]]]:
+        """값 순서 인덱스로 처리할 max 조건 {컬럼: (None, 상한)}
+
+        prefer_any는 앞선 조건의 결과에 따라 달라지므로, 이 경우 술어 순서대로 마스크로 평가
+        """
+        if any(predicate.op == 'prefer_any' for predicate in self.predicates):
+            return {}
+        bounds: Dict[str, Tuple[Optional[float], Optional[float]]] = {}
+        for predicate in self.predicates:
+            if predicate.op == 'max' and predicate.field in SORTED_INDEX_COLUMNS:
+                high = bounds.get(predicate.field, (None, predicate.limit))[1]
+                bounds[predicate.field] = (None, min(high, predicate.limit))
+        return bounds
+
+
+class FilterPlan(NamedTuple):
+    """컴파일된 필터 계획 (해시 가능, 캐시 키로 사용 가능)"""
+    stages: Tuple[Stage, ...]
+
+    def _evaluate(self, catalog: FoodCatalog, keep: Optional[np.ndarray]) -> Tuple[Optional[np.ndarray], List[np.ndarray]]:
+        """단계를 순서대로 적용
+
+        keep은 None(모든 유효 행), 전체 카탈로그 bool 마스크, 행 번호 배열 중 하나.
+        범위 조건 단계는 인덱스 구간의 행 번호로 결과를 내고, 이후 단계도 그 행들만 평가 (전체 마스크를 만들지 않음).
+        전체 마스크는 행 번호가 아직 없는 상태에서 인덱스를 쓰지 않는 단계를 만났을 때만 생성
+        """
+        ranks: List[np.ndarray] = []
+        for stage in self.stages:
+            by_rows = keep is not None and keep.dtype != bool
+            # 이미 행 번호면 상한 조건도 그 행들의 값으로만 확인하는 편이 인덱스 구간보다 작음
+            bounds = {} if by_rows else stage.range_bounds()
+            if bounds and catalog.range_size(bounds) > RANGE_INDEX_MAX_FRACTION * len(catalog):
+                # 구간이 넓으면 전체 컬럼 비교가 더 빠름
+                bounds = {}
+            if bounds:
+                # 예산/영양소 상한은 인덱스 구간으로 (전체 컬럼 비교 없이 O(log n + k))
+                current = catalog.range_rows(bounds, ordered=False)
+                if keep is not None:
+                    current = current[keep[current]]
+                by_rows = True
+            elif keep is None:
+                current = np.ones(len(catalog), dtype=bool) if catalog.alive is None else catalog.alive.copy()
+            else:
+                current = keep if by_rows else keep.copy()
+            stage_ranks = []
+            for predicate in stage.predicates:
+                if predicate.op == 'max' and predicate.field in bounds:
+                    continue
+                if predicate.op == 'rank_any':
+                    stage_ranks.append(predicate.mask(catalog))
+                    continue
+                matched = predicate.mask(catalog, current if by_rows else None)
+                if predicate.op == 'exclude_any':
+                    matched = ~matched
+                elif predicate.op == 'prefer_any':
+                    # 해당하는 음식이 하나도 남지 않으면 조건 무시
+                    preferred = matched if by_rows else current & matched
+                    if not preferred.any():
+                        continue
+                if by_rows:
+                    current = current[matched]
+                else:
+                    current &= matched
+            if stage.fallback and not (len(current) if by_rows else current.any()):
+                continue
+            keep = current
+            ranks.extend(stage_ranks)
+        return keep, ranks
+
+    def mask(self, catalog: FoodCatalog, candidates: Optional[np.ndarray] = None) -> np.ndarray:
+        """계획을 통과한 행의 전체 카탈로그 bool 마스크 (candidates가 있으면 그 행 안에서만)"""
+        keep = self._evaluate(catalog, self._base(candidates))[0]
+        if keep is None:
+            return np.ones(len(catalog), dtype=bool) if catalog.alive is None else catalog.alive.copy()
+        if keep.dtype == bool:
+            return keep
+        mask = np.zeros(len(catalog), dtype=bool)
+        mask[keep] = True
+        return mask
+
+    def rows(self, catalog: FoodCatalog, candidates: Optional[np.ndarray] = None) -> np.ndarray:
+        """계획을 통과한 행 번호 배열 (candidates 순서 유지, rank_any 조건은 안정 정렬로 앞쪽 배치)"""
+        keep, ranks = self._evaluate(catalog, self._base(candidates))
+        if candidates is not None:
+            rows = np.asarray(candidates, dtype=np.intp)
+            rows = rows[keep[rows]] if keep.dtype == bool else rows[np.isin(rows, keep)]
+        elif keep is None:
+            rows = catalog.live_rows().copy()
+        else:
+            rows = np.flatnonzero(keep) if keep.dtype == bool else np.sort(keep)
+        if ranks:
+            # 나중에 적용된 정렬 기준이 우선 (단계별 안정 정렬을 순서대로 적용한 것과 동일)
+            order = np.lexsort([np.arange(len(rows))] + [~rank[rows] for rank in ranks])
+            rows = rows[order]
+        return rows
+
+    @staticmethod
+    def _base(candidates: Optional[np.ndarray]) -> Optional[np.ndarray]:
+        """평가 시작 상태: 모든 유효 행(None) 또는 candidates 행 번호 (중복 제거, 오름차순)"""
+        if candidates is None:
+            return None
+        return np.unique(np.asarray(candidates, dtype=np.intp))
+
+
+def allergy_stage(allergies: List[str], match: str = 'contains', fallback: bool = False) -> Stage:
+    return Stage('allergies', (Predicate('exclude_any', 'allergies', tuple(allergies), match=match),), fallback)
+
+
+def budget_stage(budget: float, fallback: bool = False) -> Stage:
+    return Stage('budget', (Predicate('max', 'price', limit=budget),), fallback)
+
+
+def medical_stage(conditions: List[str]) -> Stage:
+    """DISEASE_RESTRICTIONS: 금지 태그 제외 + 권장 태그 우선 정렬"""
+    predicates = []
+    for condition in conditions:
+        restrictions = DISEASE_RESTRICTIONS.get(condition)
+        if not restrictions:
+            continue
+        if 'forbidden_tags' in restrictions:
+            predicates.append(Predicate('exclude_any', 'tags', tuple(restrictions['forbidden_tags'])))
+        if 'recommended_tags' in restrictions:
+            predicates.append(Predicate('rank_any', 'tags', tuple(restrictions['recommended_tags'])))
+    return Stage('medical_conditions', tuple(predicates), fallback=True)
+
+
+def dietary_stage(restrictions: List[str]) -> Stage:
+    """DIET_RESTRICTIONS_RULES: 금지 태그 제외 + 허용 태그가 있는 음식으로 제한"""
+    predicates = []
+    for restriction in restrictions:
+        rules = DIET_RESTRICTIONS_RULES.get(restriction)
+        if not rules:
+            continue
+        if 'forbidden_tags' in rules:
+            predicates.append(Predicate('exclude_any', 'tags', tuple(rules['forbidden_tags'])))
+        if 'allowed_tags' in rules:
+            predicates.append(Predicate('prefer_any', 'tags', tuple(rules['allowed_tags'])))
+    return Stage('dietary_restrictions', tuple(predicates), fallback=True)
+
+
+def health_goal_stage(goal: str) -> Stage:
+    goal_tags = HEALTH_GOAL_TAGS.get(goal, HEALTH_GOAL_TAGS['체중유지'])
+    return Stage('health_goal', (Predicate('require_any', 'tags', tuple(goal_tags)),), fallback=True)
+
+
+def compile_profile_plan(user_profile: Dict[str, Any]) -> FilterPlan:
+    """utils.recommender 프로필 → 계획 (알레르기 부분 일치, 예산, 하루 영양소 상한을 혼자 넘는 음식 제외)
+
+    하루 합계 상한 자체는 끼니 구성 단계(DailyNutrientBudget)에서 적용
+    """
+    predicates = []
+    if user_profile.get('allergies'):
+        predicates.extend(allergy_stage(user_profile['allergies']).predicates)
+    if user_profile.get('budget') is not None:
+        predicates.extend(budget_stage(user_profile['budget']).predicates)
+    for nutrient, limit in sorted(daily_nutrient_limits(user_profile.get('diseases')).items()):
+        predicates.append(Predicate('max', nutrient, limit=limit))
+    return FilterPlan((Stage('basic', tuple(predicates)),))
+
+
+def compile_recommender_plan(user_profile: Dict[str, Any]) -> FilterPlan:
+    """KoreanFoodRecommender 프로필 → 계획 (단계별로 결과가 비면 해당 단계 생략)"""
+    stages = []
+    if user_profile.get('allergies'):
+        stages.append(allergy_stage(user_profile['allergies'], match='exact', fallback=True))
+    budget = user_profile.get('budget_per_meal', 10000)
+    if budget is not None:
+        stages.append(budget_stage(budget, fallback=True))
+
+    conditions = user_profile.get('medical_conditions') or []
+    if conditions and "없음" not in conditions:
+        stages.append(medical_stage(conditions))
+
+    restrictions = user_profile.get('dietary_restrictions') or []
+    if restrictions and "없음" not in restrictions:
+        stages.append(dietary_stage(restrictions))
+
+    stages.append(health_goal_stage(user_profile.get('health_goal', '체중유지')))
+    return FilterPlan(tuple(stages))
@@ -0,0 +1,768 @@
+"""
+공유 한국 음식 카탈로그
+/data/정제 데이터.json 파일을 프로세스당 한 번만 로드하여 모든 추천 경로가 같은 객체를 공유
+파일의 mtime 또는 내용 해시가 바뀌면 새 카탈로그를 만들어 원자적으로 교체
+
+카탈로그는 컬럼 지향(struct-of-arrays) 구조로 저장
+- 영양/가격 필드: 연속된 float32 NumPy 배열
+- type/category/brand/cuisine: 공유 문자열 테이블을 가리키는 int32 코드
+- ingredients/tags/allergies: CSR 형태 (offsets + 문자열 코드) + 음식별 packed 비트마스크
+
+델타 저널(utils.catalog_delta)의 upsert/delete는 변경된 행만 반영한 새 카탈로그로 교체되며,
+삭제된 행은 alive 마스크로 표시(tombstone)해 기존 행 번호와 파생 캐시를 그대로 재사용
+"""
+
+import hashlib
+import os
+from array import array
+import threading
+import time
+import numpy as np
+import pandas as pd
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from utils.term_matcher import VocabularyIndex, uses_synonyms
+
+# 고정된 단일 데이터 경로 (규모 테스트 시 FOOD_CATALOG_PATH 환경 변수로 합성 카탈로그 지정)
+DATA_PATH = os.path.normpath(
+    os.environ.get("FOOD_CATALOG_PATH")
+    or os.path.join(os.path.dirname(__file__), "..", "data", "정제 데이터.json")
+)
+
+# 파일 변경 확인 최소 간격 (초) - 요청마다 stat 호출을 반복하지 않도록 제한
+RELOAD_CHECK_INTERVAL = 1.0
+
+# float32 컬럼으로 저장할 숫자 필드
+NUMERIC_COLUMNS = [
+    'calories', 'protein', 'fat', 'carbs', 'sodium', 'sugar', 'fiber',
+    'saturatedFat', 'cholesterol', 'transFat', 'calcium', 'iron', 'vitaminC',
+    'price', 'score', 'popularity', 'rating'
+]
+
+# 레코드 복원 시 정수로 되돌릴 필드
+INTEGER_COLUMNS = {'popularity'}
+
+# 공유 문자열 테이블 코드로 저장할 범주형 필드
+CATEGORICAL_COLUMNS = ['type', 'category', 'brand', 'cuisine']
+
+# 문자열 리스트 필드
+LIST_COLUMNS = ['ingredients', 'tags', 'allergies']
+
+# 로드 시 값 순서 인덱스를 만드는 숫자 필드 (예산/영양소 범위 조건을 이진 탐색으로 처리)
+SORTED_INDEX_COLUMNS = ['price', 'calories', 'protein', 'sodium', 'sugar']
+
+
+def _readonly(array: np.ndarray) -> np.ndarray:
+    """배열을 읽기 전용으로 표시"""
+    array.flags.writeable = False
+    return array
+
+
+def _to_float(value: Any) -> float:
+    """숫자 변환 (변환 불가 시 NaN)"""
+    if value is None:
+        return np.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _to_python(value: np.float32, integer: bool = False) -> Any:
+    """float32 값을 원래 JSON 값에 가까운 파이썬 숫자로 복원"""
+    if np.isnan(value):
+        return None
+    if integer:
+        return int(value)
+    # float32의 최단 표현을 사용해 8.4 -> 8.399999... 같은 오차 노출 방지
+    return float(str(value))
+
+
+class StringTable:
+    """카탈로그 전체가 공유하는 문자열 인턴 테이블"""
+
+    def __init__(self, strings: Iterable[str] = ()):
+        self.strings: List[str] = []
+        self._codes: Dict[str, int] = {}
+        for value in strings:
+            self.intern(value)
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+    def __getitem__(self, code: int) -> str:
+        return self.strings[code]
+
+    def intern(self, value: str) -> int:
+        """문자열을 등록하고 코드 반환"""
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.strings)
+            self.strings.append(value)
+            self._codes[value] = code
+        return code
+
+    def code(self, value: str) -> int:
+        """문자열 코드 조회 (없으면 -1)"""
+        return self._codes.get(value, -1)
+
+    def codes(self, values: Iterable[str]) -> np.ndarray:
+        """등록된 문자열들의 코드 배열 (미등록 문자열은 제외)"""
+        found = [self._codes[v] for v in values if v in self._codes]
+        return np.asarray(found, dtype=np.int32)
+
+    def matching(self, predicate: Callable[[str], bool], candidates: Iterable[int]) -> np.ndarray:
+        """후보 코드 중 문자열이 조건을 만족하는 코드 배열"""
+        found = [int(c) for c in candidates if predicate(self.strings[c])]
+        return np.asarray(found, dtype=np.int32)
+
+
+class StringColumn(Sequence):
+    """UTF-8 바이트 + offsets로 저장된 문자열 컬럼 (메모리 맵 공유 가능, 접근 시 디코딩)"""
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray):
+        self.blob = blob
+        self.offsets = offsets
+
+    @classmethod
+    def from_strings(cls, values: Iterable[str]) -> "StringColumn":
+        encoded = [value.encode('utf-8') for value in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(item) for item in encoded], out=offsets[1:])
+        blob = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+        return cls(blob, offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        return self.blob[self.offsets[index]:self.offsets[index + 1]].tobytes().decode('utf-8')
+
+    def __iter__(self) -> Iterator[str]:
+        data = self.blob.tobytes()
+        offsets = self.offsets.tolist()
+        for start, end in zip(offsets[:-1], offsets[1:]):
+            yield data[start:end].decode('utf-8')
+
+
+class OverlayColumn(Sequence):
+    """기존 문자열 컬럼 위에 변경/추가된 행만 덮어쓴 컬럼 (델타 적용 시 전체 복사 방지)"""
+
+    def __init__(self, base: Sequence[str], overrides: Dict[int, str], appended: List[str]):
+        if isinstance(base, OverlayColumn):
+            # 중첩 오버레이는 한 단계로 합침
+            overrides = {**base.overrides, **overrides}
+            appended = base.appended + appended
+            base = base.base
+        self.base = base
+        self.overrides = overrides
+        self.appended = appended
+
+    def __len__(self) -> int:
+        return len(self.base) + len(self.appended)
+
+    def __getitem__(self, index: int) -> str:
+        value = self.overrides.get(index)
+        if value is not None:
+            return value
+        if index >= len(self.base):
+            return self.appended[index - len(self.base)]
+        return self.base[index]
+
+    def __iter__(self) -> Iterator[str]:
+        for index, value in enumerate(self.base):
+            yield self.overrides.get(index, value)
+        size = len(self.base)
+        for offset, value in enumerate(self.appended):
+            yield self.overrides.get(size + offset, value)
+
+
+class FieldBitset:
+    """리스트 필드(알레르기/태그/재료)의 음식별 packed 비트마스크
+
+    비트 i는 문자열 코드 vocabulary[i]에 대응하며, words는 (음식 수, 워드 수) uint64 행렬
+    """
+
+    def __init__(self, vocabulary: np.ndarray, words: np.ndarray):
+        self.vocabulary = vocabulary
+        self.words = words
+
+    @classmethod
+    def from_lists(cls, offsets: np.ndarray, values: np.ndarray) -> "FieldBitset":
+        """CSR 리스트에서 비트마스크 생성"""
+        size = len(offsets) - 1
+        vocabulary = np.unique(values).astype(np.int32)
+        n_words = max(1, (len(vocabulary) + 63) // 64)
+        words = np.zeros((size, n_words), dtype=np.uint64)
+        if len(values):
+            rows = np.repeat(np.arange(size), np.diff(offsets))
+            bits = np.searchsorted(vocabulary, values)
+            np.bitwise_or.at(
+                words, (rows, bits // 64),
+                np.left_shift(np.uint64(1), (bits % 64).astype(np.uint64))
+            )
+        return cls(_readonly(vocabulary), _readonly(words))
+
+    def query(self, codes: Iterable[int]) -> np.ndarray:
+        """문자열 코드 집합을 질의용 비트마스크로 변환 (어휘에 없는 코드는 무시)"""
+        query = np.zeros(self.words.shape[1], dtype=np.uint64)
+        codes = np.fromiter(codes, dtype=np.int32)
+        bits = np.searchsorted(self.vocabulary, codes)
+        found = bits < len(self.vocabulary)
+        found[found] = self.vocabulary[bits[found]] == codes[found]
+        bits = bits[found]
+        np.bitwise_or.at(query, bits // 64, np.left_shift(np.uint64(1), (bits % 64).astype(np.uint64)))
+        return query
+
+    def with_rows(self, offsets: np.ndarray, values: np.ndarray, rows: np.ndarray) -> "FieldBitset":
+        """rows 행만 새 CSR 리스트로 다시 계산한 비트마스크 (행 추가 포함)
+
+        새 문자열 코드가 기존 어휘보다 모두 크면 비트를 뒤에 덧붙이고,
+        그렇지 않으면 비트 순서가 바뀌므로 전체를 다시 생성
+        """
+        size = len(offsets) - 1
+        row_values = [values[offsets[r]:offsets[r + 1]] for r in rows]
+        touched = np.unique(np.concatenate(row_values)) if row_values else np.zeros(0, dtype=np.int32)
+        added = np.setdiff1d(touched, self.vocabulary).astype(np.int32)
+        if len(added) and len(self.vocabulary) and added[0] < self.vocabulary[-1]:
+            return FieldBitset.from_lists(offsets, values)
+
+        vocabulary = np.concatenate([self.vocabulary, added]).astype(np.int32)
+        n_words = max(1, (len(vocabulary) + 63) // 64)
+        words = np.zeros((size, n_words), dtype=np.uint64)
+        words[:self.words.shape[0], :self.words.shape[1]] = self.words
+        words[rows] = 0
+        for row, codes in zip(rows, row_values):
+            bits = np.searchsorted(vocabulary, codes)
+            np.bitwise_or.at(words[row], bits // 64, np.left_shift(np.uint64(1), (bits % 64).astype(np.uint64)))
+        return FieldBitset(_readonly(vocabulary), _readonly(words))
+
+    def any_of(self, query: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """질의 비트 중 하나라도 가진 음식 (bool 마스크, rows가 있으면 그 행들만)"""
+        words = self.words if rows is None else self.words[rows]
+        if words.shape[1] == 1:
+            return (words[:, 0] & query[0]) != 0
+        return ((words & query) != 0).any(axis=1)
+
+    def all_of(self, query: np.ndarray) -> np.ndarray:
+        """질의 비트를 모두 가진 음식 (bool 마스크)"""
+        if self.words.shape[1] == 1:
+            return (self.words[:, 0] & query[0]) == query[0]
+        return ((self.words & query) == query).all(axis=1)
+
+
+class SortedIndex:
+    """숫자 컬럼 하나의 값 순서 인덱스
+
+    rows는 결측값과 삭제된 행을 제외한 행 번호를 값 오름차순으로 정렬한 배열, values는 그 값.
+    범위 조건은 searchsorted 두 번으로 rows의 연속 구간(뷰)이 되므로 O(log n + k)
+    """
+
+    def __init__(self, rows: np.ndarray, values: np.ndarray):
+        self.rows = rows
+        self.values = values
+
+    @classmethod
+    def from_column(cls, column: np.ndarray, alive: Optional[np.ndarray] = None) -> "SortedIndex":
+        valid = ~np.isnan(column)
+        if alive is not None:
+            valid &= alive
+        rows = np.flatnonzero(valid)
+        rows = rows[np.argsort(column[rows], kind='stable')]
+        return cls(_readonly(rows), _readonly(column[rows]))
+
+    def range(self, low: Optional[float] = None, high: Optional[float] = None) -> np.ndarray:
+        """low <= 값 <= high 인 행 번호 (값 순서, None이면 해당 쪽 제한 없음)"""
+        start = 0 if low is None else int(np.searchsorted(self.values, np.float32(low), side='left'))
+        stop = len(self.values) if high is None else int(np.searchsorted(self.values, np.float32(high), side='right'))
+        return self.rows[start:max(start, stop)]
+
+    def with_rows(self, column: np.ndarray, alive: Optional[np.ndarray], rows: np.ndarray) -> "SortedIndex":
+        """rows 행만 빼고 새 값으로 다시 끼워 넣은 인덱스 (전체 재정렬 없음)"""
+        keep = ~np.isin(self.rows, rows)
+        kept_rows, kept_values = self.rows[keep], self.values[keep]
+        rows = np.asarray(rows)
+        rows = rows[~np.isnan(column[rows])]
+        if alive is not None:
+            rows = rows[alive[rows]]
+        rows = rows[np.argsort(column[rows], kind='stable')]
+        positions = np.searchsorted(kept_values, column[rows], side='right')
+        return SortedIndex(
+            _readonly(np.insert(kept_rows, positions, rows)),
+            _readonly(np.insert(kept_values, positions, column[rows]))
+        )
+
+
+class FoodCatalog:
+    """불변 컬럼형 음식 카탈로그 (로드 이후 수정하지 않음)"""
+
+    def __init__(
+        self,
+        ids: Sequence[str],
+        names: Sequence[str],
+        numeric: Dict[str, np.ndarray],
+        codes: Dict[str, np.ndarray],
+        lists: Dict[str, Tuple[np.ndarray, np.ndarray]],
+        strings: StringTable,
+        version: str,
+        source_path: str,
+        mtime_ns: int,
+        bitsets: Optional[Dict[str, FieldBitset]] = None,
+        validated: bool = False,
+        alive: Optional[np.ndarray] = None
+    ):
+        self.ids = ids
+        self.names = names
+        self.numeric = numeric
+        self.codes = codes
+        self.lists = lists
+        self.strings = strings
+        self.bitsets = bitsets or {
+            name: FieldBitset.from_lists(*lists[name]) for name in LIST_COLUMNS
+        }
+        self.version = version
+        self.source_path = source_path
+        self.mtime_ns = mtime_ns
+        # 이 버전(해시)의 레코드가 FoodItem 스키마 검증을 이미 통과했는지 여부
+        self.validated = validated
+        # 삭제되지 않은 행 (None이면 모든 행이 유효)
+        self.alive = alive
+        self._derived: Dict[str, Any] = {}
+        self._derived_lock = threading.RLock()
+
+    def __len__(self) -> int:
+        """물리 행 수 (삭제 표시된 행 포함, 행 번호 배열 크기)"""
+        return len(self.ids)
+
+    @property
+    def live_count(self) -> int:
+        """삭제되지 않은 음식 수"""
+        return len(self) if self.alive is None else int(self.alive.sum())
+
+    def live_rows(self) -> np.ndarray:
+        """삭제되지 않은 행 번호 배열"""
+        if self.alive is None:
+            return np.arange(len(self))
+        return self.derived('live_rows', lambda c: _readonly(np.flatnonzero(c.alive)))
+
+    def row_of(self, food_id: str) -> Optional[int]:
+        """음식 id의 행 번호 (없거나 삭제되었으면 None)"""
+        index = self.derived('id_index', lambda c: {
+            food_id: row for row, food_id in enumerate(c.ids) if c.alive is None or c.alive[row]
+        })
+        return index.get(food_id)
+
+    def derived(self, key: str, factory: Callable[["FoodCatalog"], Any]) -> Any:
+        """카탈로그 버전별 파생 데이터 캐시 (최초 1회만 생성)"""
+        value = self._derived.get(key)
+        if value is None:
+            with self._derived_lock:
+                value = self._derived.get(key)
+                if value is None:
+                    value = factory(self)
+                    self._derived[key] = value
+        return value
+
+    def column(self, name: str) -> np.ndarray:
+        """숫자 컬럼 (float32, 결측값은 NaN)"""
+        return self.numeric[name]
+
+    def sorted_index(self, name: str) -> SortedIndex:
+        """숫자 컬럼의 값 순서 인덱스 (버전당 1회 생성, 델타 적용 시 변경 행만 갱신)"""
+        return self.derived(f'sorted_index:{name}', lambda c: SortedIndex.from_column(c.column(name), c.alive))
+
+    def range_size(self, bounds: Dict[str, Tuple[Optional[float], Optional[float]]]) -> int:
+        """range_rows 결과 크기의 상한 (가장 좁은 인덱스 구간 길이, O(log n))"""
+        return min(len(self.sorted_index(name).range(low, high)) for name, (low, high) in bounds.items())
+
+    def range_rows(self, bounds: Dict[str, Tuple[Optional[float], Optional[float]]],
+                   ordered: bool = True) -> np.ndarray:
+        """여러 숫자 컬럼의 범위 조건 {컬럼: (low, high)}을 모두 만족하는 유효 행 번호
+
+        가장 좁은 구간 하나만 인덱스에서 꺼내고 나머지 조건은 그 행들의 값으로만 확인.
+        ordered=False면 행 번호 정렬을 생략 (마스크에 흩뿌릴 때)
+        """
+        if not bounds:
+            return self.live_rows()
+        slices = {name: self.sorted_index(name).range(low, high) for name, (low, high) in bounds.items()}
+        narrowest = min(slices, key=lambda name: len(slices[name]))
+        rows = np.sort(slices[narrowest]) if ordered else slices[narrowest]
+        for name, (low, high) in bounds.items():
+            if name == narrowest or len(rows) == 0:
+                continue
+            values = self.column(name)[rows]
+            keep = ~np.isnan(values)
+            if low is not None:
+                keep &= values >= np.float32(low)
+            if high is not None:
+                keep &= values <= np.float32(high)
+            rows = rows[keep]
+        return rows
+
+    def category_mask(self, name: str, values: Iterable[str], rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """범주형 컬럼 값이 values 중 하나인지 여부 (전체 카탈로그 bool 마스크, rows가 있으면 그 행들만)"""
+        codes = self.codes[name] if rows is None else self.codes[name][rows]
+        return np.isin(codes, self.strings.codes(values))
+
+    def vocabulary(self, field: str) -> np.ndarray:
+        """리스트 필드에 실제로 등장하는 문자열 코드 (비트 순서)"""
+        return self.bitsets[field].vocabulary
+
+    def any_of(self, field: str, codes: Iterable[int], rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """리스트 필드가 주어진 코드 중 하나라도 포함하는지 여부 (비트 AND 한 번, 전체 카탈로그 또는 rows bool 마스크)"""
+        bitset = self.bitsets[field]
+        return bitset.any_of(bitset.query(codes), rows)
+
+    def all_of(self, field: str, codes: Iterable[int]) -> np.ndarray:
+        """리스트 필드가 주어진 코드를 모두 포함하는지 여부 (전체 카탈로그 bool 마스크)"""
+        bitset = self.bitsets[field]
+        return bitset.all_of(bitset.query(codes))
+
+    def term_index(self, field: str) -> VocabularyIndex:
+        """리스트 필드 어휘의 정규화(NFC·소문자, 알레르기/재료는 동의어 포함) 결과 (버전당 1회 생성)"""
+        return self.derived(
+            f'term_index:{field}',
+            lambda c: VocabularyIndex(c.vocabulary(field), c.strings, uses_synonyms(field))
+        )
+
+    def codes_containing(self, field: str, needles: Iterable[str]) -> np.ndarray:
+        """리스트 필드 어휘 중 needle(알레르기/재료는 동의어 포함) 하나라도 부분 문자열로 포함하는 문자열 코드"""
+        return self.term_index(field).containing(needles)
+
+    def codes_matching(self, field: str, values: Iterable[str]) -> np.ndarray:
+        """리스트 필드 어휘 중 정규화(알레르기/재료는 동의어 대표어) 값이 values와 같은 문자열 코드"""
+        return self.term_index(field).matching(values)
+
+    def any_containing(self, field: str, needle: str, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """리스트 필드 항목 중 needle을 (대소문자 무시) 포함하는 항목이 있는지 여부 (rows가 있으면 그 행들만)"""
+        return self.any_of(field, self.codes_containing(field, [needle]), rows)
+
+    def name_contains(self, keywords: Iterable[str]) -> np.ndarray:
+        """음식 이름에 키워드 중 하나라도 포함되는지 여부 (키워드 조합별 캐시)"""
+        keywords = tuple(sorted(k.lower() for k in keywords))
+
+        def build(catalog: "FoodCatalog") -> np.ndarray:
+            lowered = (name.lower() for name in catalog.names)
+            return _readonly(np.fromiter(
+                (any(k in name for k in keywords) for name in lowered),
+                dtype=bool, count=len(catalog)
+            ))
+
+        return self.derived('name_contains:' + '|'.join(keywords), build)
+
+    def list_values(self, field: str, row: int) -> List[str]:
+        """한 행의 리스트 필드 값"""
+        offsets, values = self.lists[field]
+        return [self.strings[c] for c in values[offsets[row]:offsets[row + 1]]]
+
+    def record(self, row: int) -> Dict[str, Any]:
+        """한 행을 원래 JSON 레코드 형태의 딕셔너리로 복원"""
+        record: Dict[str, Any] = {'id': self.ids[row], 'name': self.names[row]}
+        for name in CATEGORICAL_COLUMNS:
+            code = self.codes[name][row]
+            record[name] = self.strings[code] if code >= 0 else None
+        for name in NUMERIC_COLUMNS:
+            record[name] = _to_python(self.numeric[name][row], name in INTEGER_COLUMNS)
+        for name in LIST_COLUMNS:
+            record[name] = self.list_values(name, row)
+        return record
+
+    @property
+    def row_records(self) -> List[Optional[Dict[str, Any]]]:
+        """행 번호별 레코드 딕셔너리 (삭제된 행은 None, 델타 적용 시 변경 행만 갱신)"""
+        return self.derived('row_records', lambda c: [
+            c.record(i) if c.alive is None or c.alive[i] else None for i in range(len(c))
+        ])
+
+    @property
+    def records(self) -> Tuple[Dict[str, Any], ...]:
+        """유효한 레코드 딕셔너리 (API 직렬화/검증용, 버전당 1회 생성)"""
+        return self.derived('records', lambda c: tuple(r for r in c.row_records if r is not None))
+
+    def inherit_derived(self, previous: "FoodCatalog", rows: np.ndarray) -> None:
+        """이전 버전의 파생 캐시 중 증분 갱신이 가능한 항목을 rows 행만 다시 계산해 이어받음"""
+        with previous._derived_lock:
+            cached = dict(previous._derived)
+        for key, value in cached.items():
+            patcher = _DERIVED_PATCHERS.get(key.split(':', 1)[0])
+            if patcher is not None:
+                self._derived[key] = patcher(key, value, self, rows)
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """공유 DataFrame 뷰 (인덱스 = 카탈로그 행 번호, 읽기 전용으로 사용)"""
+        return self.derived('frame', _build_frame)
+
+
+def _build_frame(catalog: FoodCatalog, rows: Optional[np.ndarray] = None) -> pd.DataFrame:
+    """컬럼 배열로 DataFrame 구성 (삭제된 행 제외, 인덱스 = 카탈로그 행 번호)
+
+    숫자 컬럼은 카탈로그 배열(메모리 맵 포함)을 복사 없이 그대로 참조하고,
+    결측값이 있는 컬럼만 0으로 채운 사본을 사용
+    """
+    if rows is None and catalog.alive is not None:
+        rows = catalog.live_rows()
+    if rows is None:
+        data: Dict[str, Any] = {'id': list(catalog.ids), 'name': list(catalog.names)}
+        index = None
+        take = lambda column: column
+    else:
+        data = {'id': [catalog.ids[r] for r in rows], 'name': [catalog.names[r] for r in rows]}
+        index = pd.Index(rows)
+        take = lambda column: column[rows]
+    for name in CATEGORICAL_COLUMNS:
+        data[name] = pd.Categorical.from_codes(take(catalog.codes[name]), categories=catalog.strings.strings)
+    for name in NUMERIC_COLUMNS:
+        column = take(catalog.numeric[name])
+        data[name] = np.nan_to_num(column, nan=0.0) if np.isnan(column).any() else column
+    for name in LIST_COLUMNS:
+        data[name] = [catalog.list_values(name, i) for i in (range(len(catalog)) if rows is None else rows)]
+    return pd.DataFrame(data, index=index, copy=False)
+
+
+def _patch_frame(key: str, frame: pd.DataFrame, catalog: FoodCatalog, rows: np.ndarray) -> pd.DataFrame:
+    """변경되지 않은 행은 기존 DataFrame에서 가져오고 변경/추가 행만 새로 구성"""
+    unchanged = frame[~np.isin(frame.index.to_numpy(), rows)]
+    # 문자열 테이블은 뒤에만 추가되므로 기존 코드를 유지한 채 범주만 확장
+    unchanged = unchanged.assign(**{
+        name: unchanged[name].cat.set_categories(catalog.strings.strings) for name in CATEGORICAL_COLUMNS
+    })
+    live = rows if catalog.alive is None else rows[catalog.alive[rows]]
+    return pd.concat([unchanged, _build_frame(catalog, live)]).sort_index(kind='stable')
+
+
+def _patch_row_records(key: str, records: List[Optional[Dict[str, Any]]], catalog: FoodCatalog,
+                       rows: np.ndarray) -> List[Optional[Dict[str, Any]]]:
+    patched = records + [None] * (len(catalog) - len(records))
+    for row in rows:
+        patched[row] = catalog.record(row) if catalog.alive is None or catalog.alive[row] else None
+    return patched
+
+
+def _patch_id_index(key: str, index: Dict[str, int], catalog: FoodCatalog, rows: np.ndarray) -> Dict[str, int]:
+    patched = dict(index)
+    for row in rows:
+        food_id = catalog.ids[row]
+        if catalog.alive is None or catalog.alive[row]:
+            patched[food_id] = int(row)
+        elif patched.get(food_id) == row:
+            del patched[food_id]
+    return patched
+
+
+def _patch_name_contains(key: str, mask: np.ndarray, catalog: FoodCatalog, rows: np.ndarray) -> np.ndarray:
+    suffix = key.split(':', 1)[1]
+    keywords = suffix.split('|') if suffix else []
+    patched = np.zeros(len(catalog), dtype=bool)
+    patched[:len(mask)] = mask
+    for row in rows:
+        name = catalog.names[row].lower()
+        patched[row] = any(k in name for k in keywords)
+    return _readonly(patched)
+
+
+def _patch_sorted_index(key: str, index: SortedIndex, catalog: FoodCatalog, rows: np.ndarray) -> SortedIndex:
+    return index.with_rows(catalog.column(key.split(':', 1)[1]), catalog.alive, rows)
+
+
+# 파생 캐시 키 접두사 → 증분 갱신 함수 (키, 이전 값, 새 카탈로그, 변경 행) -> 새 값
+# 등록되지 않은 캐시는 델타 적용 후 처음 접근할 때 다시 생성
+_DERIVED_PATCHERS: Dict[str, Callable[[str, Any, FoodCatalog, np.ndarray], Any]] = {
+    'frame': _patch_frame,
+    'row_records': _patch_row_records,
+    'id_index': _patch_id_index,
+    'name_contains': _patch_name_contains,
+    'sorted_index': _patch_sorted_index,
+}
+
+
+def register_derived_patcher(prefix: str, patcher: Callable[[str, Any, FoodCatalog, np.ndarray], Any]) -> None:
+    """다른 모듈의 파생 캐시(예: FoodItem 검증 결과)에 대한 증분 갱신 함수 등록"""
+    _DERIVED_PATCHERS[prefix] = patcher
+
+
+class CatalogBuilder:
+    """레코드를 하나씩 받아 컬럼 배열을 채우는 빌더
+
+    값은 레코드 딕셔너리를 보관하지 않고 곧바로 고정 폭 버퍼(array/bytearray)에 추가하므로,
+    스트리밍 로더와 함께 쓰면 메모리 사용량이 컬럼 크기 + 레코드 1개 수준으로 유지됨.
+    build() 이후에는 버퍼를 NumPy 배열이 그대로 참조하므로 더 이상 add() 할 수 없음
+    """
+
+    def __init__(self):
+        self.strings = StringTable()
+        self._size = 0
+        self._ids = bytearray()
+        self._id_offsets = array('q', [0])
+        self._names = bytearray()
+        self._name_offsets = array('q', [0])
+        self._numeric: Dict[str, array] = {name: array('f') for name in NUMERIC_COLUMNS}
+        self._codes: Dict[str, array] = {name: array('i') for name in CATEGORICAL_COLUMNS}
+        self._list_values: Dict[str, array] = {name: array('i') for name in LIST_COLUMNS}
+        self._list_offsets: Dict[str, array] = {name: array('q', [0]) for name in LIST_COLUMNS}
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, record: Dict[str, Any]) -> None:
+        """레코드 1개 추가"""
+        self._ids += str(record.get('id', self._size)).encode('utf-8')
+        self._id_offsets.append(len(self._ids))
+        self._names += str(record.get('name', '')).encode('utf-8')
+        self._name_offsets.append(len(self._names))
+        for name in NUMERIC_COLUMNS:
+            self._numeric[name].append(_to_float(record.get(name)))
+        for name in CATEGORICAL_COLUMNS:
+            value = record.get(name)
+            self._codes[name].append(self.strings.intern(value) if isinstance(value, str) else -1)
+        for name in LIST_COLUMNS:
+            items = record.get(name)
+            if isinstance(items, list):
+                self._list_values[name].extend(self.strings.intern(str(item)) for item in items)
+            self._list_offsets[name].append(len(self._list_values[name]))
+        self._size += 1
+
+    def build(self, version: str, source_path: str = '', mtime_ns: int = 0) -> FoodCatalog:
+        """누적된 레코드로 불변 카탈로그 생성 (버퍼를 복사 없이 배열로 사용)"""
+        def column(buffer: Any, dtype: Any) -> np.ndarray:
+            return _readonly(np.frombuffer(buffer, dtype=dtype) if len(buffer) else np.zeros(0, dtype=dtype))
+
+        ids = StringColumn(column(self._ids, np.uint8), column(self._id_offsets, np.int64))
+        names = StringColumn(column(self._names, np.uint8), column(self._name_offsets, np.int64))
+        numeric = {name: column(values, np.float32) for name, values in self._numeric.items()}
+        codes = {name: column(values, np.int32) for name, values in self._codes.items()}
+        lists = {
+            name: (column(self._list_offsets[name], np.int64), column(self._list_values[name], np.int32))
+            for name in LIST_COLUMNS
+        }
+        return FoodCatalog(
+            ids, names, numeric, codes, lists, self.strings,
+            version, source_path, mtime_ns
+        )
+
+
+def build_catalog(records: Iterable[Dict[str, Any]], version: str, source_path: str = '', mtime_ns: int = 0) -> FoodCatalog:
+    """레코드 목록으로 카탈로그 생성"""
+    builder = CatalogBuilder()
+    for record in records:
+        builder.add(record)
+    return builder.build(version, source_path, mtime_ns)
+
+
+def file_sha256(path: str) -> str:
+    """파일 내용 해시 (카탈로그 버전)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_json_catalog(path: str = DATA_PATH) -> FoodCatalog:
+    """JSON 배열 또는 JSON Lines 파일을 레코드 단위로 스트리밍 파싱해 새 카탈로그 생성"""
+    from utils.catalog_stream import iter_file_records
+
+    mtime_ns = os.stat(path).st_mtime_ns
+    digest = hashlib.sha256()
+    builder = CatalogBuilder()
+    for record in iter_file_records(path, digest):
+        builder.add(record)
+    return builder.build(digest.hexdigest(), path, mtime_ns)
+
+
+def load_catalog(path: str = DATA_PATH, use_snapshot: bool = True) -> FoodCatalog:
+    """바이너리 스냅샷을 우선 로드하고, 없거나 오래된 경우에만 JSON 파싱"""
+    if use_snapshot:
+        from utils.catalog_snapshot import load_snapshot
+        try:
+            catalog = load_snapshot(path)
+            if catalog is not None:
+                print(f"⚡ 바이너리 스냅샷에서 카탈로그 로드 ({len(catalog)}개)")
+                return catalog
+        except Exception as e:
+            print(f"⚠️ 스냅샷 로드 실패, JSON으로 대체: {e}")
+    return load_json_catalog(path)
+
+
+_catalog: Optional[FoodCatalog] = None
+_base_version = ''
+_seen_mtime_ns = 0
+_journal_offset = 0
+_last_check = 0.0
+_reload_lock = threading.Lock()
+
+
+def _build_indexes(catalog: FoodCatalog) -> FoodCatalog:
+    """범위 조건용 값 순서 인덱스를 로드 시점에 미리 생성"""
+    for name in SORTED_INDEX_COLUMNS:
+        catalog.sorted_index(name)
+    return catalog
+
+
+def _replay_journal(catalog: FoodCatalog, offset: int = 0) -> Tuple[FoodCatalog, int]:
+    """델타 저널의 offset 이후 항목을 카탈로그에 적용하고 (카탈로그, 다음 offset) 반환"""
+    from utils.catalog_delta import apply_deltas, read_journal
+
+    deltas, next_offset = read_journal(offset=offset)
+    if deltas:
+        catalog = apply_deltas(catalog, deltas)
+        print(f"🧾 델타 저널 {len(deltas)}건 적용: {catalog.live_count}개 음식 (버전 {catalog.version[:12]})")
+    return catalog, next_offset
+
+
+def get_catalog() -> FoodCatalog:
+    """프로세스 공유 카탈로그 반환 (파일 변경 시 자동 교체, 델타 저널은 증분 적용)"""
+    global _catalog, _base_version, _seen_mtime_ns, _journal_offset, _last_check
+
+    catalog = _catalog
+    now = time.monotonic()
+    if catalog is not None and now - _last_check < RELOAD_CHECK_INTERVAL:
+        return catalog
+
+    with _reload_lock:
+        catalog = _catalog
+        if catalog is not None and now - _last_check < RELOAD_CHECK_INTERVAL:
+            return catalog
+        _last_check = now
+
+        if catalog is None:
+            base = _build_indexes(load_catalog())
+            _base_version = base.version
+            _seen_mtime_ns = base.mtime_ns
+            print(f"🍲 공유 카탈로그 로드: {len(base)}개 음식 (버전 {base.version[:12]})")
+            _catalog, _journal_offset = _replay_journal(base)
+            return _catalog
+
+        try:
+            from utils.catalog_delta import journal_size
+
+            size = journal_size()
+            reload_base = size < _journal_offset  # 저널이 비워지거나 교체되면 원본부터 다시 적용
+            if os.path.exists(catalog.source_path):
+                # 원본 JSON 없이 스냅샷만 배포된 경우 원본 교체 확인 생략
+                mtime_ns = os.stat(catalog.source_path).st_mtime_ns
+                reload_base = reload_base or mtime_ns != _seen_mtime_ns
+
+            if reload_base:
+                fresh = _build_indexes(load_catalog(catalog.source_path))
+                _seen_mtime_ns = fresh.mtime_ns
+                if fresh.version != _base_version or size < _journal_offset:
+                    _base_version = fresh.version
+                    fresh, _journal_offset = _replay_journal(fresh)
+                    _catalog = fresh
+                    print(f"🔄 카탈로그 교체: {fresh.live_count}개 음식 (버전 {fresh.version[:12]})")
+                    return fresh
+                # 내용이 같으면 기존 카탈로그(및 파생 캐시)를 그대로 유지
+
+            if size > _journal_offset:
+                _catalog, _journal_offset = _replay_journal(catalog, _journal_offset)
+            return _catalog
+        except Exception as e:
+            print(f"⚠️ 카탈로그 리로드 실패, 기존 버전 유지: {e}")
+            return catalog
+
+
+def refresh_catalog() -> FoodCatalog:
+    """확인 주기를 기다리지 않고 원본/델타 저널 변경을 즉시 반영"""
+    global _last_check
+    _last_check = 0.0
+    return get_catalog()
@@ -0,0 +1,116 @@
+"""
+영양소 최근접 검색
+(칼로리, 단백질, 지방, 탄수화물, 나트륨)을 표준화한 벡터에 KD-tree를 만들어,
+1끼 목표 영양소에 가장 가까운 음식을 전체 행을 훑지 않고 찾음
+
+- 트리는 카탈로그 버전당 1회, 트리 검색이 처음 필요할 때 생성 (델타 적용 후에는 새 버전에서 다시 생성)
+- 표준화: 유효 행의 평균/표준편차, 결측값은 평균(표준화 후 0)으로 간주
+- 후보 행이 적으면 트리 대신 후보만 직접 거리 계산, 많으면 트리에서 k를 늘려 가며 후보에 속한 음식만 채택
+"""
+
+from typing import Dict, NamedTuple, Optional
+import numpy as np
+from utils.food_catalog import FoodCatalog
+
+# 검색에 쓰는 영양소 컬럼 (순서 고정)
+MACRO_COLUMNS = ['calories', 'protein', 'fat', 'carbs', 'sodium']
+
+# 후보 행이 이 개수 이하이면 트리 대신 직접 거리 계산
+BRUTE_FORCE_LIMIT = 2048
+
+# 목표별 칼로리 중 탄수화물/단백질/지방 비율 (나트륨은 하루 2000mg을 끼니 수로 나눔)
+MACRO_RATIOS = {
+    "체중감량": {'carbs': 0.40, 'protein': 0.35, 'fat': 0.25},
+    "근육증가": {'carbs': 0.45, 'protein': 0.35, 'fat': 0.20},
+    "체중유지": {'carbs': 0.50, 'protein': 0.25, 'fat': 0.25}
+}
+DAILY_SODIUM = 2000
+
+
+def meal_macro_target(meal_calories: float, goal: str, meals_per_day: float = 3) -> Dict[str, float]:
+    """1끼 목표 칼로리 → 1끼 목표 영양소 (단백질/탄수화물 4kcal/g, 지방 9kcal/g)"""
+    ratios = MACRO_RATIOS.get(goal, MACRO_RATIOS["체중유지"])
+    return {
+        'calories': meal_calories,
+        'protein': meal_calories * ratios['protein'] / 4,
+        'fat': meal_calories * ratios['fat'] / 9,
+        'carbs': meal_calories * ratios['carbs'] / 4,
+        'sodium': DAILY_SODIUM / meals_per_day
+    }
+
+
+class Neighbors(NamedTuple):
+    """검색 결과: 카탈로그 행 번호와 표준화 공간의 거리 (가까운 순)"""
+    rows: np.ndarray
+    distances: np.ndarray
+
+
+class MacroIndex:
+    """유효 행의 표준화 영양소 벡터 KD-tree"""
+
+    def __init__(self, catalog: FoodCatalog):
+        self.rows = catalog.live_rows()
+        values = np.stack([catalog.column(name)[self.rows] for name in MACRO_COLUMNS], axis=1).astype(np.float64)
+        self.mean = np.nanmean(values, axis=0) if len(values) else np.zeros(len(MACRO_COLUMNS))
+        std = np.nanstd(values, axis=0) if len(values) else np.ones(len(MACRO_COLUMNS))
+        self.scale = np.where(np.isfinite(std) & (std > 0), std, 1.0)
+        self.mean = np.nan_to_num(self.mean)
+        self.vectors = np.nan_to_num((values - self.mean) / self.scale)
+        self._tree = None
+        # 카탈로그 행 번호 → 트리 안 위치
+        self.positions = np.full(len(catalog), -1, dtype=np.int64)
+        self.positions[self.rows] = np.arange(len(self.rows))
+
+    @property
+    def tree(self):
+        """KD-tree (후보가 BRUTE_FORCE_LIMIT개를 넘는 검색에서 처음 필요할 때 생성)"""
+        if self._tree is None and len(self.vectors):
+            # scikit-learn은 트리를 실제로 만들 때만 import (기본 추천 경로의 시작 시간 유지)
+            from sklearn.neighbors import KDTree
+            self._tree = KDTree(self.vectors)
+        return self._tree
+
+    def normalize(self, target: Dict[str, float]) -> np.ndarray:
+        """목표 영양소를 표준화 공간의 점으로 변환 (없는 영양소는 평균)"""
+        point = np.array([target.get(name, np.nan) for name in MACRO_COLUMNS], dtype=np.float64)
+        return np.nan_to_num((point - self.mean) / self.scale)
+
+    def query(self, target: Dict[str, float], k: int, candidates: Optional[np.ndarray] = None) -> Neighbors:
+        """목표에 가장 가까운 음식 최대 k개 (candidates가 있으면 그 행 번호 안에서만)"""
+        point = self.normalize(target)
+        if len(self.vectors) == 0 or k <= 0:
+            return Neighbors(self.rows[:0], np.zeros(0))
+
+        if candidates is not None:
+            candidates = np.asarray(candidates)
+            positions = self.positions[candidates]
+            positions = positions[positions >= 0]
+            if len(positions) <= BRUTE_FORCE_LIMIT:
+                # 후보가 적으면 후보만 직접 계산
+                distances = np.sqrt(((self.vectors[positions] - point) ** 2).sum(axis=1))
+                order = np.lexsort((positions, distances))[:k]
+                return Neighbors(self.rows[positions[order]], distances[order])
+            allowed = np.zeros(len(self.rows), dtype=bool)
+            allowed[positions] = True
+            k = min(k, len(positions))
+        else:
+            allowed = None
+            k = min(k, len(self.rows))
+
+        # 트리에서 k개를 찾을 때까지 검색 범위를 두 배씩 확장
+        fetch = k
+        while True:
+            fetch = min(fetch, len(self.rows))
+            distances, found = self.tree.query(point[None, :], k=fetch)
+            distances, found = distances[0], found[0]
+            if allowed is not None:
+                keep = allowed[found]
+                distances, found = distances[keep], found[keep]
+            if len(found) >= k or fetch == len(self.rows):
+                return Neighbors(self.rows[found[:k]], distances[:k])
+            fetch *= 2
+
+
+def macro_index(catalog: FoodCatalog) -> MacroIndex:
+    """카탈로그 버전별 영양소 KD-tree (최초 조회 시 생성)"""
+    return catalog.derived('macro_index', MacroIndex)
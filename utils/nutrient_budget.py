@@ -0,0 +1,71 @@
+"""
+질환별 하루 영양소 상한
+settings.DISEASE_RESTRICTIONS의 daily_limits(나트륨/당류/포화지방/콜레스테롤)를 끼니 구성 전체에 적용
+
+- 음식 하나가 하루 상한을 넘으면 어떤 식단에도 넣을 수 없으므로 기본 필터에서 제외
+- 식단을 채우는 동안 누적 합계를 유지하고, 음식을 추가할 때마다 상수 시간에 확인
+- 아직 채워야 할 최소 음식 수만큼 후보 중 가장 작은 값들의 합을 남겨 두어(가지치기),
+  앞 끼니가 상한을 다 써서 뒤 끼니를 채울 수 없는 선택은 미리 건너뜀
+"""
+
+from typing import Dict, Iterable, Optional
+import numpy as np
+from settings import DISEASE_ALIASES, DISEASE_RESTRICTIONS
+from utils.food_catalog import FoodCatalog
+
+
+def daily_nutrient_limits(diseases: Iterable[str]) -> Dict[str, float]:
+    """질환 목록의 하루 영양소 상한 (같은 영양소는 가장 엄격한 값)"""
+    limits: Dict[str, float] = {}
+    for disease in diseases or []:
+        restrictions = DISEASE_RESTRICTIONS.get(DISEASE_ALIASES.get(disease, disease), {})
+        for nutrient, limit in restrictions.get('daily_limits', {}).items():
+            limits[nutrient] = min(limits.get(nutrient, limit), limit)
+    return limits
+
+
+class DailyNutrientBudget:
+    """식단 구성 중 하루 영양소 누적 합계 (결측값은 0으로 간주)
+
+    후보 행 번호 배열로 만들고, 이후 음식은 후보 배열 안의 위치로 지정
+    """
+
+    def __init__(self, catalog: FoodCatalog, limits: Dict[str, float], candidates: np.ndarray):
+        self.limits = limits
+        self.nutrients = list(limits)
+        # (영양소 수, 후보 수) 값 행렬과 상한/누적 벡터
+        self._values = np.nan_to_num(np.stack([catalog.column(n)[candidates] for n in self.nutrients])) \
+            if self.nutrients else np.zeros((0, len(candidates)), dtype=np.float32)
+        self._limits = np.asarray([limits[n] for n in self.nutrients], dtype=np.float64)
+        self._totals = np.zeros(len(self.nutrients), dtype=np.float64)
+        # 음식 k개를 더 채우는 데 필요한 최소량 = 후보 값을 오름차순 정렬한 누적합의 k번째 (영양소별)
+        cheapest = np.sort(self._values, axis=1).astype(np.float64)
+        self._reserves = np.concatenate([np.zeros((len(self.nutrients), 1)), np.cumsum(cheapest, axis=1)], axis=1)
+
+    def _remaining(self, reserve_items: int) -> np.ndarray:
+        """지금 추가할 수 있는 양 (이후 채워야 할 reserve_items개 몫을 남김)"""
+        reserve_items = min(max(0, reserve_items), self._reserves.shape[1] - 1)
+        return self._limits - self._totals - self._reserves[:, reserve_items]
+
+    def fits(self, positions: Optional[np.ndarray] = None, reserve_items: int = 0) -> np.ndarray:
+        """후보(positions가 없으면 전체) 각각을 지금 추가해도 상한을 넘지 않는지 여부
+
+        reserve_items: 이번 음식 이후 더 채워야 할 음식 수
+        """
+        values = self._values if positions is None else self._values[:, positions]
+        if not self.nutrients:
+            return np.ones(values.shape[1], dtype=bool)
+        return (values <= self._remaining(reserve_items)[:, None]).all(axis=0)
+
+    def fits_one(self, position: int, reserve_items: int = 0) -> bool:
+        if not self.nutrients:
+            return True
+        return bool((self._values[:, position] <= self._remaining(reserve_items)).all())
+
+    def add(self, position: int) -> None:
+        """후보 하나를 식단에 추가 (누적 합계 갱신)"""
+        if self.nutrients:
+            self._totals += self._values[:, position]
+
+    def totals(self) -> Dict[str, float]:
+        return {n: float(total) for n, total in zip(self.nutrients, self._totals)}
@@ -3,16 +3,31 @@
 오직 /data/정제 데이터.json 파일만 사용
 """
 
-import json
+import numpy as np
 import pandas as pd
-from typing import Dict, List, Any
+from settings import (
+    BUDGET_RELAXATION_RATE, DAY_PLAN_FEASIBLE_EXTRA, DAY_PLAN_MACRO_NEIGHBORS, DAY_PLAN_MEAL_SIZES,
+    DAY_PLAN_SHORTLIST, DAY_PLAN_TIME_LIMIT, DAY_PLANNER, MEAL_SAMPLE_SEED, PREFERENCE_FEATURES
+)
+from typing import Dict, List, Any, NamedTuple, Optional, Tuple
+from utils.candidate_cache import candidate_rows
+from utils.day_planner import DayTargets, daily_calorie_target, daily_protein_target, optimize_day
+from utils.macro_index import macro_index, meal_macro_target
+from utils.feedback_store import get_feedback_store
+from utils.filter_plan import compile_profile_plan
+from utils.food_catalog import FoodCatalog, _readonly, get_catalog, register_derived_patcher
+from utils.nutrient_budget import DailyNutrientBudget, daily_nutrient_limits
+from utils.relaxation import RelaxationResult, RelaxationStep, relax
+from utils.scorers import Scorer, default_scorer
+from utils.top_k import top_k
 
-def recommend(user_profile: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+def recommend(user_profile: Dict[str, Any], scorer: Optional[Scorer] = None) -> Dict[str, List[Dict[str, Any]]]:
     """
     사용자 프로필 기반 개인 맞춤 한국 음식 추천 (끼니별 2-3개씩)
     
     Args:
         user_profile: 사용자 정보 딕셔너리
+        scorer: 영양 점수기 (없으면 FOOD_SCORER_MODEL 모델 또는 목표별 영양 점수)
         
     Returns:
         끼니별 추천 음식 딕셔너리 
@@ -23,31 +38,50 @@ def recommend(user_profile: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
         }
     """
     
-    # 🔒 정제된 한국 음식 데이터만 로드
-    import os
-    data_path = os.path.join(os.path.dirname(__file__), "..", "data", "정제 데이터.json")
-    with open(data_path, "r", encoding="utf-8") as f:
-        food_data = json.load(f)
+    # 🔒 정제된 한국 음식 데이터만 사용 (프로세스 공유 카탈로그)
+    catalog = get_catalog()
     
-    df = pd.DataFrame(food_data)
-    print(f"🍲 로드된 한국 음식 데이터: {len(df)}개")
+    # 같은 제약 조건의 필터 결과는 후보 캐시에서 재사용 (예산 완화 단계에 쓸 후보까지 한 번에 조회)
+    candidates = candidate_rows(catalog, budget_relaxed_profile(user_profile), compile_profile_plan)
+    return recommend_from_catalog(catalog, user_profile, candidates, scorer)
+
+
+def budget_relaxed_profile(user_profile: Dict[str, Any]) -> Dict[str, Any]:
+    """예산 완화(+BUDGET_RELAXATION_RATE)까지 허용한 후보 조회용 프로필 (예산 안 여부는 plan_meals에서 구분)"""
+    if user_profile.get('budget') is None:
+        return user_profile
+    return {**user_profile, 'budget': user_profile['budget'] * (1 + BUDGET_RELAXATION_RATE)}
+
+
+def recommend_from_catalog(catalog: FoodCatalog, user_profile: Dict[str, Any],
+                           candidates: Optional[np.ndarray] = None,
+                           scorer: Optional[Scorer] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """주어진 카탈로그(공유 카탈로그 또는 SQLite 후보 카탈로그)로 끼니별 추천 실행
+    
+    candidates: 기본 필터(예산 완화 포함)를 이미 통과한 행 번호 배열 (없으면 여기서 필터링)
+    각 단계는 DataFrame을 복사하지 않고 후보 행 번호 배열과 후보 크기의 점수 버퍼만 주고받음
+    """
+    
+    print(f"🍲 로드된 한국 음식 데이터: {catalog.live_count}개")
     
     # 1️⃣ Step 1: 기본 필터링
-    filtered_df = apply_basic_filters(df, user_profile)
-    print(f"✅ 기본 필터링 후: {len(filtered_df)}개")
+    if candidates is None:
+        candidates = compile_profile_plan(budget_relaxed_profile(user_profile)).rows(catalog)
+    rows = candidates
+    print(f"✅ 기본 필터링 후: {len(rows)}개")
     
-    if len(filtered_df) == 0:
+    if len(rows) == 0:
         print("⚠️ 필터링 조건에 맞는 음식이 없습니다.")
         return {"breakfast": [], "lunch": [], "dinner": []}
     
     # 2️⃣ Step 2: 영양 기준 점수 계산
-    scored_df = calculate_nutrition_scores(filtered_df, user_profile)
+    scores = score_nutrition(catalog, CandidateScores(rows), user_profile, scorer)
     
     # 3️⃣ Step 3: 선호도 반영
-    final_df = apply_preference_bonus(scored_df, user_profile)
+    score_preferences(catalog, scores, user_profile)
     
     # 4️⃣ Step 4: 끼니별로 분류하여 추천
-    meal_recommendations = generate_meal_based_recommendations(final_df, user_profile)
+    meal_recommendations = plan_meals(catalog, scores, user_profile)
     
     # 각 끼니별 추천 개수 출력
     total_count = sum(len(meals) for meals in meal_recommendations.values())
@@ -59,46 +93,43 @@ def recommend(user_profile: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
     return meal_recommendations
 
 
-def apply_basic_filters(df: pd.DataFrame, user_profile: Dict[str, Any]) -> pd.DataFrame:
-    """기본 필터링: 알레르기, 예산, 질환 기반"""
-    
-    filtered = df.copy()
+class CandidateScores:
+    """요청별 후보 점수 버퍼
     
-    # 알레르기 필터링
-    if 'allergies' in user_profile and user_profile['allergies']:
-        user_allergies = user_profile['allergies']
-        for allergy in user_allergies:
-            # 각 음식의 allergies 필드에서 알레르기 항목 확인
-            filtered = filtered[~filtered['allergies'].apply(
-                lambda x: any(allergy.lower() in item.lower() for item in x) if isinstance(x, list) else False
-            )]
-    
-    # 예산 필터링 (1회 식사 기준)
-    if 'budget' in user_profile:
-        budget = user_profile['budget']
-        filtered = filtered[filtered['price'] <= budget]
-    
-    # 질환 기반 필터링
-    if 'diseases' in user_profile and user_profile['diseases']:
-        diseases = user_profile['diseases']
-        for disease in diseases:
-            if disease == "고혈압":
-                # 저염식 태그가 있는 음식 우선, 고나트륨 음식 제외
-                filtered = filtered[filtered['sodium'] <= 1000]  # 나트륨 1000mg 이하
-            elif disease == "당뇨":
-                # 저당 음식 우선
-                filtered = filtered[filtered['sugar'] <= 10]  # 당류 10g 이하
+    후보 행 번호 배열 크기로 한 번만 할당하고, 각 단계가 out= 인자로 제자리에 기록
+    (카탈로그 컬럼은 행 번호로 꺼내 쓰므로 요청당 할당량은 후보 수에 비례)
+    """
     
-    return filtered
+    def __init__(self, rows: np.ndarray):
+        self.rows = np.asarray(rows)
+        size = len(self.rows)
+        self.calorie_score = np.empty(size, dtype=np.float32)
+        self.protein_score = np.empty(size, dtype=np.float32)
+        self.nutrition_score = np.empty(size, dtype=np.float32)
+        self.preference_score = np.zeros(size, dtype=np.float32)
+        self.final_score = np.empty(size, dtype=np.float32)
+    
+    def __len__(self) -> int:
+        return len(self.rows)
+
 
+def _catalog_rows(df: pd.DataFrame) -> np.ndarray:
+    """DataFrame 인덱스(카탈로그 행 번호)를 정수 배열로 반환"""
+    return df.index.to_numpy()
 
-def calculate_nutrition_scores(df: pd.DataFrame, user_profile: Dict[str, Any]) -> pd.DataFrame:
-    """영양 기준 점수 계산"""
+
+def apply_basic_filters(df: pd.DataFrame, user_profile: Dict[str, Any],
+                        catalog: Optional[FoodCatalog] = None) -> pd.DataFrame:
+    """기본 필터링: 알레르기, 예산, 질환 기반 (컴파일된 필터 계획을 마스크 하나로 실행)"""
     
-    goal = user_profile.get('goal', '체중감량')
-    scored_df = df.copy()
+    catalog = catalog or get_catalog()
+    keep = compile_profile_plan(user_profile).mask(catalog)
+    return df[keep[_catalog_rows(df)]]
+
+
+def _goal_targets(goal: str) -> Tuple[float, float, float, float]:
+    """목표별 (칼로리 가중치, 단백질 가중치, 목표 칼로리, 목표 단백질)"""
     
-    # 목표별 영양 기준 설정
     if goal == "체중감량":
         # 저칼로리, 고단백 선호
         calorie_weight = -0.4  # 낮을수록 좋음
@@ -120,77 +151,256 @@ def calculate_nutrition_scores(df: pd.DataFrame, user_profile: Dict[str, Any]) -
         target_calories = 500
         target_protein = 20
     
-    # 정규화된 점수 계산
-    scored_df['calorie_score'] = 1 - abs(scored_df['calories'] - target_calories) / target_calories
-    scored_df['protein_score'] = scored_df['protein'] / target_protein
+    return calorie_weight, protein_weight, target_calories, target_protein
+
+
+def _goal_key(goal: str) -> str:
+    """목표 이름 정규화 (알 수 없는 목표는 체중유지 기준)"""
+    return goal if goal in ("체중감량", "근육증가") else "체중유지"
+
+
+def _compute_goal_scores(catalog: FoodCatalog, goal: str, rows: Optional[np.ndarray] = None) -> np.ndarray:
+    """목표 하나의 (칼로리 점수, 단백질 점수, 영양 점수) 행렬 (3, 행 수)"""
+    
+    calorie_weight, protein_weight, target_calories, target_protein = _goal_targets(goal)
+    calories = catalog.column('calories')
+    protein = catalog.column('protein')
+    if rows is not None:
+        calories, protein = calories[rows], protein[rows]
+    result = np.empty((3, len(calories)), dtype=np.float32)
+    calorie_score, protein_score, nutrition_score = result
+    
+    # 칼로리 점수: 1 - |칼로리 - 목표| / 목표
+    np.subtract(calories, target_calories, out=calorie_score)
+    np.abs(calorie_score, out=calorie_score)
+    calorie_score /= target_calories
+    np.subtract(1, calorie_score, out=calorie_score)
+    
+    # 단백질 점수: 단백질 / 목표
+    np.divide(protein, target_protein, out=protein_score)
     
     # 전체 영양 점수 (0~1)
-    scored_df['nutrition_score'] = (
-        scored_df['calorie_score'] * abs(calorie_weight) + 
-        scored_df['protein_score'] * protein_weight
-    ).clip(0, 1)
+    np.multiply(calorie_score, abs(calorie_weight), out=nutrition_score)
+    nutrition_score += protein_score * protein_weight
+    np.clip(nutrition_score, 0, 1, out=nutrition_score)
+    return result
+
+
+def goal_scores(catalog: FoodCatalog, goal: str) -> np.ndarray:
+    """목표별 전체 카탈로그 점수 행렬 (3, 행 수)
     
-    return scored_df
+    점수는 목표와 음식의 칼로리/단백질에만 의존하므로 카탈로그 버전당 목표별 1회만 계산
+    """
+    goal = _goal_key(goal)
+    return catalog.derived(f'goal_scores:{goal}', lambda c: _readonly(_compute_goal_scores(c, goal)))
 
 
-def apply_preference_bonus(df: pd.DataFrame, user_profile: Dict[str, Any]) -> pd.DataFrame:
-    """선호도 반영하여 점수 가산"""
+def _patch_goal_scores(key: str, matrix: np.ndarray, catalog: FoodCatalog, rows: np.ndarray) -> np.ndarray:
+    """델타 적용 시 변경/추가된 행의 점수만 다시 계산"""
+    patched = np.empty((3, len(catalog)), dtype=np.float32)
+    patched[:, :matrix.shape[1]] = matrix
+    if len(rows):
+        patched[:, rows] = _compute_goal_scores(catalog, key.split(':', 1)[1], rows)
+    return _readonly(patched)
+
+
+register_derived_patcher('goal_scores', _patch_goal_scores)
+
+
+class GoalScorer(Scorer):
+    """기본 점수기: 목표별 사전 계산 영양 점수"""
     
-    final_df = df.copy()
-    preferences = user_profile.get('preferences', [])
+    name = 'goal'
     
-    # 선호도 점수 초기화
-    final_df['preference_score'] = 0
+    def score(self, catalog: FoodCatalog, rows: np.ndarray, user_profile: Dict[str, Any]) -> np.ndarray:
+        return goal_scores(catalog, user_profile.get('goal', '체중감량'))[2][rows]
     
-    for preference in preferences:
-        if preference == "단백질 위주":
-            # 고단백 태그가 있는 음식에 가산점
-            final_df['preference_score'] += final_df['tags'].apply(
-                lambda x: 0.2 if isinstance(x, list) and any('고단백' in tag for tag in x) else 0
-            )
-        elif preference == "간편식":
-            # 도시락, 즉석식품 타입에 가산점
-            final_df['preference_score'] += final_df['type'].apply(
-                lambda x: 0.15 if x in ['도시락', '즉석밥', '간편식'] else 0
-            )
-        elif preference == "저염식":
-            # 저염식 태그에 가산점
-            final_df['preference_score'] += final_df['tags'].apply(
-                lambda x: 0.2 if isinstance(x, list) and any('저염식' in tag for tag in x) else 0
-            )
+    def score_all(self, catalog: FoodCatalog, user_profile: Dict[str, Any]) -> np.ndarray:
+        return goal_scores(catalog, user_profile.get('goal', '체중감량'))[2]
+
+
+GOAL_SCORER = GoalScorer()
+
+
+def active_scorer(scorer: Optional[Scorer] = None) -> Scorer:
+    """사용할 점수기 (지정 > FOOD_SCORER_MODEL 모델 > 목표별 영양 점수)"""
+    return scorer or default_scorer() or GOAL_SCORER
+
+
+def score_nutrition(catalog: FoodCatalog, scores: CandidateScores, user_profile: Dict[str, Any],
+                    scorer: Optional[Scorer] = None) -> CandidateScores:
+    """영양 기준 점수를 후보 점수 버퍼에 기록 (목표별 사전 계산 점수를 후보 행 번호로 모음)
+    
+    칼로리/단백질 세부 점수는 항상 목표 기준, 영양 점수는 점수기 결과
+    """
+    
+    scorer = active_scorer(scorer)
+    matrix = goal_scores(catalog, user_profile.get('goal', '체중감량'))
+    np.take(matrix[0], scores.rows, out=scores.calorie_score)
+    np.take(matrix[1], scores.rows, out=scores.protein_score)
+    if isinstance(scorer, GoalScorer):
+        np.take(matrix[2], scores.rows, out=scores.nutrition_score)
+    else:
+        scores.nutrition_score[:] = scorer.score(catalog, scores.rows, user_profile)
+    return scores
+
+
+def _compute_preference_indicators(catalog: FoodCatalog, rows: Optional[np.ndarray] = None) -> np.ndarray:
+    """음식×선호 특성 지시 행렬 (행 수, 특성 수), 특성 순서 = PREFERENCE_FEATURES"""
+    
+    size = len(catalog) if rows is None else len(rows)
+    matrix = np.zeros((size, len(PREFERENCE_FEATURES)), dtype=np.float32)
+    for column, feature in enumerate(PREFERENCE_FEATURES.values()):
+        hit = np.zeros(size, dtype=bool)
+        if feature.get('tags'):
+            hit |= catalog.any_of('tags', catalog.codes_containing('tags', feature['tags']), rows)
+        if feature.get('types'):
+            hit |= catalog.category_mask('type', feature['types'], rows)
+        matrix[:, column] = hit
+    return matrix
+
+
+def preference_indicators(catalog: FoodCatalog) -> np.ndarray:
+    """선호 특성 지시 행렬 (카탈로그 버전당 1회 생성)"""
+    return catalog.derived('preference_indicators', lambda c: _readonly(_compute_preference_indicators(c)))
+
+
+def _patch_preference_indicators(key: str, matrix: np.ndarray, catalog: FoodCatalog, rows: np.ndarray) -> np.ndarray:
+    """델타 적용 시 변경/추가된 행의 지시값만 다시 계산"""
+    patched = np.zeros((len(catalog), matrix.shape[1]), dtype=np.float32)
+    patched[:len(matrix)] = matrix
+    if len(rows):
+        patched[rows] = _compute_preference_indicators(catalog, rows)
+    return _readonly(patched)
+
+
+register_derived_patcher('preference_indicators', _patch_preference_indicators)
+
+
+def preference_weights(preferences: List[str]) -> np.ndarray:
+    """사용자 선호 목록 → 특성별 가중치 벡터 (알 수 없는 선호는 무시)"""
+    
+    weights = np.zeros(len(PREFERENCE_FEATURES), dtype=np.float32)
+    columns = {name: column for column, name in enumerate(PREFERENCE_FEATURES)}
+    for preference in preferences or []:
+        if preference in columns:
+            weights[columns[preference]] += PREFERENCE_FEATURES[preference]['weight']
+    return weights
+
+
+def score_preferences(catalog: FoodCatalog, scores: CandidateScores, user_profile: Dict[str, Any]) -> CandidateScores:
+    """선호도 점수와 최종 점수를 후보 점수 버퍼에 기록 (지시 행렬 × 가중치 벡터 한 번)"""
+    
+    weights = preference_weights(user_profile.get('preferences', []))
+    if weights.any():
+        np.dot(preference_indicators(catalog)[scores.rows], weights, out=scores.preference_score)
+    else:
+        scores.preference_score.fill(0)
+    
+    # 별점 개인화 (내 별점 + 전체 보정 평균, 평가가 쌓인 경우만)
+    store = get_feedback_store()
+    if len(store):
+        scores.preference_score += store.personalization(catalog, user_profile.get('user_id'), scores.rows)
     
     # 최종 점수 = 영양 점수 + 선호도 점수
-    final_df['final_score'] = (final_df['nutrition_score'] + final_df['preference_score']).clip(0, 1)
+    np.add(scores.nutrition_score, scores.preference_score, out=scores.final_score)
+    np.clip(scores.final_score, 0, 1, out=scores.final_score)
+    return scores
+
+
+def calculate_nutrition_scores(df: pd.DataFrame, user_profile: Dict[str, Any],
+                               catalog: Optional[FoodCatalog] = None,
+                               scorer: Optional[Scorer] = None) -> pd.DataFrame:
+    """영양 기준 점수 계산 (DataFrame 입력용, 추천 경로는 score_nutrition 사용)"""
+    
+    scores = score_nutrition(catalog or get_catalog(), CandidateScores(_catalog_rows(df)), user_profile, scorer)
+    return df.assign(
+        calorie_score=scores.calorie_score,
+        protein_score=scores.protein_score,
+        nutrition_score=scores.nutrition_score
+    )
+
+
+def apply_preference_bonus(df: pd.DataFrame, user_profile: Dict[str, Any],
+                           catalog: Optional[FoodCatalog] = None) -> pd.DataFrame:
+    """선호도 반영하여 점수 가산 (DataFrame 입력용, 추천 경로는 score_preferences 사용)"""
+    
+    scores = CandidateScores(_catalog_rows(df))
+    scores.nutrition_score[:] = df['nutrition_score'].to_numpy()
+    score_preferences(catalog or get_catalog(), scores, user_profile)
+    return df.assign(preference_score=scores.preference_score, final_score=scores.final_score)
+
+
+def generate_meal_based_recommendations(df: pd.DataFrame, user_profile: Dict[str, Any],
+                                        catalog: Optional[FoodCatalog] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """끼니별 추천 리스트 생성 (DataFrame 입력용, 추천 경로는 plan_meals 사용)"""
     
-    return final_df
+    scores = CandidateScores(_catalog_rows(df))
+    scores.final_score[:] = df['final_score'].to_numpy()
+    return plan_meals(catalog or get_catalog(), scores, user_profile)
+
+
+# 실제 데이터 기반 끼니별 분류 기준
+MEAL_CATEGORIES = {
+    'breakfast': {
+        'types': ['샌드위치', '삼각김밥'],  # 간편한 아침 메뉴
+        'keywords': ['아침', '샌드위치', '토스트', '간편'],
+        'avoid_types': ['볶음밥', '초밥'],  # 아침에 부적합한 메뉴
+        'fallback_types': ['김밥', '롤/김밥']  # 부족할 때 사용
+    },
+    'lunch': {
+        'types': ['도시락', '볶음밥', '김밥', '롤/김밥'],  # 점심 메인 메뉴
+        'keywords': ['점심', '밥', '덮밥', '정식', '볶음'],
+        'avoid_types': ['샐러드', '스낵'],  # 점심에 부족한 메뉴
+        'fallback_types': ['삼각김밥', '냉동식품']
+    },
+    'dinner': {
+        'types': ['초밥', '샐러드', '냉동식품'],  # 저녁 메뉴
+        'keywords': ['저녁', '초밥', '샐러드', '냉동'],
+        'avoid_types': ['삼각김밥', '스낵'],  # 저녁에 부적합한 메뉴
+        'fallback_types': ['도시락', '김밥']
+    }
+}
 
 
-def generate_meal_based_recommendations(df: pd.DataFrame, user_profile: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
-    """끼니별 추천 리스트 생성 - 개선된 버전"""
+class MealCategoryMasks(NamedTuple):
+    """끼니 분류 기준의 카탈로그 전체 마스크 (끼니 타입/키워드, 대체 타입 포함, 부적합 타입)"""
+    meal_type: np.ndarray
+    fallback: np.ndarray
+    avoid: np.ndarray
+
+
+def meal_category_masks(catalog: FoodCatalog) -> Dict[str, MealCategoryMasks]:
+    """끼니별 분류 마스크 (카탈로그 버전당 1회 계산, 모든 프로필이 후보 행으로 잘라 공유)"""
+    
+    def build(catalog: FoodCatalog) -> Dict[str, MealCategoryMasks]:
+        types = catalog.codes['type']
+        masks = {}
+        for meal_time, criteria in MEAL_CATEGORIES.items():
+            meal_type = np.isin(types, catalog.strings.codes(criteria['types'])) | \
+                catalog.name_contains(criteria['keywords'])
+            masks[meal_time] = MealCategoryMasks(
+                _readonly(meal_type),
+                _readonly(meal_type | np.isin(types, catalog.strings.codes(criteria['fallback_types']))),
+                _readonly(np.isin(types, catalog.strings.codes(criteria['avoid_types'])))
+            )
+        return masks
+    
+    return catalog.derived('meal_category_masks', build)
+
+
+def plan_meals(catalog: FoodCatalog, scores: CandidateScores,
+               user_profile: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """끼니별 추천 리스트 생성 - 개선된 버전 (후보 점수 버퍼 기준, 모든 마스크는 후보 크기)
+    
+    끼니별 순차 추천 결과를 만든 뒤, DAY_PLANNER가 "optimize"이면 그 결과를 시작 해로 하루 전체를 최적화
+    (무작위 선택은 프로필의 'seed' 또는 MEAL_SAMPLE_SEED로 고정되어 같은 프로필이면 같은 결과)
+    """
     
     import random
+    rng = random.Random(user_profile.get('seed', MEAL_SAMPLE_SEED))
     
-    # 실제 데이터 기반 끼니별 분류 기준 정의
-    meal_categories = {
-        'breakfast': {
-            'types': ['샌드위치', '삼각김밥'],  # 간편한 아침 메뉴
-            'keywords': ['아침', '샌드위치', '토스트', '간편'],
-            'avoid_types': ['볶음밥', '초밥'],  # 아침에 부적합한 메뉴
-            'fallback_types': ['김밥', '롤/김밥']  # 부족할 때 사용
-        },
-        'lunch': {
-            'types': ['도시락', '볶음밥', '김밥', '롤/김밥'],  # 점심 메인 메뉴
-            'keywords': ['점심', '밥', '덮밥', '정식', '볶음'],
-            'avoid_types': ['샐러드', '스낵'],  # 점심에 부족한 메뉴
-            'fallback_types': ['삼각김밥', '냉동식품']
-        },
-        'dinner': {
-            'types': ['초밥', '샐러드', '냉동식품'],  # 저녁 메뉴
-            'keywords': ['저녁', '초밥', '샐러드', '냉동'],
-            'avoid_types': ['삼각김밥', '스낵'],  # 저녁에 부적합한 메뉴
-            'fallback_types': ['도시락', '김밥']
-        }
-    }
+    meal_categories = MEAL_CATEGORIES
     
     # 끼니별 추천 결과 초기화
     meal_recommendations = {
@@ -199,98 +409,99 @@ def generate_meal_based_recommendations(df: pd.DataFrame, user_profile: Dict[str
         'dinner': []
     }
     
-    # 점수 순으로 정렬
-    sorted_df = df.sort_values('final_score', ascending=False).reset_index(drop=True)
+    # 위치는 모두 후보 배열 기준 (전체 정렬 없이 필요한 상위 후보만 top_k로 선택, 동점이면 필터 결과 순서 유지)
+    rows = scores.rows
+    final_score = scores.final_score
+    candidate_types = catalog.codes['type'][rows]
+    
+    # 예산 안의 후보 (후보에는 예산 완화 단계용 +10% 구간이 포함될 수 있음)
+    if user_profile.get('budget') is not None:
+        within_budget = catalog.column('price')[rows] <= user_profile['budget']
+    else:
+        within_budget = np.ones(len(rows), dtype=bool)
+    budget_step = RelaxationStep('budget', f"예산 {BUDGET_RELAXATION_RATE:.0%} 초과 허용", 'budget')
     used_foods = set()  # 이미 사용된 음식 추적
+    used = np.zeros(len(rows), dtype=bool)
+    picked: Dict[str, List[int]] = {meal_time: [] for meal_time in meal_recommendations}  # 끼니별 선택 위치
+    
+    # 질환별 하루 영양소 상한 (끼니마다 최소 2개를 채울 양을 남겨 두며 누적 확인)
+    nutrient_budget = DailyNutrientBudget(catalog, daily_nutrient_limits(user_profile.get('diseases')), rows)
+    min_per_meal = 2
+    
+    def reserve_after(meal_time: str) -> int:
+        """meal_time에 하나를 더 넣은 뒤에도 끼니별 최소 개수를 채우려면 필요한 음식 수"""
+        return sum(
+            max(0, min_per_meal - len(foods) - (1 if meal == meal_time else 0))
+            for meal, foods in meal_recommendations.items()
+        )
+    
+    target_count = 3
+    
+    # 끼니별 분류 마스크를 후보 행으로 한 번만 잘라 둠 (순차 추천과 하루 최적화가 함께 사용)
+    category_masks = {
+        meal_time: MealCategoryMasks(*(mask[rows] for mask in masks))
+        for meal_time, masks in meal_category_masks(catalog).items()
+    }
+    
+    def meal_candidates(meal_time: str, available: np.ndarray) -> RelaxationResult:
+        """끼니 후보: 끼니 타입 또는 키워드, 예산 안, available 후보 중 (부족하면 우선순위대로 조건 완화)"""
+        # 1단계: 끼니별 특화 음식 (해당 끼니 타입 또는 키워드)
+        masks = category_masks[meal_time]
+        
+        # 2단계: 후보가 부족하면 우선순위대로 조건 완화 (예산 +10% → fallback 타입 → 타입/키워드 조건 해제)
+        return relax(
+            ~masks.avoid & available,
+            {'budget': within_budget, 'meal_type': masks.meal_type},
+            [
+                budget_step,
+                RelaxationStep('fallback_types', "대체 메뉴 타입 포함", 'meal_type', masks.fallback),
+                RelaxationStep('any_type', "끼니 타입/키워드 조건 해제", 'meal_type'),
+            ],
+            minimum=target_count
+        )
     
     # 각 끼니별로 순차적으로 추천
     for meal_time, criteria in meal_categories.items():
-        keywords = criteria['keywords']
-        types = criteria['types']
-        avoid_types = criteria['avoid_types']
-        fallback_types = criteria['fallback_types']
-        
-        # 1단계: 끼니별 특화 음식 필터링
-        # 우선 조건: 해당 끼니 타입에 맞는 음식
-        primary_suitable = sorted_df[
-            (sorted_df['type'].isin(types) |
-             sorted_df['name'].str.contains('|'.join(keywords), case=False, na=False)) &
-            (~sorted_df['type'].isin(avoid_types))
-        ].copy()
-        
-        # 이미 사용된 음식 제외
-        primary_suitable = primary_suitable[~primary_suitable['name'].isin(used_foods)]
+        # 이미 사용된 음식과 하루 영양소 상한을 넘는 음식 제외
+        available = ~used & nutrient_budget.fits(reserve_items=reserve_after(meal_time))
+        suitable = meal_candidates(meal_time, available)
+        primary = suitable.positions[suitable.tiers == 0]
         
-        print(f"🍽️ {meal_time}: 우선 적합한 음식 {len(primary_suitable)}개 발견")
+        print(f"🍽️ {meal_time}: 우선 적합한 음식 {len(primary)}개 발견")
         print(f"   🔄 현재 used_foods: {list(used_foods)}")
-        if len(primary_suitable) > 0:
-            print(f"   📋 후보 예시: {primary_suitable['name'].head(3).tolist()}")
-            print(f"   🏷️ 타입 분포: {primary_suitable['type'].value_counts().head(3).to_dict()}")
-        
-        # 2단계: 우선 후보가 부족하면 fallback 타입 추가
-        if len(primary_suitable) < 3:
-            fallback_suitable = sorted_df[
-                (sorted_df['type'].isin(fallback_types)) &
-                (~sorted_df['type'].isin(avoid_types)) &
-                (~sorted_df['name'].isin(used_foods))
-            ].copy()
-            
-            # 우선 후보와 fallback 후보 결합
-            meal_suitable = pd.concat([primary_suitable, fallback_suitable]).drop_duplicates().reset_index(drop=True)
-            print(f"⚠️ {meal_time}: fallback 추가 후 {len(meal_suitable)}개 후보")
-        else:
-            meal_suitable = primary_suitable
+        if len(primary) > 0:
+            type_codes, type_counts = np.unique(candidate_types[primary], return_counts=True)
+            top_types = top_k(type_counts, 3)
+            print(f"   📋 후보 예시: {[catalog.names[row] for row in rows[top_k(final_score, 3, candidates=primary)]]}")
+            print(f"   🏷️ 타입 분포: {dict((catalog.strings[type_codes[i]], int(type_counts[i])) for i in top_types)}")
+        if suitable.applied:
+            print(f"⚠️ {meal_time}: 조건 완화 {[step.name for step in suitable.applied]} 후 {len(suitable.positions)}개 후보")
         
         # 3단계: 다양성을 위한 랜덤 샘플링
-        target_count = 3
-        if len(meal_suitable) >= target_count:
-            # 상위 점수 음식들 중에서 랜덤하게 선택 (다양성 확보)
-            top_candidates = meal_suitable.head(min(8, len(meal_suitable)))  # 상위 8개 중에서
-            if len(top_candidates) >= target_count:
-                selected_indices = random.sample(range(len(top_candidates)), target_count)
-                selected_foods = top_candidates.iloc[selected_indices]
-            else:
-                selected_foods = top_candidates
+        shortlist = tiered_top_k(suitable, final_score, 8)  # 상위 8개 (완화 단계가 낮은 후보 우선)
+        if len(shortlist) >= target_count:
+            # 상위 음식들 중에서 랜덤하게 선택 (다양성 확보)
+            selected = [shortlist[i] for i in rng.sample(range(len(shortlist)), target_count)]
         else:
-            # 그래도 부족하면 전체에서 선택 (피해야 할 타입만 제외)
-            available_foods = sorted_df[
-                (~sorted_df['type'].isin(avoid_types)) &
-                (~sorted_df['name'].isin(used_foods))
-            ]
-            if len(available_foods) >= target_count:
-                selected_foods = available_foods.head(target_count)
-            else:
-                selected_foods = available_foods
-            
-            print(f"⚠️ {meal_time}: 최종 보완 후 {len(selected_foods)}개 선택")
+            selected = list(shortlist)
+            print(f"⚠️ {meal_time}: 최종 보완 후 {len(selected)}개 선택")
         
         # 4단계: 추천 객체 생성
-        for _, row in selected_foods.iterrows():
-            food_name = row['name']
-            if food_name not in used_foods:
-                # 추천 이유 생성
-                match_reason = generate_match_reason(row)
-                
-                recommendation = {
-                    'name': food_name,
-                    'brand': row.get('brand', ''),
-                    'calories': int(row['calories']),
-                    'protein': float(row['protein']),
-                    'carbs': float(row.get('carbs', 0)),
-                    'fat': float(row.get('fat', 0)),
-                    'price': int(row['price']),
-                    'tags': row.get('tags', []),
-                    'score': round(float(row['final_score']), 2),
-                    'match_reason': match_reason,
-                    'type': row.get('type', ''),
-                    'category': row.get('category', ''),
-                    'meal_time': meal_time
-                }
+        for index in selected:
+            position = suitable.positions[index]
+            if not used[position] and nutrient_budget.fits_one(position, reserve_after(meal_time)):
+                recommendation = build_recommendation(catalog, rows[position], final_score[position])
+                recommendation['meal_time'] = meal_time
+                recommendation['relaxations'] = suitable.relaxations_for(index)
+                food_name = recommendation['name']
                 
                 meal_recommendations[meal_time].append(recommendation)
+                picked[meal_time].append(int(position))
                 used_foods.add(food_name)  # 사용된 음식으로 표시
+                used[position] = True
+                nutrient_budget.add(position)
                 
-                print(f"   ✅ {meal_time} 추가: {food_name} (타입: {row.get('type', '')})")
+                print(f"   ✅ {meal_time} 추가: {food_name} (타입: {recommendation['type']})")
                 
                 # 목표 개수 달성 시 중단
                 if len(meal_recommendations[meal_time]) >= target_count:
@@ -298,38 +509,40 @@ def generate_meal_based_recommendations(df: pd.DataFrame, user_profile: Dict[str
     
     # 4단계: 끼니별 최소 2개씩 보장
     for meal_time in meal_recommendations:
-        while len(meal_recommendations[meal_time]) < 2:
-            # 아직 사용되지 않은 음식 중에서 추가
-            available_foods = sorted_df[~sorted_df['name'].isin(used_foods)]
+        while len(meal_recommendations[meal_time]) < min_per_meal:
+            # 아직 사용되지 않은 음식 중에서 추가 (하루 영양소 상한 안에서, 예산 안 후보 우선)
+            remaining = relax(
+                ~used & nutrient_budget.fits(reserve_items=reserve_after(meal_time)),
+                {'budget': within_budget}, [budget_step], minimum=1
+            )
             
-            if len(available_foods) == 0:
+            if len(remaining.positions) == 0:
                 print(f"⚠️ {meal_time}: 더 이상 추가할 음식이 없습니다.")
                 break
                 
-            # 랜덤하게 하나 선택
-            selected_row = available_foods.iloc[0]  # 점수가 가장 높은 것
-            food_name = selected_row['name']
-            
-            match_reason = generate_match_reason(selected_row)
+            # 점수가 가장 높은 것 선택
+            index = tiered_top_k(remaining, final_score, 1)[0]
+            position = remaining.positions[index]
+            used[position] = True
+            nutrient_budget.add(position)
             
-            recommendation = {
-                'name': food_name,
-                'brand': selected_row.get('brand', ''),
-                'calories': int(selected_row['calories']),
-                'protein': float(selected_row['protein']),
-                'carbs': float(selected_row.get('carbs', 0)),
-                'fat': float(selected_row.get('fat', 0)),
-                'price': int(selected_row['price']),
-                'tags': selected_row.get('tags', []),
-                'score': round(float(selected_row['final_score']), 2),
-                'match_reason': match_reason,
-                'type': selected_row.get('type', ''),
-                'category': selected_row.get('category', ''),
-                'meal_time': meal_time
-            }
+            recommendation = build_recommendation(catalog, rows[position], final_score[position])
+            recommendation['meal_time'] = meal_time
+            recommendation['relaxations'] = remaining.relaxations_for(index)
             
             meal_recommendations[meal_time].append(recommendation)
-            used_foods.add(food_name)
+            picked[meal_time].append(int(position))
+            used_foods.add(recommendation['name'])
+    
+    # 하루 전체 최적화: 순차 추천 결과를 시작 해로 사용 (더 나은 식단이 없거나 제약을 만족하는 식단이 없으면 순차 추천 유지)
+    optimized = None
+    if user_profile.get('planner', DAY_PLANNER) == 'optimize':
+        optimized = optimize_meal_plan(catalog, scores, user_profile, {
+            meal_time: meal_candidates(meal_time, np.ones(len(rows), dtype=bool))
+            for meal_time in meal_categories
+        }, incumbent=picked)
+        if optimized is not None:
+            meal_recommendations = optimized
     
     # 최종 결과 요약 출력
     print("\n🎯 끼니별 추천 결과 요약:")
@@ -337,51 +550,198 @@ def generate_meal_based_recommendations(df: pd.DataFrame, user_profile: Dict[str
         print(f"   {meal_time}: {len(foods)}개")
         for food in foods:
             print(f"     - {food['name']} (타입: {food['type']})")
+    if nutrient_budget.limits and optimized is None:
+        print(f"   🩺 하루 영양소 합계: {nutrient_budget.totals()} (상한 {nutrient_budget.limits})")
     
     return meal_recommendations
 
 
-def generate_final_recommendations(df: pd.DataFrame, limit: int = 8) -> List[Dict[str, Any]]:
+def optimize_meal_plan(catalog: FoodCatalog, scores: CandidateScores, user_profile: Dict[str, Any],
+                       meal_candidates: Dict[str, RelaxationResult],
+                       incumbent: Optional[Dict[str, List[int]]] = None) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+    """끼니별 후보(day_plan_pool)로 하루 식단을 함께 선택
+    
+    칼로리/단백질 목표는 BMR·활동 수준·목표 기반, 하루 예산은 프로필의 daily_budget (없으면 1끼 예산 × 3)
+    incumbent: 끼니별 순차 추천의 선택 위치 (시작 해). 가능한 식단이 없거나 시작 해보다 나은 식단이 없으면 None
+    """
+    
+    rows = scores.rows
+    goal = _goal_key(user_profile.get('goal', '체중감량'))
+    daily_budget = user_profile.get('daily_budget')
+    if daily_budget is None and user_profile.get('budget') is not None:
+        daily_budget = user_profile['budget'] * 3
+    targets = DayTargets(
+        daily_calorie_target(user_profile, goal),
+        daily_protein_target(user_profile, goal),
+        daily_budget
+    )
+    limits = daily_nutrient_limits(user_profile.get('diseases'))
+    price = np.nan_to_num(catalog.column('price')[rows])
+    nutrients = {nutrient: np.nan_to_num(catalog.column(nutrient)[rows]) for nutrient in limits}
+    
+    # 제약이 있는 지표(하루 예산, 영양소 상한)는 값이 낮은 후보도 섞어야 제약을 만족하는 조합이 생김
+    constrained = dict(nutrients)
+    if targets.budget is not None:
+        constrained['price'] = price
+    if len(constrained) > 1:
+        # 여러 제약을 함께 만족해야 하면 상한 대비 비율 합이 낮은 후보도 포함
+        caps = {**limits, 'price': targets.budget}
+        constrained['combined'] = sum(values / caps[name] for name, values in constrained.items())
+    # 하루 목표를 음식 수(끼니 수 × 끼니별 평균 음식 수)로 나눈 음식 1개 몫 목표 영양소
+    items_per_day = len(meal_candidates) * float(np.mean(DAY_PLAN_MEAL_SIZES))
+    macro_target = meal_macro_target(targets.calories / items_per_day, goal, items_per_day)
+    pools = {
+        meal_time: day_plan_pool(result, scores.final_score, constrained,
+                                 macro_neighbors(catalog, rows, result, macro_target))
+        for meal_time, result in meal_candidates.items()
+    }
+    
+    plan = optimize_day(
+        [meal_candidates[meal_time].positions[pool] for meal_time, pool in pools.items()],
+        scores.final_score,
+        np.nan_to_num(catalog.column('calories')[rows]),
+        np.nan_to_num(catalog.column('protein')[rows]),
+        price,
+        np.stack(list(nutrients.values())) if nutrients else np.zeros((0, len(rows))),
+        np.array(list(limits.values()), dtype=np.float64),
+        targets,
+        incumbent=[incumbent[meal_time] for meal_time in pools] if incumbent is not None else None,
+        time_limit=user_profile.get('plan_time_limit', DAY_PLAN_TIME_LIMIT)
+    )
+    if plan is None:
+        print("⚠️ 하루 식단 최적화: 제약을 만족하는 조합이 없어 끼니별 순차 추천 유지")
+        return None
+    if plan.incumbent:
+        print(f"🧮 하루 식단 최적화: 끼니별 순차 추천보다 나은 식단 없음 (탐색 {plan.nodes}개 노드)")
+        return None
+    
+    meal_recommendations: Dict[str, List[Dict[str, Any]]] = {}
+    for (meal_time, pool), picks in zip(pools.items(), plan.picks):
+        result = meal_candidates[meal_time]
+        index_of = {int(result.positions[index]): index for index in pool}
+        meal_recommendations[meal_time] = []
+        for position in picks:
+            recommendation = build_recommendation(catalog, rows[position], scores.final_score[position])
+            recommendation['meal_time'] = meal_time
+            recommendation['relaxations'] = result.relaxations_for(index_of[position])
+            meal_recommendations[meal_time].append(recommendation)
+    
+    print(f"🧮 하루 식단 최적화: 목적 함수 {plan.objective:.3f}, 탐색 {plan.nodes}개 노드"
+          f"{'' if plan.optimal else ' (노드 수·시간 제한 도달, 현재 최적해 사용)'}")
+    print(f"   합계: {plan.totals['calories']:.0f} kcal (목표 {targets.calories:.0f}), "
+          f"단백질 {plan.totals['protein']:.0f} g (목표 {targets.protein:.0f}), 가격 {plan.totals['price']:,.0f}원"
+          + (f" (하루 예산 {targets.budget:,.0f}원)" if targets.budget is not None else ""))
+    return meal_recommendations
+
+
+def day_plan_pool(result: RelaxationResult, final_score: np.ndarray,
+                  constrained: Dict[str, np.ndarray], neighbors: Optional[List[int]] = None) -> List[int]:
+    """하루 최적화에 쓰는 끼니 후보 인덱스 (result.positions 기준)
+    
+    점수 상위 DAY_PLAN_SHORTLIST개 + 제약 지표(후보 크기 배열)별로 값이 가장 낮은 DAY_PLAN_FEASIBLE_EXTRA개
+    + 목표 영양소 최근접 후보(neighbors, macro_neighbors 결과)
+    """
+    
+    pool = tiered_top_k(result, final_score, DAY_PLAN_SHORTLIST)
+    for values in constrained.values():
+        for index in top_k(-values[result.positions], DAY_PLAN_FEASIBLE_EXTRA):
+            if int(index) not in pool:
+                pool.append(int(index))
+    for index in neighbors or []:
+        if index not in pool:
+            pool.append(index)
+    return pool
+
+
+def macro_neighbors(catalog: FoodCatalog, rows: np.ndarray, result: RelaxationResult,
+                    target: Dict[str, float]) -> List[int]:
+    """끼니 후보 중 목표 영양소에 가장 가까운 DAY_PLAN_MACRO_NEIGHBORS개 인덱스 (result.positions 기준, KD-tree)"""
+    
+    if DAY_PLAN_MACRO_NEIGHBORS <= 0 or len(result.positions) == 0:
+        return []
+    candidates = rows[result.positions]
+    found = macro_index(catalog).query(target, DAY_PLAN_MACRO_NEIGHBORS, candidates)
+    # 찾은 행 번호 → 후보 인덱스 (정렬 + 이진 검색, 후보가 많아도 파이썬 반복 없음)
+    order = np.argsort(candidates, kind='stable')
+    return [int(index) for index in order[np.searchsorted(candidates[order], found.rows)]]
+
+
+def tiered_top_k(result: RelaxationResult, final_score: np.ndarray, k: int) -> List[int]:
+    """완화 결과에서 점수 상위 k개의 인덱스 (result.positions 기준, 완화 단계가 낮은 후보 먼저)"""
+    
+    shortlist: List[int] = []
+    for tier in np.unique(result.tiers):
+        if len(shortlist) >= k:
+            break
+        members = np.flatnonzero(result.tiers == tier)
+        best = top_k(final_score[result.positions[members]], k - len(shortlist))
+        shortlist.extend(int(i) for i in members[best])
+    return shortlist
+
+
+def build_recommendation(catalog: FoodCatalog, row_id: int, final_score: float) -> Dict[str, Any]:
+    """카탈로그 행 하나를 추천 결과 딕셔너리로 변환 (선택된 음식만 파이썬 객체로 복원)
+    
+    점수 외의 필드는 카탈로그 버전별로 행마다 한 번만 만들어 여러 프로필/요청이 공유 (결과는 사본)
+    """
+    
+    fields = catalog.derived('recommendation_fields', lambda c: {})
+    base = fields.get(row_id)
+    if base is None:
+        base = fields[row_id] = _recommendation_fields(catalog.record(row_id))
+    return {**base, 'tags': list(base['tags']), 'score': round(float(final_score), 2)}
+
+
+def _recommendation_fields(food: Dict[str, Any]) -> Dict[str, Any]:
+    """추천 결과 중 점수와 무관한 필드 (build_recommendation 캐시 항목)"""
+    
+    return {
+        'id': food.get('id') or '',
+        'name': food['name'],
+        'brand': food.get('brand') or '',
+        'calories': int(food['calories'] or 0),
+        'protein': float(food['protein'] or 0),
+        'carbs': float(food.get('carbs') or 0),
+        'fat': float(food.get('fat') or 0),
+        'price': int(food['price'] or 0),
+        'tags': food.get('tags', []),
+        'match_reason': generate_match_reason(food),
+        'type': food.get('type') or '',
+        'category': food.get('category') or ''
+    }
+
+
+def generate_final_recommendations(df: pd.DataFrame, limit: int = 8,
+                                   catalog: Optional[FoodCatalog] = None) -> List[Dict[str, Any]]:
     """최종 추천 리스트 생성 (하위 호환성 유지)"""
     
-    # 점수 순으로 정렬
-    sorted_df = df.sort_values('final_score', ascending=False).head(limit)
+    catalog = catalog or get_catalog()
+    
+    # 점수 상위 limit개만 선택 (동점이면 입력 순서 유지)
+    final_scores = df['final_score'].to_numpy()
+    top = top_k(final_scores, limit)
     
     recommendations = []
     
-    for _, row in sorted_df.iterrows():
-        # 추천 이유 생성
-        match_reason = generate_match_reason(row)
-        
-        recommendation = {
-            'name': row['name'],
-            'brand': row.get('brand', ''),
-            'calories': int(row['calories']),
-            'protein': float(row['protein']),
-            'price': int(row['price']),
-            'tags': row.get('tags', []),
-            'score': round(float(row['final_score']), 2),
-            'match_reason': match_reason,
-            'type': row.get('type', ''),
-            'category': row.get('category', '')
-        }
-        
+    for row_id, final_score in zip(_catalog_rows(df)[top], final_scores[top]):
+        recommendation = build_recommendation(catalog, row_id, final_score)
+        del recommendation['carbs'], recommendation['fat']
         recommendations.append(recommendation)
     
     return recommendations
 
 
-def generate_match_reason(row: pd.Series) -> str:
+def generate_match_reason(row: Dict[str, Any]) -> str:
     """추천 이유 생성"""
     
     reasons = []
     
-    # 영양적 특징
-    if row['protein'] >= 25:
+    # 영양적 특징 (결측값은 0으로 간주)
+    if (row.get('protein') or 0) >= 25:
         reasons.append("고단백")
-    if row['calories'] <= 400:
+    if (row.get('calories') or 0) <= 400:
         reasons.append("저칼로리")
-    if row['sodium'] <= 800:
+    if (row.get('sodium') or 0) <= 800:
         reasons.append("저염식")
     
     # 태그 기반 특징
@@ -0,0 +1,77 @@
+"""
+제약 조건 완화 엔진
+후보가 부족할 때 정해진 우선순위대로 조건을 하나씩 풀어 후보를 넓히고, 어떤 완화를 적용했는지 기록
+
+- 조건은 이름별 bool 마스크(후보 크기)로 한 번만 계산해 두고, 완화 단계는 해당 조건의 마스크를
+  더 느슨한 마스크(또는 조건 삭제)로 바꾼 뒤 이미 계산된 마스크끼리 AND만 다시 수행
+- 결과 순서는 엄격한 조건을 통과한 후보가 먼저, 이후 완화 단계마다 새로 들어온 후보 (각 구간은 입력 순서 유지)
+- 안전 조건(알레르기 등)은 base 마스크로 주어 어떤 단계에서도 완화하지 않음
+"""
+
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+import numpy as np
+
+
+class RelaxationStep(NamedTuple):
+    """완화 단계: constraint 조건 마스크를 mask로 교체 (mask가 None이면 조건 삭제)"""
+    name: str
+    description: str
+    constraint: str
+    mask: Optional[np.ndarray] = None
+
+
+class RelaxationResult(NamedTuple):
+    """완화 결과: 후보 위치(우선순위 순), 각 후보가 들어온 단계 번호(0 = 엄격), 적용한 단계와 적용 직전 조건 마스크"""
+    positions: np.ndarray
+    tiers: np.ndarray
+    applied: Tuple[RelaxationStep, ...]
+    before: Tuple[np.ndarray, ...]
+
+    def relaxations_for(self, index: int) -> List[str]:
+        """positions[index] 후보가 실제로 필요로 한 완화 설명 (같은 조건은 마지막 단계만)"""
+        position = self.positions[index]
+        needed: Dict[str, RelaxationStep] = {}
+        for step, mask in zip(self.applied[:self.tiers[index]], self.before):
+            if not mask[position]:
+                needed[step.constraint] = step
+        return [step.description for step in self.applied if needed.get(step.constraint) is step]
+
+
+def relax(base: np.ndarray, constraints: Dict[str, np.ndarray], steps: Sequence[RelaxationStep],
+          minimum: int) -> RelaxationResult:
+    """base & 모든 조건을 만족하는 후보가 minimum개 이상이 될 때까지 steps를 순서대로 적용"""
+    current = dict(constraints)
+    admitted = base.copy()
+    for mask in current.values():
+        admitted &= mask
+
+    positions = [np.flatnonzero(admitted)]
+    tiers = [np.zeros(len(positions[0]), dtype=np.int32)]
+    applied: List[RelaxationStep] = []
+    before: List[np.ndarray] = []
+    count = len(positions[0])
+
+    for step in steps:
+        if count >= minimum:
+            break
+        if step.constraint not in current:
+            continue
+        before.append(current[step.constraint])
+        if step.mask is None:
+            del current[step.constraint]
+        else:
+            current[step.constraint] = step.mask
+        relaxed = base.copy()
+        for mask in current.values():
+            relaxed &= mask
+        # 새 후보가 없어도 조건은 풀린 상태로 이후 단계에 이어지므로 적용 목록에 남김
+        applied.append(step)
+        added = np.flatnonzero(relaxed & ~admitted)
+        if len(added) == 0:
+            continue
+        admitted |= relaxed
+        positions.append(added)
+        tiers.append(np.full(len(added), len(applied), dtype=np.int32))
+        count += len(added)
+
+    return RelaxationResult(np.concatenate(positions), np.concatenate(tiers), tuple(applied), tuple(before))
@@ -0,0 +1,171 @@
+"""
+음식 적합도 점수기(Scorer)
+추천 경로의 영양 점수 계산을 교체 가능한 점수기로 분리
+
+- Scorer: 후보 행 번호 배열 → 0~1 적합도 점수 (float32) 인터페이스
+- SklearnScorer: scikit-learn 모델로 사용자별 적합도를 예측
+  - 입력 = 음식 특성(FEATURE_COLUMNS) + 프로필 특성(PROFILE_FEATURES: 신체 정보, 활동 수준, 목표, 예산)
+  - 학습 목표는 실제 사용자 별점 (scripts/train_suitability_model.py, 별점 기록의 프로필 스냅샷 사용)
+  - 음식 특성 행렬은 카탈로그 버전당 1회만 만들고(델타 적용 시 변경 행만 갱신), 요청은 후보 행만 모아 predict 한 번 호출
+  - 모델 파일은 경로별로 캐시하고, 파일이 바뀌면 다시 로드 (모델 버전 = 파일 내용 해시)
+- FOOD_SCORER_MODEL 환경 변수에 모델 경로를 지정하면 기본 점수기로 사용
+"""
+
+import hashlib
+import os
+from abc import ABC, abstractmethod
+import threading
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+import numpy as np
+from utils.day_planner import ACTIVITY_MULTIPLIERS, daily_calorie_target
+from utils.food_catalog import FoodCatalog, _readonly, register_derived_patcher
+
+# 기본 점수기로 사용할 모델 경로 (없으면 목표별 영양 점수 사용)
+MODEL_PATH = os.environ.get("FOOD_SCORER_MODEL")
+
+# 학습 스크립트(scripts/train_suitability_model.py)의 기본 저장 경로
+DEFAULT_MODEL_PATH = os.path.normpath(
+    os.path.join(os.path.dirname(__file__), "..", "data", "models", "food_suitability.joblib")
+)
+
+# 모델 입력 특성 (숫자 컬럼, 결측값은 0)
+FEATURE_COLUMNS = [
+    'calories', 'protein', 'fat', 'carbs', 'sodium', 'sugar', 'fiber',
+    'saturatedFat', 'cholesterol', 'price'
+]
+
+# 프로필 특성 (음식 특성 뒤에 이어 붙임): 신체 정보, 활동 계수, 목표 원-핫, 1끼 예산(없으면 0), 1끼 목표 칼로리
+PROFILE_FEATURES = [
+    'age', 'male', 'height', 'weight', 'activity',
+    'goal_weight_loss', 'goal_muscle_gain', 'goal_maintain', 'meal_budget', 'meal_calories'
+]
+MODEL_GOALS = ("체중감량", "근육증가", "체중유지")
+
+
+class Scorer(ABC):
+    """음식 적합도 점수기 인터페이스"""
+
+    name = 'scorer'
+
+    @abstractmethod
+    def score(self, catalog: FoodCatalog, rows: np.ndarray, user_profile: Dict[str, Any]) -> np.ndarray:
+        """후보 행들의 적합도 점수 (0~1, float32, rows 순서)"""
+
+    def score_all(self, catalog: FoodCatalog, user_profile: Dict[str, Any]) -> np.ndarray:
+        """전체 카탈로그 행의 적합도 점수 (일괄 추천용)"""
+        return self.score(catalog, np.arange(len(catalog)), user_profile)
+
+
+def _compute_features(catalog: FoodCatalog, rows: Optional[np.ndarray] = None) -> np.ndarray:
+    columns = [catalog.column(name) if rows is None else catalog.column(name)[rows] for name in FEATURE_COLUMNS]
+    return np.nan_to_num(np.stack(columns, axis=1), nan=0.0).astype(np.float32, copy=False)
+
+
+def feature_matrix(catalog: FoodCatalog) -> np.ndarray:
+    """모델 입력 특성 행렬 (행 수, 특성 수) - 카탈로그 버전당 1회 생성"""
+    return catalog.derived('feature_matrix', lambda c: _readonly(_compute_features(c)))
+
+
+def _patch_feature_matrix(key: str, matrix: np.ndarray, catalog: FoodCatalog, rows: np.ndarray) -> np.ndarray:
+    """델타 적용 시 변경/추가된 행의 특성만 다시 계산"""
+    patched = np.zeros((len(catalog), matrix.shape[1]), dtype=np.float32)
+    patched[:len(matrix)] = matrix
+    if len(rows):
+        patched[rows] = _compute_features(catalog, rows)
+    return _readonly(patched)
+
+
+register_derived_patcher('feature_matrix', _patch_feature_matrix)
+
+
+def profile_snapshot(user_profile: Dict[str, Any]) -> Dict[str, float]:
+    """모델 입력용 프로필 특성 {이름: 값} (별점 기록에 함께 저장해 학습 데이터로 사용)"""
+    goal = user_profile.get('goal') or user_profile.get('health_goal') or "체중유지"
+    goal = goal if goal in MODEL_GOALS else "체중유지"
+    budget = user_profile.get('budget', user_profile.get('budget_per_meal'))
+    values = [
+        user_profile.get('age', 25),
+        1.0 if user_profile.get('gender', '남성') == '남성' else 0.0,
+        user_profile.get('height', 170),
+        user_profile.get('weight', 70),
+        ACTIVITY_MULTIPLIERS.get(user_profile.get('activity_level', '보통'), 1.55),
+        *(1.0 if goal == name else 0.0 for name in MODEL_GOALS),
+        budget if budget is not None else 0.0,
+        daily_calorie_target(user_profile, goal) / 3
+    ]
+    return {name: float(value) for name, value in zip(PROFILE_FEATURES, values)}
+
+
+def profile_features(user_profile: Dict[str, Any]) -> np.ndarray:
+    """프로필 특성 벡터 (PROFILE_FEATURES 순서, float32)"""
+    snapshot = profile_snapshot(user_profile)
+    return np.array([snapshot[name] for name in PROFILE_FEATURES], dtype=np.float32)
+
+
+def model_inputs(food_features: np.ndarray, profiles: np.ndarray) -> np.ndarray:
+    """음식 특성 행 + 프로필 특성 행 → 모델 입력 (프로필이 1개면 모든 행에 같은 프로필)"""
+    profiles = np.broadcast_to(profiles, (len(food_features), len(PROFILE_FEATURES)))
+    return np.hstack([food_features, profiles]).astype(np.float32, copy=False)
+
+
+class LoadedModel(NamedTuple):
+    """로드된 모델과 버전 (파일 내용 해시 앞 12자리)"""
+    model: Any
+    version: str
+
+
+_models: Dict[str, Tuple[Tuple[int, int], LoadedModel]] = {}
+_models_lock = threading.Lock()
+
+
+def load_model(path: str) -> LoadedModel:
+    """모델 파일 로드 (경로별 캐시, 파일 수정 시각·크기가 바뀌면 다시 로드)"""
+    path = os.path.normpath(path)
+    stat = os.stat(path)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    with _models_lock:
+        cached = _models.get(path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        # scikit-learn/joblib은 모델을 실제로 쓸 때만 import (기본 추천 경로의 시작 시간 유지)
+        import joblib
+        with open(path, 'rb') as f:
+            version = hashlib.sha256(f.read()).hexdigest()[:12]
+        loaded = LoadedModel(joblib.load(path), version)
+        _models[path] = (stamp, loaded)
+        print(f"🤖 적합도 모델 로드: {path} (버전 {version})")
+        return loaded
+
+
+class SklearnScorer(Scorer):
+    """scikit-learn 모델 사용자별 적합도 점수기 (predict_proba가 있으면 마지막 클래스 확률, 없으면 predict 값)"""
+
+    name = 'sklearn'
+
+    def __init__(self, path: str = DEFAULT_MODEL_PATH):
+        self.path = path
+
+    def _predict(self, model: Any, features: np.ndarray) -> np.ndarray:
+        if len(features) == 0:
+            return np.zeros(0, dtype=np.float32)
+        expected = getattr(model, 'n_features_in_', features.shape[1])
+        if expected != features.shape[1]:
+            raise ValueError(
+                f"모델 입력 특성 수({expected})가 음식+프로필 특성 수({features.shape[1]})와 다릅니다. "
+                f"scripts/train_suitability_model.py로 다시 학습하세요: {self.path}"
+            )
+        if hasattr(model, 'predict_proba'):
+            predicted = model.predict_proba(features)[:, -1]
+        else:
+            predicted = model.predict(features)
+        return np.clip(np.asarray(predicted, dtype=np.float32), 0, 1)
+
+    def score(self, catalog: FoodCatalog, rows: np.ndarray, user_profile: Dict[str, Any]) -> np.ndarray:
+        # 후보 행의 특성만 모으고 프로필 특성을 붙여 predict 한 번
+        features = model_inputs(feature_matrix(catalog)[rows], profile_features(user_profile))
+        return self._predict(load_model(self.path).model, features)
+
+
+def default_scorer() -> Optional[Scorer]:
+    """FOOD_SCORER_MODEL이 지정되어 있으면 해당 모델 점수기 (없으면 None = 기본 영양 점수)"""
+    return SklearnScorer(MODEL_PATH) if MODEL_PATH else None
@@ -0,0 +1,127 @@
+"""
+SQLite 기반 추천 백엔드
+scripts/create_sqlite_db.py 로 만든 data/foods.db 에서 알레르기·예산·질환 필터를 SQL로 처리하고
+조건을 통과한 후보만 메모리 카탈로그로 올려 기존 점수 계산/끼니 분배 로직을 그대로 사용
+
+메모리에 전부 올리기 어려운 대용량 카탈로그에서도
+- 예산/영양소 범위 조건은 foods 컬럼 인덱스로,
+- 알레르기 조건은 정규화된 food_allergies 테이블로
+후보를 줄인 뒤 필요한 행만 읽음
+"""
+
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from utils.food_catalog import (
+    CATEGORICAL_COLUMNS, DATA_PATH, LIST_COLUMNS, NUMERIC_COLUMNS, FoodCatalog, build_catalog
+)
+from utils.filter_plan import compile_profile_plan
+from utils.recommender import budget_relaxed_profile, recommend_from_catalog
+from utils.term_matcher import expanded_patterns, uses_synonyms
+
+DB_PATH = os.path.join(os.path.dirname(DATA_PATH), "foods.db")
+
+# 리스트 필드 → (정규화 테이블, 값 컬럼)
+LIST_TABLES = {
+    'ingredients': ('food_ingredients', 'ingredient'),
+    'tags': ('food_tags', 'tag'),
+    'allergies': ('food_allergies', 'allergy'),
+}
+
+# group_concat 구분자 (데이터에 나오지 않는 제어 문자)
+_SEPARATOR = '\x1f'
+
+
+class SQLiteFoodBackend:
+    """foods.db 에 필터를 위임하는 추천 백엔드"""
+
+    def __init__(self, db_path: str = DB_PATH):
+        self.db_path = db_path
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        """스레드별 읽기 전용 연결"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            uri = f"{Path(self.db_path).resolve().as_uri()}?mode=ro"
+            conn = sqlite3.connect(uri, uri=True)
+            self._local.conn = conn
+        return conn
+
+    def build_query(self, user_profile: Dict[str, Any], limit: Optional[int] = None) -> Tuple[str, List[Any]]:
+        """사용자 프로필의 알레르기·예산·질환 조건을 WHERE 절로 변환"""
+        conditions: List[str] = []
+        params: List[Any] = []
+
+        # 컴파일된 필터 계획의 술어를 WHERE 조건으로 변환
+        # (메모리 경로와 같이 예산 완화 구간까지 가져오고, 예산 안 여부는 plan_meals에서 구분)
+        for stage in compile_profile_plan(budget_relaxed_profile(user_profile)).stages:
+            for predicate in stage.predicates:
+                if predicate.op == 'max':
+                    # 예산/영양소 상한 (price, sodium, sugar 인덱스 사용)
+                    conditions.append(f"f.{predicate.field} <= ?")
+                    params.append(predicate.limit)
+                elif predicate.op == 'exclude_any':
+                    # 알레르기 등: 정규화 테이블에서 해당 값을 가진 음식 제외
+                    if not predicate.values:
+                        continue
+                    table, column = LIST_TABLES[predicate.field]
+                    # 메모리 경로(term_matcher)와 같은 정규화·동의어 확장 패턴 사용
+                    patterns = expanded_patterns(predicate.values, uses_synonyms(predicate.field))
+                    if predicate.match == 'contains':
+                        matches = ' OR '.join(f'instr(lower(x.{column}), ?) > 0' for _ in patterns)
+                    else:
+                        matches = f"lower(x.{column}) IN ({', '.join('?' for _ in patterns)})"
+                    params.extend(patterns)
+                    conditions.append(f"f.id NOT IN (SELECT x.food_id FROM {table} x WHERE {matches})")
+                else:
+                    raise ValueError(f"SQL로 변환할 수 없는 조건: {predicate.op}")
+
+        list_columns = [
+            f"(SELECT group_concat({column}, char(31)) FROM "
+            f"(SELECT {column} FROM {table} WHERE food_id = f.id ORDER BY position)) AS {field}"
+            for field, (table, column) in LIST_TABLES.items()
+        ]
+        scalar_columns = [f"f.{name}" for name in ['id', 'name', *NUMERIC_COLUMNS, *CATEGORICAL_COLUMNS]]
+
+        sql = f"SELECT {', '.join(scalar_columns + list_columns)} FROM foods f"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        # 원본 JSON 순서(삽입 순서)로 읽어 점수가 같은 후보의 선택 순서를 메모리 경로와 맞춤
+        sql += " ORDER BY f.rowid"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return sql, params
+
+    def candidate_records(self, user_profile: Dict[str, Any], limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """SQL 필터를 통과한 음식 레코드 목록"""
+        sql, params = self.build_query(user_profile, limit)
+        cursor = self._connection().execute(sql, params)
+        names = [description[0] for description in cursor.description]
+
+        records = []
+        for row in cursor:
+            record = dict(zip(names, row))
+            for field in LIST_COLUMNS:
+                value = record.get(field)
+                record[field] = value.split(_SEPARATOR) if value else []
+            records.append(record)
+        return records
+
+    def candidate_catalog(self, user_profile: Dict[str, Any], limit: Optional[int] = None) -> FoodCatalog:
+        """SQL 필터를 통과한 후보만 담은 컬럼형 카탈로그"""
+        records = self.candidate_records(user_profile, limit)
+        mtime_ns = os.stat(self.db_path).st_mtime_ns
+        return build_catalog(records, version=f"sqlite:{mtime_ns}", source_path=self.db_path, mtime_ns=mtime_ns)
+
+    def recommend(self, user_profile: Dict[str, Any], limit: Optional[int] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """SQL로 후보를 줄인 뒤 기존 추천 파이프라인으로 끼니별 추천"""
+        catalog = self.candidate_catalog(user_profile, limit)
+        print(f"🗄️ SQLite 필터 통과 후보: {len(catalog)}개 ({self.db_path})")
+        if len(catalog) == 0:
+            print("⚠️ 필터링 조건에 맞는 음식이 없습니다.")
+            return {"breakfast": [], "lunch": [], "dinner": []}
+        return recommend_from_catalog(catalog, user_profile)
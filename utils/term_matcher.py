@@ -0,0 +1,149 @@
+"""
+알레르기/태그/재료 어휘 정규화와 다중 패턴 매칭
+
+- normalize_term: NFC 정규화 + 공백 정리 + 소문자
+- settings.TERM_SYNONYMS 분류로 동의어를 같은 그룹으로 묶음 (예: 우유 → 유제품)
+  동의어 확장은 SYNONYM_FIELDS(알레르기/재료)에만 적용하고, 다른 필드(태그)는 정규화만 함
+- VocabularyIndex: 카탈로그 어휘를 로드 시 한 번 정규화해 구분자로 이어 붙인 텍스트로 보관하고,
+  사용자 입력(동의어 그룹으로 확장)을 Aho-Corasick 오토마톤으로 만들어 어휘 전체를 한 번만 훑음.
+  결과는 어휘 문자열 코드 배열이라 비트마스크 필터(FoodCatalog.any_of)에 바로 사용 가능
+"""
+
+import unicodedata
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
+import numpy as np
+from settings import SYNONYM_FIELDS, TERM_SYNONYMS
+
+# 어휘 사이 구분자 (패턴이 두 어휘에 걸쳐 매칭되지 않도록 함)
+_SEPARATOR = '\x00'
+
+
+def normalize_term(value: str) -> str:
+    """NFC 정규화 + 연속 공백 정리 + 소문자"""
+    return ' '.join(unicodedata.normalize('NFC', str(value)).split()).lower()
+
+
+def uses_synonyms(field: str) -> bool:
+    """동의어 확장을 적용하는 리스트 필드인지 여부 (알레르기/재료)"""
+    return field in SYNONYM_FIELDS
+
+
+def _build_synonym_groups() -> Dict[str, Tuple[str, ...]]:
+    groups: Dict[str, Tuple[str, ...]] = {}
+    for canonical, synonyms in TERM_SYNONYMS.items():
+        members = tuple(dict.fromkeys(normalize_term(term) for term in [canonical, *synonyms]))
+        for member in members:
+            groups[member] = members
+    return groups
+
+
+_SYNONYM_GROUPS = _build_synonym_groups()
+
+
+def canonical_term(value: str, synonyms: bool = True) -> str:
+    """정규화 후 동의어 그룹의 대표어 (그룹이 없거나 synonyms=False이면 정규화한 값)"""
+    term = normalize_term(value)
+    return _SYNONYM_GROUPS.get(term, (term,))[0] if synonyms else term
+
+
+def expand_term(value: str, synonyms: bool = True) -> Tuple[str, ...]:
+    """정규화한 값이 속한 동의어 그룹 전체 (synonyms=False이면 정규화한 값만)"""
+    term = normalize_term(value)
+    return _SYNONYM_GROUPS.get(term, (term,)) if synonyms else (term,)
+
+
+class AhoCorasick:
+    """다중 패턴 부분 문자열 검색 오토마톤 (패턴 수와 무관하게 텍스트를 한 번만 훑음)"""
+
+    def __init__(self, patterns: Sequence[str]):
+        self.patterns = list(patterns)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+
+        for index, pattern in enumerate(self.patterns):
+            if not pattern:
+                continue
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append(index)
+
+        # 너비 우선으로 실패 링크 계산
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def search(self, text: str) -> Iterator[Tuple[int, int]]:
+        """(매칭 끝 위치, 패턴 번호) 반환"""
+        state = 0
+        goto, fail, output = self._goto, self._fail, self._output
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for index in output[state]:
+                yield position, index
+
+
+@lru_cache(maxsize=256)
+def _automaton(patterns: Tuple[str, ...]) -> AhoCorasick:
+    return AhoCorasick(patterns)
+
+
+def expanded_patterns(values: Iterable[str], synonyms: bool = True) -> Tuple[str, ...]:
+    """사용자 입력을 정규화·동의어 확장한 패턴 (정렬된 튜플, 오토마톤 캐시 키)"""
+    return tuple(sorted({term for value in values for term in expand_term(value, synonyms) if term}))
+
+
+class VocabularyIndex:
+    """리스트 필드 어휘의 정규화 결과 (카탈로그 버전당 1회 생성, synonyms=False이면 동의어 확장 없음)"""
+
+    def __init__(self, codes: np.ndarray, strings: Sequence[str], synonyms: bool = True):
+        self.codes = np.asarray(codes, dtype=np.int32)
+        self.synonyms = synonyms
+        self.normalized = [normalize_term(strings[code]) for code in self.codes]
+        self.canonical = [canonical_term(term, synonyms) for term in self.normalized]
+        self._text = _SEPARATOR.join(self.normalized)
+        # 각 어휘가 텍스트에서 시작하는 위치 (매칭 끝 위치 → 어휘 번호)
+        starts = np.zeros(len(self.normalized), dtype=np.int64)
+        if len(self.normalized) > 1:
+            np.cumsum([len(term) + 1 for term in self.normalized[:-1]], out=starts[1:])
+        self._starts = starts
+        self._by_canonical: Dict[str, List[int]] = {}
+        for index, term in enumerate(self.canonical):
+            self._by_canonical.setdefault(term, []).append(index)
+
+    def containing(self, values: Iterable[str]) -> np.ndarray:
+        """정규화된 어휘 중 입력(동의어 포함)을 부분 문자열로 가진 어휘 코드"""
+        patterns = expanded_patterns(values, self.synonyms)
+        if not patterns or not self.normalized:
+            return np.zeros(0, dtype=np.int32)
+        ends = [end for end, _ in _automaton(patterns).search(self._text)]
+        if not ends:
+            return np.zeros(0, dtype=np.int32)
+        entries = np.unique(np.searchsorted(self._starts, ends, side='right') - 1)
+        return self.codes[entries]
+
+    def matching(self, values: Iterable[str]) -> np.ndarray:
+        """대표어가 입력(동의어 포함)의 대표어와 같은 어휘 코드"""
+        entries = sorted({
+            index for value in values for index in self._by_canonical.get(canonical_term(value, self.synonyms), [])
+        })
+        return self.codes[np.asarray(entries, dtype=np.int64)]
@@ -0,0 +1,42 @@
+"""
+상위 k개 선택
+전체 정렬 대신 np.argpartition으로 k번째 값을 찾고, 그 값보다 좋은 후보만 작게 정렬 (O(n + k log k))
+
+- 결과 순서는 점수 내림차순, 동점이면 입력 위치 오름차순 (전체 안정 정렬의 앞 k개와 동일)
+- NaN 점수는 항상 맨 뒤
+- exclude 마스크로 이미 사용한 후보를 이름 비교 없이 제외
+"""
+
+from typing import Optional
+import numpy as np
+
+
+def top_k(scores: np.ndarray, k: int, exclude: Optional[np.ndarray] = None,
+          candidates: Optional[np.ndarray] = None) -> np.ndarray:
+    """점수가 높은 순서로 최대 k개의 위치 (scores 기준 위치 배열)
+
+    Args:
+        scores: 점수 배열
+        k: 선택할 개수
+        exclude: True인 위치는 제외 (scores와 같은 크기의 bool 마스크)
+        candidates: 이 위치들 안에서만 선택 (오름차순 위치 배열)
+    """
+    positions = np.arange(len(scores)) if candidates is None else np.asarray(candidates)
+    if exclude is not None:
+        positions = positions[~exclude[positions]]
+    if k <= 0 or len(positions) == 0:
+        return positions[:0]
+
+    # 오름차순 키 (점수 내림차순, NaN은 가장 뒤)
+    keys = -np.asarray(scores, dtype=np.float64)[positions]
+    keys[np.isnan(keys)] = np.inf
+
+    if k < len(positions):
+        kth = keys[np.argpartition(keys, k - 1)[k - 1]]
+        # k번째 값보다 좋은 후보 전부 + k번째 값과 같은 후보를 위치 순으로 필요한 만큼
+        better = np.flatnonzero(keys < kth)
+        ties = np.flatnonzero(keys == kth)[:k - len(better)]
+        chosen = np.sort(np.concatenate([better, ties]))
+        positions, keys = positions[chosen], keys[chosen]
+
+    return positions[np.argsort(keys, kind='stable')]